@@ -15,6 +15,9 @@ def create_app():
             pass
     
     app = Flask(__name__)
+    # Fast JSON encoding for API responses (orjson when installed, JSON_ENCODER=stdlib to disable)
+    from .json_provider import json_provider_class
+    app.json = json_provider_class(os.getenv('JSON_ENCODER', 'orjson'))(app)
     # Configure CORS to allow all origins (for development with ngrok)
     CORS(app, resources={
         r"/api/*": {
@@ -32,4 +35,11 @@ def create_app():
     from .api.auth_routes import auth_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     
+    # Warm up Numba kernels (loaded from the on-disk cache when available)
+    # so the first /api/generate request runs at steady-state speed
+    if os.getenv('NUMBA_WARMUP', 'true').lower() == 'true':
+        from .services import optimized_ops
+        elapsed = optimized_ops.warm_up()
+        print(f"[Startup] Numba warm-up took {elapsed * 1000:.0f} ms")
+    
     return app
@@ -1,9 +1,13 @@
-from flask import Blueprint, request, jsonify
-from app.services.algorithm import generate_level
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
+from app.services.level_cache import generate_level_cached, get_level_cache
+from app.services.jobs import get_job_manager
+from app.services.batch import expand_batch, run_batch, summary_row, SUMMARY_FIELDS
 from app.services.validator import validate_level
 from app.services.difficulty_calculator import calculate
 from app.services.image_processor import process_image_to_grid, process_image_silhouette, process_image_dark_regions
 from app.auth.middleware import auth_middleware
+import csv
+import io
 import json
 import os
 
@@ -25,71 +29,107 @@ def get_shapes():
     # Deprecated: New logic uses custom_grid
     return jsonify({"shapes": ["CUSTOM_GRID"]})
 
-# Route xử lý việc tạo level
-@api_bp.route('/generate', methods=['POST'])
-@optional_auth
-def generate():
+def parse_generate_form(form):
+    """
+    Read /generate form-data into generate_level keyword arguments.
+    Returns (params, reuse_cached). Raises ValueError on a bad arrow_count.
+    """
+    # 1. Lấy tham số form-data
+    arrow_count = int(form.get('arrow_count', 50))
+    
+    def safe_int(form_key, default_value):
+        val = form.get(form_key)
+        try:
+            return int(val) if val is not None and val != '' else default_value
+        except ValueError:
+            return default_value
+    
+    min_arrow_length = safe_int('min_arrow_length', 2)
+    max_arrow_length = safe_int('max_arrow_length', 10)
+    
+    min_bends = safe_int('min_bends', 0)
+    max_bends = safe_int('max_bends', 5)
+    
+    def safe_float(form_key):
+        val = form.get(form_key)
+        try:
+            return float(val) if val is not None and val != '' else None
+        except ValueError:
+            return None
+    
+    # Optional difficulty band: generation searches until a level scores inside it
+    min_difficulty = safe_float('min_difficulty')
+    max_difficulty = safe_float('max_difficulty')
+    target_difficulty = None
+    if min_difficulty is not None or max_difficulty is not None:
+        target_difficulty = (min_difficulty, max_difficulty)
+    
+    # Parse JSON fields
+    colors_str = form.get('colors', '[]')
     try:
-        # 1. Lấy tham số form-data
-        arrow_count = int(request.form.get('arrow_count', 50))
-        
-        def safe_int(form_key, default_value):
-            val = request.form.get(form_key)
-            try:
-                return int(val) if val is not None and val != '' else default_value
-            except ValueError:
-                return default_value
-        
-        min_arrow_length = safe_int('min_arrow_length', 2)
-        max_arrow_length = safe_int('max_arrow_length', 10)
-        
-        min_bends = safe_int('min_bends', 0)
-        max_bends = safe_int('max_bends', 5)
+        color_list = json.loads(colors_str)
+    except:
+        color_list = ['#000000']
+    
+    obstacles_str = form.get('obstacles', '[]')
+    try:
+        obstacles_list = json.loads(obstacles_str)
+    except:
+        obstacles_list = []
         
-        # Parse JSON fields
-        colors_str = request.form.get('colors', '[]')
-        try:
-            color_list = json.loads(colors_str)
-        except:
-            color_list = ['#000000']
+    strategy = form.get('strategy', 'SMART_DYNAMIC')
+    
+    # Anytime generation: return the best level found within this budget
+    time_budget_ms = safe_int('time_budget_ms', None)
+    
+    # Optional seed to reproduce a level (echoed back in the response)
+    seed = safe_int('seed', None)
+    # Unseeded requests may reuse any cached level for the same parameters
+    reuse_cached = form.get('reuse_cached', 'false').lower() in ('true', '1', 'yes')
+    
+    # Bonus Fill option
+    bonus_fill_str = form.get('bonus_fill', 'true')
+    bonus_fill = bonus_fill_str.lower() in ('true', '1', 'yes')
         
-        obstacles_str = request.form.get('obstacles', '[]')
+    custom_grid_str = form.get('custom_grid')
+    custom_grid = None
+    if custom_grid_str:
         try:
-            obstacles_list = json.loads(obstacles_str)
+            custom_grid = json.loads(custom_grid_str)
         except:
-            obstacles_list = []
-            
-        strategy = request.form.get('strategy', 'SMART_DYNAMIC')
-        
-        # Bonus Fill option
-        bonus_fill_str = request.form.get('bonus_fill', 'true')
-        bonus_fill = bonus_fill_str.lower() in ('true', '1', 'yes')
-            
-        custom_grid_str = request.form.get('custom_grid')
-        custom_grid = None
-        if custom_grid_str:
-            try:
-                custom_grid = json.loads(custom_grid_str)
-            except:
-                print("Error parsing custom_grid")
+            print("Error parsing custom_grid")
+    
+    # Validation
+    if max_arrow_length < min_arrow_length: max_arrow_length = min_arrow_length
+    if max_bends < min_bends: max_bends = min_bends
+    
+    params = dict(
+        arrow_count=arrow_count,
+        custom_grid=custom_grid,
+        min_arrow_length=min_arrow_length,
+        max_arrow_length=max_arrow_length,
+        min_bends=min_bends,
+        max_bends=max_bends,
+        obstacles_input=obstacles_list,
+        color_list=color_list,
+        strategy_name=strategy,
+        bonus_fill=bonus_fill,
+        time_budget_ms=time_budget_ms,
+        seed=seed,
+        target_difficulty=target_difficulty
+    )
+    return params, reuse_cached
+
+# Route xử lý việc tạo level
+@api_bp.route('/generate', methods=['POST'])
+@optional_auth
+def generate():
+    """Synchronous generation, for small requests (large ones should use /jobs/generate)"""
+    try:
+        params, reuse_cached = parse_generate_form(request.form)
         
-        # Validation
-        if max_arrow_length < min_arrow_length: max_arrow_length = min_arrow_length
-        if max_bends < min_bends: max_bends = min_bends
-        
-        # Generate Level
-        result_data = generate_level(
-            arrow_count=arrow_count,
-            custom_grid=custom_grid,
-            min_arrow_length=min_arrow_length,
-            max_arrow_length=max_arrow_length,
-            min_bends=min_bends,
-            max_bends=max_bends,
-            obstacles_input=obstacles_list,
-            color_list=color_list,
-            strategy_name=strategy,
-            bonus_fill=bonus_fill
-        )
+        # Generate Level (served from the level cache when possible)
+        result_data = generate_level_cached(reuse_cached=reuse_cached, **params)
         
         return jsonify(result_data)
 
@@ -99,6 +139,111 @@ def generate():
         print(f"LỖI KHI TẠO LEVEL: {e}")
         return jsonify({"error": f"Lỗi server khi tạo level: {e}"}), 500
 
+@api_bp.route('/generate-batch', methods=['POST'])
+@optional_auth
+def generate_batch():
+    """
+    Generate a level pack. JSON body: generate_level arguments as "params" with
+    "seeds" (list) or "count", or a list of "param_sets"; optional "workers".
+    Streams one NDJSON record per level as they complete, or the summary CSV
+    rows with "format": "csv".
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({"error": "No JSON data provided"}), 400
+        
+        batch = expand_batch(
+            params=data.get('params'),
+            param_sets=data.get('param_sets'),
+            seeds=data.get('seeds'),
+            count=data.get('count')
+        )
+        workers = data.get('workers')
+        if workers is not None:
+            workers = max(0, min(int(workers), os.cpu_count() or 1))
+        as_csv = data.get('format') == 'csv'
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    def ndjson_lines():
+        for record in run_batch(batch, workers):
+            yield current_app.json.dumps(record, sort_keys=False) + "\n"
+    
+    def csv_lines():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for record in run_batch(batch, workers):
+            writer.writerow(summary_row(record))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if as_csv:
+        return Response(stream_with_context(csv_lines()), mimetype='text/csv')
+    return Response(stream_with_context(ndjson_lines()), mimetype='application/x-ndjson')
+
+@api_bp.route('/jobs/generate', methods=['POST'])
+@optional_auth
+def submit_generate_job():
+    """Queue a generation job (same form-data as /generate). Poll /jobs/<id> for progress and result."""
+    try:
+        params, reuse_cached = parse_generate_form(request.form)
+        job = get_job_manager().submit(params, reuse_cached)
+        return jsonify(job.to_dict(include_result=False)), 202
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        print(f"JOB SUBMIT ERROR: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+@optional_auth
+def get_generate_job(job_id):
+    """Job status and progress; includes the result once finished"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@api_bp.route('/jobs/<job_id>/events', methods=['GET'])
+@optional_auth
+def stream_generate_job(job_id):
+    """
+    Server-Sent Events stream of job progress: start, attempt_started, attempt_finished,
+    progress (snake counts), log and a final end event with the job status.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    def events():
+        for item in job.stream():
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            event, data = item
+            yield f"event: {event}\ndata: {current_app.json.dumps(data, sort_keys=False)}\n\n"
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@api_bp.route('/jobs/<job_id>', methods=['DELETE'])
+@optional_auth
+def cancel_generate_job(job_id):
+    """Cancel a job; a running job stops soon and keeps the best level found so far"""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict(include_result=False)), 202
+
+@api_bp.route('/cache/stats', methods=['GET'])
+@optional_auth
+def cache_stats():
+    """Level cache size and hit/miss counters"""
+    return jsonify(get_level_cache().stats())
+
 @api_bp.route('/fill-gaps', methods=['POST'])
 @optional_auth
 def fill_gaps():
@@ -120,6 +265,7 @@ def fill_gaps():
         max_len = data.get('max_len', 10)
         min_bends = data.get('min_bends', 0)
         max_bends = data.get('max_bends', 5)
+        seed = data.get('seed')
         
         # Import smart fill function
         from app.services.smart_fill import smart_fill_gaps
@@ -134,7 +280,8 @@ def fill_gaps():
             min_len=min_len,
             max_len=max_len,
             min_bends=min_bends,
-            max_bends=max_bends
+            max_bends=max_bends,
+            seed=seed
         )
         
         return jsonify(result)
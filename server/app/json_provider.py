@@ -0,0 +1,59 @@
+"""
+JSON Provider
+
+Response encoding for the API. jsonify and the NDJSON / SSE streams go through
+app.json, which uses orjson when it is installed and Flask's default (stdlib
+json) provider otherwise. Set JSON_ENCODER=stdlib to force the latter.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    # orjson not installed, responses use the stdlib encoder
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider that encodes with orjson. Keys are sorted and output is
+    compact (indented in debug) exactly as with the default provider; NumPy
+    arrays and scalars are encoded natively. Values orjson rejects (integers
+    beyond 64 bits) fall back to the default encoder. Decoding is left to the default.
+    """
+
+    def _options(self, sort_keys, indent):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('default', None)
+        if kwargs:
+            # json.dumps-only arguments (separators, ensure_ascii, cls, ...)
+            return super().dumps(obj, sort_keys=sort_keys, indent=indent, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(sort_keys, indent)).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, sort_keys=sort_keys, indent=indent)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._options(self.sort_keys, indent))
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def json_provider_class(name='orjson'):
+    """Provider class for JSON_ENCODER: OrjsonProvider if requested and installed, else the default."""
+    if name.lower() == 'orjson' and orjson is not None:
+        return OrjsonProvider
+    return DefaultJSONProvider
@@ -1,36 +1,237 @@
+import functools
+import random
+import time
 from .strategies.registry import get_strategy_class
 from .json_builder import create_level_json
 from .validator import validate_level
+from .solver import check_level
+from .difficulty_calculator import calculate
+from .log_sink import format_records
+from . import attempt_pool
+
+
+def run_attempt(StrategyClass, rows, cols, valid_cells, obstacles_map, color_list, bonus_fill,
+                arrow_count, min_arrow_length, max_arrow_length, min_bends, max_bends, seed=None, deadline=None,
+                cancel_event=None, on_snake_placed=None, on_log=None, difficulty_obstacles=None):
+    """
+    One generation attempt: run a fresh strategy, then measure coverage and solvability.
+    Module-level so it can be shipped to attempt_pool workers.
+    seed: Attempt seed for the strategy RNG and the Numba kernels (None = random).
+    deadline: Wall-clock time (time.time()) at which the strategy stops placing snakes.
+    cancel_event / on_snake_placed / on_log: Cancellation, progress and log-listener hooks
+                                             for in-process attempts (not picklable, so pool
+                                             workers run without them).
+    difficulty_obstacles: Request obstacle list. When given, the level is also scored with
+                          difficulty_calculator.calculate (difficulty-targeted search).
+    Logs come back as unformatted records, and only the solvability verdict is computed
+    (the step-by-step validation logs are built for the winning attempt only).
+    """
+    # Create fresh strategy instance
+    strategy = StrategyClass(rows, cols, valid_cells, obstacles_map, color_list, seed=seed)
+    
+    # Override ENABLE_BONUS_FILL based on client request
+    strategy.ENABLE_BONUS_FILL = bonus_fill
+    strategy.deadline = deadline
+    strategy.cancel_event = cancel_event
+    strategy.on_snake_placed = on_snake_placed
+    strategy.logs.listener = on_log
+    
+    # Run Generation
+    result = strategy.generate(arrow_count, min_arrow_length, max_arrow_length, min_bends, max_bends)
+    
+    # Plain int tuples (paths may carry NumPy ints)
+    final_snakes = [
+        {'path': [(int(r), int(c)) for r, c in s['path']], 'color': s['color']}
+        for s in result['snakes']
+    ]
+    
+    # Calculate Stats
+    filled_count = len(result['occupied'])
+    total_playable = len(valid_cells)
+    coverage_percent = 0
+    if total_playable > 0:
+        coverage_percent = int(filled_count/total_playable*100)
+        
+    # Validation Check (verdict only)
+    is_solvable, stuck_count, _ = check_level(final_snakes, obstacles_map, rows, cols)
+    
+    difficulty_score = None
+    if difficulty_obstacles is not None:
+        difficulty_score = calculate(final_snakes, difficulty_obstacles, rows, cols)['difficulty_score']
+    
+    return {
+        'snakes': final_snakes,
+        'log_records': result['logs'].records, # Capture logs from this attempt
+        'coverage_percent': coverage_percent,
+        'is_solvable': is_solvable,
+        'stuck_count': stuck_count,
+        'difficulty_score': difficulty_score
+    }
+
+
+# Difficulty-targeted search: attempts run in rounds of this size, and the
+# generation parameters are adapted between rounds
+DIFFICULTY_ROUND_SIZE = 4
+
+
+def difficulty_distance(score, target):
+    """How far a difficulty score is outside the (min, max) target band (0 = inside)."""
+    low, high = target
+    if low is not None and score < low:
+        return low - score
+    if high is not None and score > high:
+        return score - high
+    return 0
+
+
+def target_rank(result, target):
+    """
+    Ranking key for the difficulty search (higher is better). Solvable levels
+    inside the band all rank equal, so the earliest one wins; others rank by
+    solvability, distance to the band, then coverage.
+    """
+    distance = difficulty_distance(result['difficulty_score'], target)
+    if result['is_solvable'] and distance == 0:
+        return (1, 1, 0, 0)
+    return (0, int(result['is_solvable']), -distance, result['coverage_percent'])
+
+
+def adapt_difficulty_params(params, score, target, playable_cells):
+    """
+    Next round's (arrow_count, min_len, max_len, min_bends, max_bends) for a
+    round whose closest level scored `score`. Difficulty mostly follows the
+    snake count (2 points each), and bonus fill tops the count up with short
+    snakes, so lengths move with it: harder targets get more, shorter snakes,
+    easier targets fewer, longer ones (with more bends so they still fit).
+    """
+    arrow_count, min_len, max_len, min_bends, max_bends = params
+    low, high = target
+    if low is not None and high is not None:
+        goal = (low + high) / 2
+    else:
+        goal = low if low is not None else high
+    
+    ratio = min(2.0, max(0.5, goal / max(score, 1.0)))
+    step = 1 if ratio > 1 else -1
+    
+    new_min_len = max(2, int(round(min_len / ratio)))
+    new_max_len = max(new_min_len, int(round(max_len / ratio)))
+    max_count = max(1, playable_cells // new_min_len)
+    new_count = min(max_count, max(1, int(round(arrow_count * ratio))))
+    if new_count == arrow_count:
+        new_count = min(max_count, max(1, arrow_count + step))
+    new_max_bends = max(min_bends, int(round(max_bends / ratio)))
+    if new_max_bends == max_bends:
+        new_max_bends = max(min_bends, max_bends - step)
+    return new_count, new_min_len, new_max_len, min_bends, new_max_bends
+
+
+# Attempts per level. Large loads run LARGE_LOAD_RETRIES of them in sequential
+# mode (10s per gen * 20 retries = 200s is too long); pooled attempts share the
+# wall clock, so pooled runs keep all MAX_RETRIES.
+MAX_RETRIES = 20
+LARGE_LOAD_RETRIES = 5
+
+
+def is_large_load(rows, cols, arrow_count):
+    """Large grid (50x50 cells or more) or heavy load (more than 200 arrows)."""
+    return rows * cols >= 2500 or arrow_count > 200
+
+
+def attempt_plan(rows, cols, arrow_count, workers=None):
+    """
+    (workers, attempts) of a request: workers resolved like generate_level does
+    (None = attempt_pool.default_workers) and its attempt count. The attempt count
+    is the only way the worker setting changes a seeded level.
+    """
+    large_load = is_large_load(rows, cols, arrow_count)
+    if workers is None:
+        workers = attempt_pool.default_workers(large_load=large_load)
+    if workers <= 1 and large_load:
+        return workers, LARGE_LOAD_RETRIES
+    return workers, MAX_RETRIES
+
+
+def parse_custom_grid(custom_grid):
+    """
+    Grid dimensions and playable cells from a request grid.
+    No grid = open 10x10. Returns (rows, cols, valid_cells).
+    """
+    if not custom_grid:
+        rows, cols = 10, 10
+        return rows, cols, set((r, c) for r in range(rows) for c in range(cols))
+    
+    rows = len(custom_grid)
+    cols = len(custom_grid[0]) if rows > 0 else 0
+    valid_cells = set()
+    for r in range(rows):
+        for c in range(cols):
+            # Support boolean, integer (0/1), or string ("1"/"true")
+            cell = custom_grid[r][c]
+            is_valid = False
+            if isinstance(cell, str):
+                is_valid = cell.lower() in ('1', 'true')
+            else:
+                is_valid = bool(cell) # Handles 1/True
+            
+            if is_valid:
+                valid_cells.add((r, c))
+    return rows, cols, valid_cells
+
 
 def generate_level(arrow_count, custom_grid=None, 
                    min_arrow_length=3, max_arrow_length=10, 
                    min_bends=0, max_bends=10, 
                    obstacles_input=None, color_list=None,
                    strategy_name='SMART_DYNAMIC',
-                   bonus_fill=True):
+                   bonus_fill=True,
+                   workers=None,
+                   time_budget_ms=None,
+                   seed=None,
+                   on_event=None,
+                   log_listener=None,
+                   cancel_event=None,
+                   target_difficulty=None):
+    """
+    workers: Process count for running attempts in parallel (0/1 = sequential;
+             None = GENERATOR_WORKERS env, or when unset a pool of up to 4 for
+             grids of 2500+ cells / 200+ arrows and sequential otherwise).
+    time_budget_ms: Wall-clock budget. Generation runs anytime-style: attempts and
+                    strategies stop at the deadline and the best level so far is returned
+                    with 'timed_out' = True.
+    seed: Request seed (None = random). Attempt i always runs with the i-th seed drawn
+          from it, so the same seed and parameters give the same level, sequential or
+          pooled, for the same attempt count (attempt_plan). Echoed back as 'seed'.
+          workers changes the level of a large load only: it runs LARGE_LOAD_RETRIES
+          attempts sequentially but MAX_RETRIES pooled. A time budget that cuts the
+          run short ('timed_out') makes the level depend on machine load.
+    on_event: Optional callback(event, data) for progress events:
+              'start' (attempts_total, seed), 'attempt_started' (attempt),
+              'snake_placed' (snakes_placed), 'attempt_finished' (attempt, attempts_done,
+              snakes_placed, coverage_percent, is_solvable, best_coverage, best_solvable,
+              elapsed_ms). Attempt starts and snake counts are live in sequential mode;
+              pooled attempts report when they finish.
+    log_listener: Optional callback(message, args) receiving strategy log records as they
+                  are logged (sequential mode). Formatting is left to the listener.
+    cancel_event: Optional threading.Event. Once set, the running attempt stops placing
+                  snakes (sequential mode), no further attempts start and the best level
+                  so far is returned with 'cancelled' = True.
+    target_difficulty: Optional (min, max) difficulty score band (either bound may be None).
+                       Attempts then run in rounds of DIFFICULTY_ROUND_SIZE, each level is
+                       scored in its worker, and arrow count, length and bends are adapted
+                       between rounds until a solvable level lands in the band (or the
+                       attempts run out; the closest level is returned). 'search_round'
+                       events report each round's parameters, and the result carries
+                       'difficulty_score', 'target_met' and 'candidates_evaluated'.
+    """
                          
     logs = []
+    start_time = time.time()
+    # Wall clock (not perf_counter) so pool workers can share the deadline
+    deadline = start_time + time_budget_ms / 1000 if time_budget_ms else None
     
     # 1. Parse Input & Validate
-    if not custom_grid:
-        ROWS, COLS = 10, 10
-        valid_cells = set((r, c) for r in range(ROWS) for c in range(COLS))
-    else:
-        ROWS = len(custom_grid)
-        COLS = len(custom_grid[0]) if ROWS > 0 else 0
-        valid_cells = set()
-        for r in range(ROWS):
-            for c in range(COLS):
-                # Support boolean, integer (0/1), or string ("1"/"true")
-                cell = custom_grid[r][c]
-                is_valid = False
-                if isinstance(cell, str):
-                    is_valid = cell.lower() in ('1', 'true')
-                else:
-                    is_valid = bool(cell) # Handles 1/True
-                
-                if is_valid:
-                    valid_cells.add((r, c))
+    ROWS, COLS, valid_cells = parse_custom_grid(custom_grid)
                     
     # 2. Setup Obstacles
     obstacles_map = {}
@@ -72,76 +273,197 @@ def generate_level(arrow_count, custom_grid=None,
          from .strategies.smart_dynamic import SmartDynamicStrategy
          StrategyClass = SmartDynamicStrategy
 
-    MAX_RETRIES = 20
+    # Optimization: For large grids or high arrow counts, reduce retries to avoid timeout
+    # (large loads are pooled by default when the machine has the cores, and keep all of them).
+    workers, max_retries = attempt_plan(ROWS, COLS, arrow_count, workers)
+    pooled = workers > 1
     
-    # Optimization: For large grids or high arrow counts, reduce retries to avoid timeout.
-    # 10s per gen * 20 retries = 200s (Too long).
-    is_large_grid = (ROWS * COLS) >= 2500 # 50x50
-    is_heavy_load = arrow_count > 200
+    if pooled:
+        logs.append(f"Parallel mode: {max_retries} attempt(s) across {workers} workers.")
+    elif max_retries < MAX_RETRIES:
+        logs.append(f"Large Grid/Heavy Load detected. Restricted to {max_retries} attempt(s) for speed.")
+    if seed is None:
+        seed = random.getrandbits(32)
+    logs.append(f"Seed: {seed}")
+    seed_rng = random.Random(seed)
+    attempt_seeds = [seed_rng.getrandbits(32) for _ in range(max_retries)]
+    
+    if target_difficulty is not None:
+        low, high = target_difficulty
+        if low is not None and high is not None and low > high:
+            raise ValueError("target_difficulty: min is above max")
+        target_difficulty = (low, high)
+        round_size = DIFFICULTY_ROUND_SIZE
+        logs.append(f"Difficulty search: target {low if low is not None else '-'} to {high if high is not None else '-'}, "
+                    f"rounds of {round_size} attempt(s).")
+    else:
+        round_size = max_retries
     
-    if is_large_grid or is_heavy_load:
-        MAX_RETRIES = 5
-        logs.append(f"Large Grid/Heavy Load detected. Restricted to {MAX_RETRIES} attempt(s) for speed.")
     best_result = None
     best_score = -1 # Score = (Solvable * 1000) + Coverage_Percent
+    best_attempt = max_retries
     
-    for attempt in range(MAX_RETRIES):
-        # Create fresh strategy instance
-        strategy = StrategyClass(ROWS, COLS, valid_cells, obstacles_map, color_list)
-        
-        # Override ENABLE_BONUS_FILL based on client request
-        strategy.ENABLE_BONUS_FILL = bonus_fill
+    def emit(event, **data):
+        if on_event is not None:
+            on_event(event, data)
+    
+    def start_attempts(params, first, last):
+        """Yield (attempt, result) for attempts first..last-1 run with these generation params."""
+        attempt_args = (StrategyClass, ROWS, COLS, valid_cells, obstacles_map, color_list, bonus_fill) + params
+        if target_difficulty is not None:
+            attempt_fn = functools.partial(run_attempt, difficulty_obstacles=obstacles_input or [])
+        else:
+            attempt_fn = run_attempt
         
-        # Run Generation
-        result = strategy.generate(arrow_count, min_arrow_length, max_arrow_length, min_bends, max_bends)
+        if pooled:
+            # Results arrive in completion order
+            for i, result in attempt_pool.run_unordered(
+                attempt_fn, [attempt_args + (attempt_seeds[a], deadline) for a in range(first, last)], workers
+            ):
+                yield first + i, result
+            return
         
-        final_snakes = result['snakes']
-        current_logs = result['logs'] # Capture logs from this attempt
-        occupied = result['occupied']
+        on_snake_placed = (lambda n: emit('snake_placed', snakes_placed=n)) if on_event else None
+        for attempt in range(first, last):
+            emit('attempt_started', attempt=attempt + 1, snakes_placed=0)
+            yield attempt, attempt_fn(*attempt_args, attempt_seeds[attempt], deadline,
+                                      cancel_event, on_snake_placed, log_listener)
+    
+    emit('start', attempts_total=max_retries, seed=seed)
+    
+    params = (arrow_count, min_arrow_length, max_arrow_length, min_bends, max_bends)
+    best_params = params
+    attempts_run = 0
+    timed_out = False
+    cancelled = False
+    perfect = False
+    first_perfect = None # (attempt, result) of the earliest perfect attempt so far
+    target_met = False
+    for first in range(0, max_retries, round_size):
+        last = min(first + round_size, max_retries)
+        if target_difficulty is not None:
+            search_round = first // round_size + 1
+            emit('search_round', round=search_round, arrow_count=params[0],
+                 max_arrow_length=params[2], max_bends=params[4])
+            if search_round > 1:
+                logs.append(f"Round {search_round}: arrow_count {params[0]}, length {params[1]}-{params[2]}, "
+                            f"bends {params[3]}-{params[4]}")
         
-        # Calculate Stats
-        filled_count = len(occupied)
-        total_playable = len(valid_cells)
-        coverage_percent = 0
-        if total_playable > 0:
-            coverage_percent = int(filled_count/total_playable*100)
+        attempts = start_attempts(params, first, last)
+        done = set()
+        round_best = None
+        for attempt, result in attempts:
+            attempts_run += 1
+            done.add(attempt)
+            coverage_percent = result['coverage_percent']
+            is_solvable = result['is_solvable']
             
-        # Validation Check
-        val_result = validate_level(final_snakes, obstacles_map, ROWS, COLS)
-        
-        # Scoring
-        is_solvable = val_result['is_solvable']
-        score = (1000 if is_solvable else 0) + coverage_percent
-        
-        # Update Best Result if this is better
-        if score > best_score:
-            best_score = score
-            best_result = {
-                'level_json_data': create_level_json(final_snakes, obstacles_map, ROWS, COLS, color_list),
-                'logs': current_logs + [f"Attempt {attempt+1}/{MAX_RETRIES}: Coverage {coverage_percent}% | Solvable: {is_solvable}"],
-                'is_solvable': is_solvable,
-                'stuck_count': val_result['remained_count'],
-                'val_logs': val_result['logs']
-            }
+            # Update Best Result if this is better (ties go to the earlier attempt).
+            # Only the raw result is kept, JSON and logs are built for the winner at the end.
+            if target_difficulty is not None:
+                score = target_rank(result, target_difficulty)
+                if round_best is None or score > round_best[0] or \
+                        (score == round_best[0] and attempt < round_best[1]):
+                    round_best = (score, attempt, result)
+            else:
+                score = (1000 if is_solvable else 0) + coverage_percent
+            if best_result is None or score > best_score or (score == best_score and attempt < best_attempt):
+                best_score = score
+                best_attempt = attempt
+                best_result = result
+                best_params = params
+            
+            event = dict(attempt=attempt + 1, attempts_done=attempts_run,
+                         snakes_placed=len(result['snakes']), coverage_percent=coverage_percent,
+                         is_solvable=is_solvable, best_coverage=best_result['coverage_percent'],
+                         best_solvable=best_result['is_solvable'],
+                         elapsed_ms=int((time.time() - start_time) * 1000))
+            if target_difficulty is not None:
+                event.update(difficulty_score=result['difficulty_score'],
+                             best_difficulty=best_result['difficulty_score'])
+            emit('attempt_finished', **event)
+            
+            if target_difficulty is not None:
+                # In range: stop once every earlier attempt of the round is in (pooled
+                # attempts finish out of order), so the earliest hit always wins
+                if best_score[0] == 1 and all(a in done for a in range(first, best_attempt)):
+                    target_met = True
+                    break
+            else:
+                # If perfect (Solvable + >95% coverage), stop early. Pooled attempts finish
+                # out of order: wait for every earlier attempt and keep the earliest perfect
+                # one (a later one may cover more), exactly what a sequential run returns.
+                if is_solvable and coverage_percent >= 95 and (first_perfect is None or attempt < first_perfect[0]):
+                    first_perfect = (attempt, result)
+                if first_perfect is not None and all(a in done for a in range(first_perfect[0])):
+                    best_attempt, best_result = first_perfect
+                    best_score = 1000 + best_result['coverage_percent']
+                    best_params = params
+                    perfect = True
+                    break
             
-        # If perfect (Solvable + >95% coverage), stop early
-        if is_solvable and coverage_percent >= 95:
-             best_result['logs'].append("Perfect result found. Stopping retries.")
-             break
+            # Out of time: keep the best level found so far
+            if deadline is not None and time.time() >= deadline:
+                timed_out = True
+                break
+            
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
+        
+        # Cancels pooled attempts that have not started yet
+        attempts.close()
+        if target_met or perfect or timed_out or cancelled:
+            break
+        if target_difficulty is not None:
+            params = adapt_difficulty_params(params, round_best[2]['difficulty_score'],
+                                             target_difficulty, len(valid_cells))
+    
+    # The deadline can also cut the strategy of the last (or a perfect) attempt short
+    if deadline is not None and time.time() >= deadline:
+        timed_out = True
+    elapsed_ms = int((time.time() - start_time) * 1000)
+    if timed_out:
+        logs.append(f"Time budget of {time_budget_ms} ms reached after {attempts_run} attempt(s).")
+    if cancelled:
+        logs.append(f"Cancelled after {attempts_run} attempt(s).")
+    if target_difficulty is not None:
+        if target_met:
+            logs.append(f"Difficulty {best_result['difficulty_score']} in target range after {attempts_run} candidate(s) "
+                        f"(arrow_count {best_params[0]}, length {best_params[1]}-{best_params[2]}, "
+                        f"bends {best_params[3]}-{best_params[4]}).")
+        else:
+            logs.append(f"Target difficulty not reached after {attempts_run} candidate(s). "
+                        f"Closest: {best_result['difficulty_score']}.")
     
     # Use best result
-    final_logs = logs + best_result['logs']
+    final_logs = logs + format_records(best_result['log_records'])
+    final_logs.append(f"Attempt {best_attempt+1}/{max_retries}: Coverage {best_result['coverage_percent']}% | Solvable: {best_result['is_solvable']}")
+    if perfect:
+        final_logs.append("Perfect result found. Stopping retries.")
     final_logs.append("--- Solvability Check ---")
-    final_logs.extend(best_result['val_logs'])
+    final_logs.extend(validate_level(best_result['snakes'], obstacles_map, ROWS, COLS)['logs'])
     
     if not best_result['is_solvable']:
         final_logs.append(f"WARNING: Level is STUCK. Remained: {best_result['stuck_count']}")
 
     return {
-        'level_json': best_result['level_json_data'],
+        'level_json': create_level_json(best_result['snakes'], obstacles_map, ROWS, COLS, color_list),
         'logs': final_logs,
         'is_solvable': best_result['is_solvable'],
         'stuck_count': best_result['stuck_count'],
+        'coverage_percent': best_result['coverage_percent'],
         'grid_rows': ROWS,  # Return grid dimensions used
-        'grid_cols': COLS
+        'grid_cols': COLS,
+        'attempts': attempts_run,
+        'seed': seed,
+        'cancelled': cancelled,
+        'timed_out': timed_out,
+        'elapsed_ms': elapsed_ms,
+        'time_budget_ms': time_budget_ms,
+        'budget_used_percent': round(elapsed_ms / time_budget_ms * 100, 1) if time_budget_ms else None,
+        'target_difficulty': list(target_difficulty) if target_difficulty is not None else None,
+        'difficulty_score': best_result['difficulty_score'],
+        'target_met': target_met,
+        'candidates_evaluated': attempts_run
     }
@@ -0,0 +1,84 @@
+"""
+Attempt Pool
+
+Persistent process pool for running generation attempts in parallel.
+Workers are pre-warmed with the Numba kernels, so the first attempt each one
+runs does not pay JIT compilation.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+# Pool size for large generations when GENERATOR_WORKERS is not set
+LARGE_LOAD_WORKERS = 4
+
+
+def default_workers(large_load=False):
+    """
+    Worker count from GENERATOR_WORKERS (0 or 1 = sequential generation).
+    When it is not set, large loads (big grids / high arrow counts) get a pool of
+    min(cpu_count, LARGE_LOAD_WORKERS) and everything else runs sequentially.
+    """
+    value = os.getenv('GENERATOR_WORKERS')
+    if value is None:
+        return min(os.cpu_count() or 1, LARGE_LOAD_WORKERS) if large_load else 0
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def _init_worker():
+    from . import optimized_ops
+    elapsed = optimized_ops.warm_up()
+    print(f"[AttemptPool] Worker {os.getpid()} warm-up took {elapsed * 1000:.0f} ms")
+
+
+def get_pool(workers):
+    """Return the shared pool, (re)creating it if the worker count changed."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: Numba's threading layer is not fork-safe, and it is the only option on Windows
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def run_unordered(fn, arg_list, workers):
+    """
+    Submit fn(*args) for every args tuple and yield (index, result) as they complete.
+    Closing the generator early (break + close()) cancels the calls that have not started.
+    """
+    pool = get_pool(workers)
+    futures = {pool.submit(fn, *args): i for i, args in enumerate(arg_list)}
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,184 @@
+"""
+Batch Generation
+
+Generates level packs: a list of generate_level parameter sets (or one set
+repeated over N seeds) run across the attempt process pool. Each level runs
+its attempts sequentially inside one worker, so the pool parallelises whole
+levels. Records are yielded as levels complete and can be written to a
+directory (one Unity JSON per level) or a single NDJSON file, with a summary
+CSV of coverage, solvability, difficulty and generation time.
+"""
+import csv
+import inspect
+import json
+import os
+import time
+
+from . import attempt_pool
+from .algorithm import generate_level
+from .difficulty_calculator import calculate
+from .json_builder import level_json_to_snakes
+
+MAX_BATCH_SIZE = 1000
+
+# generate_level arguments a batch entry may set (runtime hooks are not serialisable)
+BATCH_PARAMS = tuple(
+    name for name in inspect.signature(generate_level).parameters
+    if name not in ('workers', 'on_event', 'log_listener', 'cancel_event')
+)
+
+SUMMARY_FIELDS = [
+    'index', 'file', 'seed', 'strategy', 'snakes', 'coverage_percent', 'is_solvable',
+    'stuck_count', 'difficulty_score', 'generation_ms', 'error'
+]
+
+
+def expand_batch(params=None, param_sets=None, seeds=None, count=None):
+    """
+    Batch request -> list of generate_level keyword arguments.
+
+    param_sets: Explicit list of parameter sets, used as given.
+    params: One parameter set, repeated once per entry of `seeds`, or `count` times.
+            With `count` and a 'seed' in params, seeds run seed, seed + 1, ...;
+            without one every level draws its own seed (echoed in its record).
+    Raises ValueError on unknown parameters or an empty / oversized batch.
+    """
+    if param_sets is not None:
+        if params is not None or seeds is not None or count is not None:
+            raise ValueError("param_sets cannot be combined with params, seeds or count")
+        batch = [dict(p) for p in param_sets]
+    elif params is not None:
+        if seeds is not None:
+            batch = [{**params, 'seed': int(seed)} for seed in seeds]
+        else:
+            count = 1 if count is None else int(count)
+            start = params.get('seed')
+            batch = [{**params, 'seed': None if start is None else int(start) + i} for i in range(count)]
+    else:
+        raise ValueError("Batch needs params or param_sets")
+
+    if not batch:
+        raise ValueError("Batch is empty")
+    if len(batch) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch too large ({len(batch)} levels, max {MAX_BATCH_SIZE})")
+    for entry in batch:
+        unknown = sorted(set(entry) - set(BATCH_PARAMS))
+        if unknown:
+            raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+        if 'arrow_count' not in entry:
+            raise ValueError("Every parameter set needs arrow_count")
+    return batch
+
+
+def run_batch_item(index, params):
+    """
+    Generate one level of a batch (runs in a pool worker). Returns its record:
+    summary fields plus level_json and grid size. Failures become an 'error' record.
+    """
+    start = time.perf_counter()
+    try:
+        result = generate_level(workers=0, **params)
+        rows, cols = result['grid_rows'], result['grid_cols']
+        snakes = level_json_to_snakes(result['level_json'], rows, cols)
+        difficulty_score = result['difficulty_score'] # Set by difficulty-targeted searches
+        if difficulty_score is None:
+            difficulty_score = calculate(snakes, params.get('obstacles_input') or [], rows, cols)['difficulty_score']
+        return {
+            'index': index,
+            'seed': result['seed'],
+            'strategy': params.get('strategy_name', 'SMART_DYNAMIC'),
+            'snakes': len(snakes),
+            'coverage_percent': result['coverage_percent'],
+            'is_solvable': result['is_solvable'],
+            'stuck_count': result['stuck_count'],
+            'difficulty_score': difficulty_score,
+            'generation_ms': result['elapsed_ms'],
+            'grid_rows': rows,
+            'grid_cols': cols,
+            'level_json': result['level_json']
+        }
+    except Exception as e:
+        print(f"[Batch] Level {index} failed: {e}")
+        return {
+            'index': index,
+            'seed': params.get('seed'),
+            'strategy': params.get('strategy_name', 'SMART_DYNAMIC'),
+            'generation_ms': int((time.perf_counter() - start) * 1000),
+            'error': str(e)
+        }
+
+
+def run_batch(batch, workers=None):
+    """
+    Yield a record per parameter set in completion order.
+    workers: Pool size (None = GENERATOR_WORKERS, 0 or 1 = sequential in this process).
+    """
+    if workers is None:
+        workers = attempt_pool.default_workers()
+    workers = min(workers, len(batch))
+
+    if workers > 1:
+        for _, record in attempt_pool.run_unordered(run_batch_item, list(enumerate(batch)), workers):
+            yield record
+    else:
+        for index, params in enumerate(batch):
+            yield run_batch_item(index, params)
+
+
+def summary_row(record, file=''):
+    """Summary CSV row for a record."""
+    row = {field: record.get(field, '') for field in SUMMARY_FIELDS}
+    row['file'] = file
+    return row
+
+
+class PackWriter:
+    """
+    Writes batch records as they arrive.
+
+    out_dir: Directory for level_<n>.json files (Unity level_json, n = index + 1).
+    ndjson_path: Single NDJSON file, one record per line.
+    summary_path: Summary CSV (SUMMARY_FIELDS), flushed per level.
+    """
+
+    def __init__(self, out_dir=None, ndjson_path=None, summary_path=None):
+        self.out_dir = out_dir
+        self.count = 0
+        self.failed = 0
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        self._ndjson = open(ndjson_path, 'w', encoding='utf-8') if ndjson_path else None
+        self._summary_file = None
+        self._summary = None
+        if summary_path:
+            self._summary_file = open(summary_path, 'w', encoding='utf-8', newline='')
+            self._summary = csv.DictWriter(self._summary_file, fieldnames=SUMMARY_FIELDS)
+            self._summary.writeheader()
+
+    def write(self, record):
+        self.count += 1
+        file = ''
+        if 'error' in record:
+            self.failed += 1
+        elif self.out_dir:
+            file = f"level_{record['index'] + 1}.json"
+            with open(os.path.join(self.out_dir, file), 'w', encoding='utf-8') as f:
+                json.dump(record['level_json'], f)
+
+        if self._ndjson:
+            self._ndjson.write(json.dumps(record) + '\n')
+            self._ndjson.flush()
+        if self._summary:
+            self._summary.writerow(summary_row(record, file))
+            self._summary_file.flush()
+
+    def close(self):
+        for f in (self._ndjson, self._summary_file):
+            if f:
+                f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -4,9 +4,18 @@ Calculates difficulty score for snake levels based on:
 - S (Snake Load): 30 pts max
 - F (Freedom): 40 pts max  
 - O (Obstacles): 30 pts max
+
+calculate packs all snake paths into one NumPy array per call; bounds, corner
+counts and the solve (one occupancy grid, one solver pass) all work on it.
+calculate_reference is the original per-point implementation.
 """
+from itertools import chain
+
+import numpy as np
 
 from app.services.validator import validate_level
+from app.services import optimized_ops
+from app.services import solver
 
 def normalize(val, min_val, max_val):
     """Normalize value to 0-1 range"""
@@ -85,54 +94,379 @@ def calculate_bounding_box(snakes, obstacles):
     return (max_r - min_r + 1), (max_c - min_c + 1)
 
 
-def check_movable(snake, all_snakes, obstacles_map, rows, cols):
-    """Check if snake head can move in any direction"""
-    path = snake.get('path', [])
-    if not path: return False
+def pack_paths(snakes):
+    """
+    All snake paths as one int64 (N, 2) array of (row, col), plus the path
+    length of every snake. Points may be (r, c) sequences or {'row', 'col'} dicts.
+    """
+    paths = [s.get('path', []) for s in snakes]
+    lengths = np.fromiter(map(len, paths), dtype=np.int64, count=len(paths))
+    count = 2 * int(lengths.sum())
+    try:
+        # Fast path: every point is an (r, c) pair
+        flat = np.fromiter(chain.from_iterable(chain.from_iterable(paths)), dtype=np.int64, count=count)
+    except (TypeError, ValueError):
+        points = ((p.get('row', 0), p.get('col', 0)) if isinstance(p, dict) else (p[0], p[1])
+                  for path in paths for p in path)
+        flat = np.fromiter(chain.from_iterable(points), dtype=np.int64, count=count)
+    return flat.reshape(-1, 2), lengths
+
+
+def obstacle_positions(obstacles):
+    """Every obstacle cell as (row, col), as calculate_bounding_box reads them."""
+    positions = []
+    for obs in obstacles:
+        cells = obs.get('cells', [])
+        if cells:
+            for cell in cells:
+                if isinstance(cell, dict):
+                    positions.append((cell.get('row', 0), cell.get('col', 0)))
+                else:
+                    positions.append((cell[0], cell[1]))
+        else:
+            positions.append((obs.get('row', 0), obs.get('col', 0)))
+    return positions
+
+
+def packed_bounds(cells, obstacles):
+    """calculate_bounding_box over packed snake cells."""
+    positions = obstacle_positions(obstacles)
+    if positions:
+        cells = np.concatenate((cells, np.array(positions, dtype=np.int64)))
+    if len(cells) == 0:
+        return 1, 1
     
-    def get_rc(p):
-        if isinstance(p, dict): return p.get('row'), p.get('col')
-        return p[0], p[1]
-        
-    head_r, head_c = get_rc(path[-1])
+    low = cells.min(axis=0)
+    high = cells.max(axis=0)
+    return int(high[0] - low[0] + 1), int(high[1] - low[1] + 1)
+
+
+def obstacle_stats(obstacles):
+    """
+    Obstacle pass of calculate.
+    Returns (obstacles_map, O score, obstacle cell count).
+    """
+    obstacles_map = {}
     
-    neighbors = [
-        (head_r - 1, head_c), (head_r + 1, head_c),
-        (head_r, head_c - 1), (head_r, head_c + 1)
-    ]
+    wall_count = 0
+    hole_count = 0
+    tunnel_pair_count = 0 
+    wall_break_count = 0
+    iced_locked_count = 0
+    key_locked_count = 0
+    obstacle_cells = 0
     
-    for nr, nc in neighbors:
-        if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
-            continue
-            
-        if (nr, nc) in obstacles_map:
-            obs = obstacles_map[(nr, nc)]
-            o_type = obs.get('type')
-            if o_type in ['wall', 'wall_break', 'iced_snake', 'key_snake']:
-                continue
-        
-        is_blocked_by_snake = False
-        for s in all_snakes:
-            s_path = s.get('path', [])
-            for p in s_path:
-                sr, sc = get_rc(p)
-                if sr == nr and sc == nc:
-                    is_blocked_by_snake = True
-                    break
-            if is_blocked_by_snake: break
+    for obs in obstacles:
+        o_type = obs.get('type')
+        cells = obs.get('cells', [])
         
-        if is_blocked_by_snake:
-            continue
+        # Populate map
+        if cells:
+            for c in cells:
+                obstacles_map[(c['row'], c['col'])] = obs
+                obstacle_cells += 1
+        else:
+            obstacles_map[(obs['row'], obs['col'])] = obs
+            obstacle_cells += 1
+             
+        # Count by type
+        if o_type == 'wall':
+            wall_count += len(cells) if cells else 1
+        elif o_type == 'hole':
+            hole_count += 1
+        elif o_type == 'tunnel':
+            tunnel_pair_count += 0.5
+        elif o_type == 'wall_break':
+            wall_break_count += 1
+        elif o_type == 'iced_snake':
+            iced_locked_count += 1
+        elif o_type == 'key_snake':
+            key_locked_count += 1
             
-        return True
-        
-    return False
+    tunnel_pair_count = int(tunnel_pair_count)
+    
+    # Weighted sum trực tiếp, không cap
+    O = (wall_count * 1.0) + \
+        (hole_count * 2.5) + \
+        (tunnel_pair_count * 3.0) + \
+        (wall_break_count * 3.0) + \
+        (iced_locked_count * 5.0) + \
+        (key_locked_count * 5.0)
+    return obstacles_map, O, obstacle_cells
+
+
+def corner_flags(cells, lengths):
+    """Bool per packed point: the path turns there (get_snake_corners, for all paths at once)."""
+    flags = np.zeros(len(cells), dtype=bool)
+    if len(cells) < 3:
+        return flags
+    step = np.diff(cells, axis=0)
+    flags[1:-1] = np.any(step[1:] != step[:-1], axis=1)
+    
+    # Only interior points of a path can be corners
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    local = np.arange(len(cells)) - starts
+    flags &= (local >= 1) & (local <= np.repeat(lengths, lengths) - 2)
+    return flags
+
+
+def count_corners(cells, lengths):
+    """Sum of get_snake_corners over all packed paths."""
+    return int(np.count_nonzero(corner_flags(cells, lengths)))
+
+
+def solve_stats(cells, lengths, obstacles_map, rows, cols):
+    """
+    (steps, avg_stuck_ratio) of validate_level for packed paths: one occupancy
+    grid and one solver pass, no logs. Paths shorter than 2 are skipped, as in
+    the validator.
+    """
+    keep = lengths >= 2
+    if not keep.any():
+        return 0, 0
+    solver_cells = cells[np.repeat(keep, lengths)]
+    offsets = np.concatenate(([0], np.cumsum(lengths[keep])))
+    occ = solver.build_occupancy(solver_cells, offsets, obstacles_map.keys(), rows, cols)
+    removed_step, steps = optimized_ops.solve_removal_numba(rows, cols, occ, solver_cells, offsets)
+    return int(steps), solver.avg_stuck_ratio(removed_step, int(steps))
+
+
+# Obstacle types a head cannot step onto (holes and tunnels can be entered)
+BLOCKING_OBSTACLES = ('wall', 'wall_break', 'iced_snake', 'key_snake')
+
+
+def free_cells(cells, obstacles_map, rows, cols):
+    """Bool grid of cells a head can step onto: no snake cell and no blocking obstacle."""
+    free = np.ones((rows, cols), dtype=bool)
+    for (r, c), obs in obstacles_map.items():
+        if 0 <= r < rows and 0 <= c < cols and obs.get('type') in BLOCKING_OBSTACLES:
+            free[r, c] = False
+    if len(cells):
+        inside = (cells[:, 0] >= 0) & (cells[:, 0] < rows) & (cells[:, 1] >= 0) & (cells[:, 1] < cols)
+        free[cells[inside, 0], cells[inside, 1]] = False
+    return free
+
+
+def heads_movable(free, heads):
+    """Whether each (row, col) head has a free in-grid neighbour."""
+    rows, cols = free.shape
+    movable = np.zeros(len(heads), dtype=bool)
+    for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        nr = heads[:, 0] + dr
+        nc = heads[:, 1] + dc
+        inside = (nr >= 0) & (nr < rows) & (nc >= 0) & (nc < cols)
+        movable[inside] |= free[nr[inside], nc[inside]]
+    return movable
+
+
+def check_movable(snake, all_snakes, obstacles_map, rows, cols):
+    """Check if snake head can move in any direction"""
+    path = snake.get('path', [])
+    if not path: return False
+    cells, _ = pack_paths(all_snakes)
+    head, _ = pack_paths([{'path': path[-1:]}])
+    return bool(heads_movable(free_cells(cells, obstacles_map, rows, cols), head)[0])
 
 
 def calculate(snakes, obstacles, rows=None, cols=None):
     """
     Calculate difficulty score for a level.
     
+    Args:
+        snakes: List of snake data
+        obstacles: List of obstacle data
+        rows, cols: Grid size from settings (used for validation)
+    
+    Grid bounds (bounding box) are calculated from data for density calculation.
+    But validator uses rows/cols from settings to determine exits.
+    Same result as calculate_reference, computed on packed paths.
+    """
+    cells, lengths = pack_paths(snakes)
+    
+    # Calculate grid bounds from data
+    bounds_h, bounds_w = packed_bounds(cells, obstacles)
+    grid_area = bounds_h * bounds_w
+    
+    if grid_area == 0:
+        return {"difficulty_score": 0, "breakdown": {"S": 0, "F": 0, "O": 0}}
+
+    obstacles_map, O, obstacle_cells = obstacle_stats(obstacles)
+
+    # --- S: Snake Load ---
+    total_snakes = len(snakes)
+    if total_snakes == 0:
+        return {"difficulty_score": 0, "breakdown": {"S": 0, "F": 0, "O": 0}}
+    
+    snake_cells = int(lengths.sum())
+    avg_dot = snake_cells / total_snakes
+    avg_corner = count_corners(cells, lengths) / total_snakes
+    
+    s_count = total_snakes * 2
+    s_len = avg_dot * 0.25
+    s_corner = avg_corner * 0.5
+    
+    S = s_count + s_len + s_corner
+
+    # --- F: Freedom ---
+    # Solve depth and per-step stuck ratio (rows/cols from settings determine exit edges)
+    validate_rows = rows if rows else bounds_h
+    validate_cols = cols if cols else bounds_w
+    
+    solve_depth, avg_stuck_ratio = solve_stats(cells, lengths, obstacles_map, validate_rows, validate_cols)
+    
+    f_stuck = avg_stuck_ratio * 5
+    f_grid = grid_area / 100
+    f_depth = solve_depth * 2
+    
+    F = f_stuck + f_grid + f_depth
+
+    total_score = S + F + O
+    
+    return {
+        "difficulty_score": round(total_score, 1),
+        "breakdown": {
+            "S": round(S, 1),
+            "F": round(F, 1),
+            "O": round(O, 1),
+        },
+        "details": {
+            "grid_bounds": f"{bounds_w}x{bounds_h}",
+            "total_snakes": total_snakes,
+            "solve_depth": solve_depth,
+            "occupied_cells": snake_cells + obstacle_cells
+        }
+    }
+
+
+SCORE_COLUMNS = ('difficulty_score', 'S', 'F', 'O', 'total_snakes', 'solve_depth',
+                 'occupied_cells', 'bounds_w', 'bounds_h', 'is_solvable')
+
+
+def score_levels(levels):
+    """
+    Score many levels in one pass.
+    
+    Args:
+        levels: List of (snakes, obstacles, rows, cols) as taken by calculate
+                (rows/cols may be None: bounding box).
+    
+    Returns:
+        Dict of NumPy columns (SCORE_COLUMNS), row i matching calculate(*levels[i]):
+        difficulty_score and the S/F/O breakdown, plus the details and the solver
+        verdict. Levels without snakes score 0. Ready for pandas.DataFrame(columns).
+    
+    All paths are packed into flat arrays (cells, snake offsets, level offsets);
+    bounds, corners and loads are per-level reductions and every level is solved
+    in one optimized_ops.validate_many call. validate_many runs in parallel, so
+    call this from the main thread of a process (Numba's TBB threading layer).
+    """
+    n = len(levels)
+    columns = {name: np.zeros(n, dtype=np.float64) for name in ('difficulty_score', 'S', 'F', 'O')}
+    if n == 0:
+        columns.update({name: np.zeros(0, dtype=np.int64) for name in SCORE_COLUMNS[4:9]})
+        columns['is_solvable'] = np.zeros(0, dtype=bool)
+        return columns
+    
+    # Pack every snake of every level
+    snake_counts = np.array([len(level[0]) for level in levels], dtype=np.int64)
+    cells, lengths = pack_paths([snake for level in levels for snake in level[0]])
+    snake_level = np.repeat(np.arange(n), snake_counts)
+    cell_level = np.repeat(snake_level, lengths)
+    cell_counts = np.bincount(cell_level, minlength=n)
+    
+    # Obstacles (few per level)
+    obstacle_maps = []
+    O = np.zeros(n, dtype=np.float64)
+    obstacle_counts = np.zeros(n, dtype=np.int64)
+    extra_positions = []
+    extra_level = []
+    for i, level in enumerate(levels):
+        positions = obstacle_positions(level[1])
+        extra_positions.extend(positions)
+        extra_level.extend([i] * len(positions))
+        obstacles_map, O[i], obstacle_counts[i] = obstacle_stats(level[1])
+        obstacle_maps.append(obstacles_map)
+    
+    # Bounding boxes: snake cells are contiguous per level, obstacles are added on top
+    low = np.full((n, 2), np.iinfo(np.int64).max, dtype=np.int64)
+    high = np.full((n, 2), np.iinfo(np.int64).min, dtype=np.int64)
+    has_cells = cell_counts > 0
+    if has_cells.any():
+        starts = (np.cumsum(cell_counts) - cell_counts)[has_cells]
+        low[has_cells] = np.minimum.reduceat(cells, starts, axis=0)
+        high[has_cells] = np.maximum.reduceat(cells, starts, axis=0)
+    if extra_positions:
+        positions = np.array(extra_positions, dtype=np.int64)
+        extra_level = np.array(extra_level, dtype=np.int64)
+        np.minimum.at(low, extra_level, positions)
+        np.maximum.at(high, extra_level, positions)
+    empty = (low[:, 0] > high[:, 0])
+    bounds = np.where(empty[:, None], 1, high - low + 1)
+    bounds_h, bounds_w = bounds[:, 0], bounds[:, 1]
+    grid_area = bounds_h * bounds_w
+    
+    # --- S: Snake Load ---
+    has_snakes = snake_counts > 0
+    total = np.maximum(snake_counts, 1)
+    corners = np.bincount(cell_level[corner_flags(cells, lengths)], minlength=n)
+    S = snake_counts * 2 + (cell_counts / total) * 0.25 + (corners / total) * 0.5
+    
+    # --- F: Freedom --- (paths shorter than 2 are skipped by the solver)
+    keep = lengths >= 2
+    solver_cells = cells[np.repeat(keep, lengths)]
+    snake_offsets = np.concatenate(([0], np.cumsum(lengths[keep])))
+    kept_counts = np.bincount(snake_level[keep], minlength=n)
+    level_offsets = np.concatenate(([0], np.cumsum(kept_counts)))
+    dims = np.empty((n, 2), dtype=np.int64)
+    for i, level in enumerate(levels):
+        rows, cols = level[2], level[3]
+        dims[i, 0] = rows if rows else bounds_h[i]
+        dims[i, 1] = cols if cols else bounds_w[i]
+    obstacle_cells = np.array([key for m in obstacle_maps for key in m], dtype=np.int64).reshape(-1, 2)
+    obstacle_offsets = np.concatenate(([0], np.cumsum([len(m) for m in obstacle_maps]))).astype(np.int64)
+    
+    results, removed_step = optimized_ops.validate_many(
+        solver_cells, snake_offsets.astype(np.int64), level_offsets.astype(np.int64),
+        dims, obstacle_cells, obstacle_offsets
+    )
+    steps = results[:, 2].astype(np.int64)
+    
+    # Stuck ratio per step (same arithmetic and summation order as solver.avg_stuck_ratio)
+    kept_level = snake_level[keep]
+    removed = removed_step > 0
+    width = int(steps.max()) + 1
+    removed_per_step = np.bincount(kept_level[removed] * width + removed_step[removed],
+                                   minlength=n * width).reshape(n, width)[:, 1:]
+    active = kept_counts[:, None] - (np.cumsum(removed_per_step, axis=1) - removed_per_step)
+    in_steps = np.arange(1, width) <= steps[:, None]
+    ratios = np.where(in_steps, (active - removed_per_step) / np.maximum(active, 1), 0.0)
+    ratio_sums = np.cumsum(ratios, axis=1)
+    avg_stuck_ratio = np.zeros(n, dtype=np.float64)
+    solved = steps > 0
+    avg_stuck_ratio[solved] = ratio_sums[solved, steps[solved] - 1] / steps[solved]
+    
+    F = avg_stuck_ratio * 5 + grid_area / 100 + steps * 2
+    total_score = S + F + O
+    
+    # Python round() per value: np.round can differ in the last digit
+    for name, values in (('difficulty_score', total_score), ('S', S), ('F', F), ('O', O)):
+        columns[name] = np.array([round(v, 1) if ok else 0.0 for v, ok in zip(values.tolist(), has_snakes)],
+                                 dtype=np.float64)
+    columns['total_snakes'] = snake_counts
+    columns['solve_depth'] = np.where(has_snakes, steps, 0)
+    columns['occupied_cells'] = np.where(has_snakes, cell_counts + obstacle_counts, 0)
+    columns['bounds_w'] = bounds_w
+    columns['bounds_h'] = bounds_h
+    columns['is_solvable'] = results[:, 0].astype(bool)
+    return columns
+
+
+def calculate_reference(snakes, obstacles, rows=None, cols=None):
+    """
+    Original per-point implementation of calculate (bounding box from a list of
+    every position, corners per path, paths converted to tuples for the validator).
+    Kept as the reference for calculate.
+    
     Args:
         snakes: List of snake data
         obstacles: List of obstacle data
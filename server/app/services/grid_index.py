@@ -0,0 +1,178 @@
+"""
+Grid Indexes
+
+Incrementally maintained views of a strategy's grid_array, updated as snakes
+are placed instead of being rebuilt from scratch.
+"""
+import random
+import numpy as np
+
+from . import optimized_ops
+
+
+class DistanceField:
+    """
+    BFS distance from exits (see optimized_ops.bfs_dist_map_numba), kept up to
+    date as cells become blocked.
+
+    Blocking cells only creates new exits, so distances never increase: each
+    update re-propagates from the neighbours of the new blockers and stops
+    where the old distances were already smaller.
+    """
+
+    def __init__(self, rows, cols, grid, boundary_dist=1):
+        self.rows = rows
+        self.cols = cols
+        self.grid = grid # Shared with the strategy (not copied)
+        self.boundary_dist = boundary_dist
+        self.dist = optimized_ops.bfs_dist_map_numba(rows, cols, grid, boundary_dist)
+
+    def block(self, cells):
+        """
+        Update after `cells` were set to non-free in the grid.
+        Returns the number of cells whose distance changed.
+        """
+        if not len(cells):
+            return 0
+        cell_arr = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        return optimized_ops.block_cells_dist_numba(
+            self.rows, self.cols, self.grid, self.dist, cell_arr, self.boundary_dist
+        )
+
+    def free_cells_by_depth(self):
+        """
+        Free cells, deepest first. Within a depth, fewest free neighbours first,
+        then row-major order.
+
+        Returns (cells (n, 2) int64, depths (n,) int32)
+        """
+        flat_dist = self.dist.ravel()
+        idx = np.flatnonzero((self.grid.ravel() == 0) & (flat_dist > 0))
+        free_n = optimized_ops.free_neighbor_counts_numba(self.rows, self.cols, self.grid).ravel()[idx]
+        depths = flat_dist[idx]
+        order = np.lexsort((idx, free_n, -depths))
+        idx = idx[order]
+        return np.stack((idx // self.cols, idx % self.cols), axis=1), depths[order]
+
+
+class CandidateQueue:
+    """
+    Start cells in priority order, consumed from the front.
+
+    Cells that get blocked after the queue was filled are skipped lazily
+    (checked against the grid when reached), so taking a batch costs the
+    batch plus the stale entries it passes over.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid # Shared with the strategy (not copied)
+        self.cells = np.empty((0, 2), dtype=np.int64)
+        self.head = 0
+
+    def __len__(self):
+        """Entries not consumed yet (including ones that may have gone stale)."""
+        return len(self.cells) - self.head
+
+    def reset(self, cells):
+        self.cells = np.ascontiguousarray(cells, dtype=np.int64).reshape(-1, 2)
+        self.head = 0
+
+    def take(self, count):
+        """Consume and return up to `count` cells that are still free."""
+        pos, self.head = optimized_ops.take_free_cells_numba(self.grid, self.cells, self.head, count)
+        return [tuple(p) for p in self.cells[pos].tolist()]
+
+    def peek(self, count):
+        """The next `count` entries, without consuming them."""
+        return [tuple(p) for p in self.cells[self.head:self.head + count].tolist()]
+
+
+class FreeCellIndex:
+    """
+    The set of free cells (grid == 0) as a dense array with swap-remove.
+
+    `items` holds the flat indices of free cells in its first `size` slots and
+    `pos` maps a flat index back to its slot (-1 once taken), so removing a
+    cell, counting and sampling are all O(1) per cell.
+    """
+
+    def __init__(self, rows, cols, grid):
+        self.rows = rows
+        self.cols = cols
+        self.items = np.flatnonzero(grid.ravel() == 0).astype(np.int64)
+        self.pos = np.full(rows * cols, -1, dtype=np.int64)
+        self.pos[self.items] = np.arange(len(self.items))
+        self.size = len(self.items)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, cell):
+        r, c = cell
+        return 0 <= r < self.rows and 0 <= c < self.cols and self.pos[r * self.cols + c] >= 0
+
+    def remove(self, cells):
+        """Take cells out of the index (cells that are not free are ignored)."""
+        items, pos = self.items, self.pos
+        for r, c in cells:
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                continue
+            flat = r * self.cols + c
+            i = pos[flat]
+            if i < 0:
+                continue
+            last = self.size - 1
+            moved = items[last]
+            items[i] = moved
+            pos[moved] = i
+            pos[flat] = -1
+            self.size = last
+
+    def cells(self):
+        """All free cells as (r, c) tuples (index order, not sorted)."""
+        flat = self.items[:self.size]
+        return list(zip((flat // self.cols).tolist(), (flat % self.cols).tolist()))
+
+    def sample(self, count, rng=random):
+        """Up to `count` distinct free cells in random order."""
+        picks = rng.sample(range(self.size), min(count, self.size))
+        flat = self.items[picks].tolist()
+        return [divmod(f, self.cols) for f in flat]
+
+    def choice(self, rng=random):
+        """One random free cell (the index must not be empty)."""
+        return divmod(int(self.items[rng.randrange(self.size)]), self.cols)
+
+
+class ExitMap:
+    """
+    Which head directions have a clear ray to the boundary, for every cell.
+
+    `exits[r, c, d]` matches is_exitable((r, c), DIRS[d]) without a path:
+    the ray from (r, c) hits no blocked cell (voids are passable). Placing a
+    snake only changes the rays along its rows and columns, so only those
+    are rescanned.
+    """
+
+    def __init__(self, rows, cols, grid):
+        self.rows = rows
+        self.cols = cols
+        self.grid = grid # Shared with the strategy (not copied)
+        self.exits = optimized_ops.exit_map_numba(rows, cols, grid)
+
+    def block(self, cells):
+        """Update after `cells` were set to blocked in the grid."""
+        if not len(cells):
+            return
+        cell_arr = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        optimized_ops.scan_exit_rows_numba(self.rows, self.cols, self.grid, self.exits, np.unique(cell_arr[:, 0]))
+        optimized_ops.scan_exit_cols_numba(self.rows, self.cols, self.grid, self.exits, np.unique(cell_arr[:, 1]))
+
+    def has_exit(self, cell):
+        """True if at least one direction is clear from this cell."""
+        return bool(self.exits[cell[0], cell[1]].any())
+
+    def has_exit_many(self, cells):
+        """has_exit for an (n, 2) array / list of cells, as a bool array."""
+        cell_arr = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        return self.exits[cell_arr[:, 0], cell_arr[:, 1]].any(axis=1)
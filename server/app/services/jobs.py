@@ -0,0 +1,196 @@
+"""
+Generation Jobs
+
+Runs generate_level out of band on a local thread pool, so long generations
+do not hold an HTTP request open. Jobs report progress (attempt, snakes
+placed, best coverage) and can be cancelled: the cancel event is checked by
+the strategy loops and between attempts, and the best level so far is kept.
+
+Progress events are kept per job and can be followed live with stream()
+(served as Server-Sent Events). Strategy log lines are only formatted into
+events while somebody is streaming.
+
+Finished jobs are kept for JOB_TTL_SECONDS, then dropped.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .level_cache import generate_level_cached
+
+JOB_TTL_SECONDS = 15 * 60
+# Seconds between keep-alives on an idle event stream
+HEARTBEAT_SECONDS = 15
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+
+
+class Job:
+    def __init__(self, params, reuse_cached=False):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.reuse_cached = reuse_cached
+        self.status = QUEUED
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        
+        # Event log for streaming: (event, data) in order, snake counts only go to progress
+        self.events = []
+        self.version = 0 # Bumped on every progress change
+        self.subscribers = 0
+        self._cond = threading.Condition()
+
+    def on_event(self, event, data):
+        """generate_level event callback."""
+        with self._cond:
+            self.progress = {**self.progress, **data}
+            self.version += 1
+            if event != 'snake_placed':
+                self.events.append((event, data))
+            self._cond.notify_all()
+
+    def on_log(self, message, args):
+        """Strategy log listener: formats and records the line only while someone is streaming."""
+        if self.subscribers:
+            self.on_event('log', {'message': message % args if args else message})
+
+    def finish(self, status):
+        with self._cond:
+            self.status = status
+            self.finished = time.time()
+            self.events.append(('end', {'status': status}))
+            self._cond.notify_all()
+
+    def run(self):
+        if self.cancel_event.is_set():
+            self.finish(CANCELLED)
+            return
+        self.status = RUNNING
+        try:
+            self.result = generate_level_cached(
+                reuse_cached=self.reuse_cached,
+                on_event=self.on_event,
+                log_listener=self.on_log,
+                cancel_event=self.cancel_event,
+                **self.params
+            )
+            self.finish(CANCELLED if self.result['cancelled'] else DONE)
+        except Exception as e:
+            print(f"[Jobs] Job {self.id} failed: {e}")
+            self.error = str(e)
+            self.finish(FAILED)
+
+    def stream(self, heartbeat=HEARTBEAT_SECONDS):
+        """
+        Yield (event, data) from the first event until the job ends ('end' is last).
+        Snake counts are coalesced into 'progress' events carrying the full progress,
+        and None is yielded after `heartbeat` idle seconds (for keep-alives).
+        """
+        with self._cond:
+            self.subscribers += 1
+        try:
+            sent = 0
+            version = 0
+            while True:
+                with self._cond:
+                    if sent == len(self.events) and version == self.version and self.finished is None:
+                        self._cond.wait(heartbeat)
+                    pending = self.events[sent:]
+                    sent = len(self.events)
+                    progress_changed = version != self.version
+                    version = self.version
+                    progress = dict(self.progress)
+                    ended = self.finished is not None
+
+                for item in pending:
+                    yield item
+                if progress_changed and not pending:
+                    yield 'progress', progress
+                elif not pending:
+                    yield None
+                if ended:
+                    return
+        finally:
+            with self._cond:
+                self.subscribers -= 1
+
+    def to_dict(self, include_result=True):
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'created': self.created,
+            'finished': self.finished
+        }
+        if self.error:
+            data['error'] = self.error
+        if include_result and self.result is not None:
+            data['result'] = self.result
+        return data
+
+
+class JobManager:
+    """Job registry backed by a thread pool (GENERATION_JOB_WORKERS threads, default 2)."""
+
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='generation-job')
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, params, reuse_cached=False):
+        """Queue generate_level(**params) and return the Job."""
+        job = Job(params, reuse_cached)
+        with self._lock:
+            self._prune()
+            self.jobs[job.id] = job
+        job.future = self.executor.submit(job.run)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Request cancellation. Returns the Job, or None if unknown."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_event.set()
+        if job.future.cancel():
+            # Never started (also True when it was already cancelled)
+            with job._cond:
+                if job.status not in (DONE, CANCELLED, FAILED):
+                    job.finish(CANCELLED)
+        return job
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        for job_id in [j.id for j in self.jobs.values() if j.finished and j.finished < cutoff]:
+            del self.jobs[job_id]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            try:
+                workers = int(os.getenv('GENERATION_JOB_WORKERS', '2'))
+            except ValueError:
+                workers = 2
+            _manager = JobManager(max(1, workers))
+        return _manager
@@ -9,26 +9,23 @@ def create_level_json(snakes, obstacles_data, rows, cols, color_palette):
     def to_pos(r, c):
         return { "x": c - center_c, "y": center_r - r }
 
+    # Palette lookup (first occurrence wins, like list.index)
+    palette_index = {}
+    for idx, color in enumerate(color_palette or []):
+        palette_index.setdefault(color, idx)
+
     # 1. Add Snakes
     for snake in snakes:
         # Snake path is [Start, ..., End]
         # JSON expects format where position[0] is Head (End).
-        # So we reverse path for export.
-        reversed_path = list(reversed(snake['path']))
-        pos_objs = [to_pos(r, c) for r, c in reversed_path]
+        # So we reverse path for export (positions inlined, this loop covers every snake cell).
+        pos_objs = [{ "x": c - center_c, "y": center_r - r } for r, c in reversed(snake['path'])]
         
-        # Color mapping
-        color_idx = None
-        try:
-             color_idx = color_palette.index(snake['color'])
-        except:
-             pass
-             
         level_data.append({
             "itemID": item_id,
             "itemType": "snake",
             "position": pos_objs,
-            "colorID": color_idx,
+            "colorID": palette_index.get(snake.get('color')),
             "itemValueConfig": 0 
         })
         item_id += 1
@@ -97,3 +94,21 @@ def create_level_json(snakes, obstacles_data, rows, cols, color_palette):
                 item_id += 1
         
     return level_data
+
+
+def level_json_to_snakes(level_json, rows, cols):
+    """
+    Inverse of create_level_json for snakes: grid paths (head last) in level order.
+    Returns a list of {'path': [(r, c), ...], 'colorID': int or None}.
+    """
+    center_r = rows // 2
+    center_c = cols // 2
+    
+    snakes = []
+    for item in level_json:
+        if item.get('itemType') != 'snake':
+            continue
+        # position[0] is the head, paths store it last
+        path = [(center_r - p['y'], p['x'] + center_c) for p in reversed(item['position'])]
+        snakes.append({'path': path, 'colorID': item.get('colorID')})
+    return snakes
@@ -0,0 +1,209 @@
+"""
+Level Cache
+
+Content-addressed cache of generate_level results.
+
+Keys hash the canonicalised request: grid bitmap, obstacles, length/bend
+ranges, strategy, bonus fill, time budget and seed. The palette only enters
+as its index pattern (colorIDs are palette indices), so recolouring a level
+still hits. Entries live in a bounded in-memory LRU, optionally backed by a
+SQLite file that survives restarts.
+
+Every result is stored twice: under its seed, and under a seedless key that
+unseeded requests can opt in to with reuse_cached.
+"""
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from .algorithm import generate_level, parse_custom_grid, attempt_plan
+
+# Request fields that do not change the generated level (workers only enters
+# through the attempt count, see canonical_request)
+IGNORED_PARAMS = ('workers', 'on_event', 'log_listener', 'cancel_event')
+
+
+def palette_pattern(color_list):
+    """Palette as first-occurrence indices, e.g. ['#f00', '#0f0', '#f00'] -> [0, 1, 0]."""
+    if color_list is None:
+        return None
+    return [color_list.index(color) for color in color_list]
+
+
+def canonical_request(params):
+    """
+    JSON-ready canonical form of generate_level keyword arguments.
+    Defaults are filled in, so omitted and explicit default values share a key.
+    The worker setting is replaced by the attempt count it leads to: pooled and
+    sequential runs with the same count give the same level.
+    """
+    bound = inspect.signature(generate_level).bind(**params)
+    bound.apply_defaults()
+    args = dict(bound.arguments)
+    workers = args.get('workers')
+    for name in IGNORED_PARAMS:
+        args.pop(name, None)
+
+    # Grid as a bitmap of playable cells (same parsing as generate_level)
+    rows, cols, valid_cells = parse_custom_grid(args.pop('custom_grid'))
+    args['attempts'] = attempt_plan(rows, cols, args['arrow_count'], workers)[1]
+    bitmap = bytearray((rows * cols + 7) // 8)
+    for r, c in valid_cells:
+        i = r * cols + c
+        bitmap[i // 8] |= 1 << (i % 8)
+    args['grid'] = [rows, cols, bitmap.hex()]
+
+    # Obstacle colours (holes) become palette indices when they are in the palette
+    color_list = args.pop('color_list')
+    obstacles = []
+    for obs in args.pop('obstacles_input') or []:
+        obs = dict(obs)
+        if color_list and obs.get('color') in color_list:
+            obs['color'] = color_list.index(obs['color'])
+        obstacles.append(obs)
+    args['obstacles'] = obstacles
+    args['palette'] = palette_pattern(color_list)
+    return args
+
+
+def request_key(params, seed):
+    """Cache key for generate_level(**params) with this seed (None = any seed)."""
+    canonical = canonical_request({**params, 'seed': seed})
+    text = json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class LevelCache:
+    """
+    Bounded LRU of JSON-encoded results with an optional SQLite tier.
+
+    max_entries: In-memory entries (0 disables the memory tier).
+    path: SQLite file for the on-disk tier (None = memory only).
+    """
+
+    def __init__(self, max_entries=128, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS levels (key TEXT PRIMARY KEY, result TEXT NOT NULL)")
+            self._db.commit()
+
+    def get(self, key):
+        """Decoded result for key, or None."""
+        with self._lock:
+            text = self.entries.get(key)
+            if text is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(text)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT result FROM levels WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return json.loads(row[0])
+
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        text = json.dumps(result)
+        with self._lock:
+            self._remember(key, text)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO levels (key, result) VALUES (?, ?)", (key, text))
+                self._db.commit()
+
+    def _remember(self, key, text):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = text
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM levels")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'disk': self.path,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_level_cache():
+    """Shared cache configured from LEVEL_CACHE_SIZE (default 128) and LEVEL_CACHE_PATH (SQLite file)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                size = int(os.getenv('LEVEL_CACHE_SIZE', '128'))
+            except ValueError:
+                size = 128
+            _cache = LevelCache(size, os.getenv('LEVEL_CACHE_PATH') or None)
+        return _cache
+
+
+def generate_level_cached(reuse_cached=False, cache=None, **params):
+    """
+    generate_level(**params) behind the level cache.
+
+    Seeded requests are looked up by seed. Unseeded requests always generate
+    a new level, unless reuse_cached is set: then any level cached for the
+    same parameters is returned. Results carry 'cached' (True on a hit).
+    """
+    if cache is None:
+        cache = get_level_cache()
+
+    seed = params.get('seed')
+    key = None
+    if seed is not None:
+        key = request_key(params, seed)
+    elif reuse_cached:
+        key = request_key(params, None)
+
+    if key is not None:
+        result = cache.get(key)
+        if result is not None:
+            result['cached'] = True
+            result['logs'].insert(0, "Served from level cache.")
+            return result
+
+    result = generate_level(**params)
+    result['cached'] = False
+    if not (result['cancelled'] or result['timed_out']):
+        # Cancelled and timed-out runs are partial (and depend on machine load),
+        # only complete levels are reused
+        cache.put(request_key(params, result['seed']), result)
+        cache.put(request_key(params, None), result)
+    return result
@@ -0,0 +1,39 @@
+"""
+Log Sink
+
+Generation logs recorded as (message, args) and %-formatted only when read.
+Attempts that do not win never format their logs, and nothing is formatted
+for a listener unless the listener asks for it (e.g. an open event stream).
+"""
+
+
+def format_records(records):
+    """[(message, args), ...] -> list of strings."""
+    return [message % args if args else message for message, args in records]
+
+
+class LogSink:
+    """
+    Lazy log list.
+
+    listener: Optional callback(message, args) called for every record as it
+              is logged (formatting is up to the listener).
+    """
+
+    def __init__(self, listener=None):
+        self.records = []
+        self.listener = listener
+
+    def log(self, message, *args):
+        self.records.append((message, args))
+        if self.listener is not None:
+            self.listener(message, args)
+
+    def messages(self):
+        return format_records(self.records)
+
+    def __iter__(self):
+        return iter(self.messages())
+
+    def __len__(self):
+        return len(self.records)
@@ -1,8 +1,38 @@
 import numpy as np
-from numba import njit
+from numba import njit, prange, types
 from numba.typed import List
 
-@njit
+# All kernels use cache=True: compiled machine code is stored on disk
+# (__pycache__ next to this file, or NUMBA_CACHE_DIR) and reused by new processes.
+
+# Explicit signatures for the hot entry points (compiled eagerly, loaded from cache)
+GRID = types.int8[:, ::1]
+PATH = types.ListType(types.UniTuple(types.int64, 2))
+
+BFS_DIST_MAP_SIGS = [
+    types.int32[:, ::1](types.int64, types.int64, GRID, types.int64),
+    types.int32[:, ::1](types.int64, types.int64, GRID, types.Omitted(1)), # boundary_dist left at default
+]
+# Neighbour order used by the DFS: right, left, down, up
+DIRS = np.array([(0, 1), (0, -1), (1, 0), (-1, 0)], dtype=np.int32)
+
+# Spiral direction cycles (heuristic modes 3 and 4)
+CLOCKWISE = np.array([(0, 1), (1, 0), (0, -1), (-1, 0)], dtype=np.int32) # Right -> Down -> Left -> Up
+COUNTER_CLOCKWISE = np.array([(0, 1), (-1, 0), (0, -1), (1, 0)], dtype=np.int32) # Right -> Up -> Left -> Down
+
+CHECK_RAYCAST_SIGS = [
+    types.boolean(types.int64, types.int64, GRID, types.int64, types.int64, types.int64, types.int64, types.none),
+    types.boolean(types.int64, types.int64, GRID, types.int64, types.int64, types.int64, types.int64, PATH),
+]
+DFS_SIGS = [
+    types.Tuple((types.boolean, types.int32[:, ::1]))(
+        types.int64, types.int64, GRID, types.int64, types.int64,
+        types.int64, types.int64, types.int64, types.int64, types.int64, types.int64, tightness
+    )
+    for tightness in (types.float64, types.Omitted(0.7)) # tightness only matters for the spiral modes
+]
+
+@njit(BFS_DIST_MAP_SIGS, cache=True)
 def bfs_dist_map_numba(rows, cols, grid, boundary_dist=1):
     dist_map = np.full((rows, cols), -1, dtype=np.int32)
     queue = np.empty((rows * cols, 2), dtype=np.int32)
@@ -56,7 +86,7 @@ def bfs_dist_map_numba(rows, cols, grid, boundary_dist=1):
                 
     return dist_map
 
-@njit
+@njit(cache=True)
 def count_free_neighbors_numba(rows, cols, grid, r, c):
     count = 0
     if r > 0 and grid[r-1, c] == 0: count += 1
@@ -65,7 +95,71 @@ def count_free_neighbors_numba(rows, cols, grid, r, c):
     if c < cols - 1 and grid[r, c+1] == 0: count += 1
     return count
 
-@njit
+@njit(cache=True)
+def block_cells_dist_numba(rows, cols, grid, dist_map, cells, boundary_dist):
+    # Incremental update of a bfs_dist_map_numba result after `cells` (n, 2) became non-free.
+    # grid must already have those cells set. Blocking only adds exits, so distances can
+    # only drop: seed the free neighbours of the new blockers and relax outward from them.
+    # Updates dist_map in place, returns the number of cells whose distance changed.
+    queue = np.empty((rows * cols, 2), dtype=np.int32)
+    head = 0
+    tail = 0
+    changed = 0
+
+    for k in range(len(cells)):
+        r = cells[k, 0]; c = cells[k, 1]
+        if dist_map[r, c] != -1:
+            dist_map[r, c] = -1
+            changed += 1
+
+    for k in range(len(cells)):
+        r = cells[k, 0]; c = cells[k, 1]
+        for d in range(4):
+            nr = r + DIRS[d, 0]; nc = c + DIRS[d, 1]
+            if 0 <= nr < rows and 0 <= nc < cols and grid[nr, nc] == 0:
+                if dist_map[nr, nc] > boundary_dist:
+                    dist_map[nr, nc] = boundary_dist
+                    queue[tail, 0] = nr; queue[tail, 1] = nc; tail += 1
+                    changed += 1
+
+    # Every seed has the same distance, so FIFO order is distance order
+    while head < tail:
+        cr = queue[head, 0]; cc = queue[head, 1]
+        head += 1
+        next_dist = dist_map[cr, cc] + 1
+        for d in range(4):
+            nr = cr + DIRS[d, 0]; nc = cc + DIRS[d, 1]
+            if 0 <= nr < rows and 0 <= nc < cols and grid[nr, nc] == 0:
+                if dist_map[nr, nc] > next_dist:
+                    dist_map[nr, nc] = next_dist
+                    queue[tail, 0] = nr; queue[tail, 1] = nc; tail += 1
+                    changed += 1
+
+    return changed
+
+@njit(cache=True)
+def free_neighbor_counts_numba(rows, cols, grid):
+    # count_free_neighbors_numba for every cell at once
+    counts = np.zeros((rows, cols), dtype=np.int32)
+    for r in range(rows):
+        for c in range(cols):
+            counts[r, c] = count_free_neighbors_numba(rows, cols, grid, r, c)
+    return counts
+
+@njit(cache=True)
+def take_free_cells_numba(grid, cells, head, count):
+    # Scan cells (n, 2) from head, skipping cells that are no longer free (grid != 0).
+    # Returns (positions of up to `count` free cells, new head)
+    out = np.empty(count, dtype=np.int64)
+    n = 0
+    while head < len(cells) and n < count:
+        if grid[cells[head, 0], cells[head, 1]] == 0:
+            out[n] = head
+            n += 1
+        head += 1
+    return out[:n], head
+
+@njit(CHECK_RAYCAST_SIGS, cache=True)
 def check_raycast_numba(rows, cols, grid, r, c, dr, dc, path=None):
     if dr == 0 and dc == 0: return False
     curr_r = r + dr
@@ -91,154 +185,639 @@ def check_raycast_numba(rows, cols, grid, r, c, dr, dc, path=None):
         curr_c += dc
     return True
 
-@njit
-def get_sorted_neighbors_numba(rows, cols, grid, r, c, path, heuristic_mode):
-    # Retrieve neighbors
-    nbs = List() 
-    
-    # Candidate neighbors
-    for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-        nr, nc = r + dr, c + dc
+@njit(cache=True)
+def scan_exit_rows_numba(rows, cols, grid, exits, row_ids):
+    # exits[r, c, d]: check_raycast_numba from (r, c) towards DIRS[d] is clear.
+    # Recompute the horizontal directions (right = 0, left = 1) for the given rows.
+    for k in range(len(row_ids)):
+        r = row_ids[k]
+        clear = True
+        for c in range(cols - 1, -1, -1):
+            exits[r, c, 0] = clear
+            if grid[r, c] == 1: clear = False
+        clear = True
+        for c in range(cols):
+            exits[r, c, 1] = clear
+            if grid[r, c] == 1: clear = False
+
+@njit(cache=True)
+def scan_exit_cols_numba(rows, cols, grid, exits, col_ids):
+    # Vertical counterpart of scan_exit_rows_numba (down = 2, up = 3)
+    for k in range(len(col_ids)):
+        c = col_ids[k]
+        clear = True
+        for r in range(rows - 1, -1, -1):
+            exits[r, c, 2] = clear
+            if grid[r, c] == 1: clear = False
+        clear = True
+        for r in range(rows):
+            exits[r, c, 3] = clear
+            if grid[r, c] == 1: clear = False
+
+@njit(cache=True)
+def exit_map_numba(rows, cols, grid):
+    # (rows, cols, 4) bool map of clear head rays, directions in DIRS order
+    exits = np.zeros((rows, cols, 4), dtype=np.bool_)
+    scan_exit_rows_numba(rows, cols, grid, exits, np.arange(rows))
+    scan_exit_cols_numba(rows, cols, grid, exits, np.arange(cols))
+    return exits
+
+@njit(cache=True)
+def check_raycast_mask_numba(rows, cols, grid, r, c, dr, dc, on_path):
+    # check_raycast_numba with the current path given as a rows x cols mask (O(1) membership)
+    if dr == 0 and dc == 0: return False
+    curr_r = r + dr
+    curr_c = c + dc
+    while 0 <= curr_r < rows and 0 <= curr_c < cols:
+        if grid[curr_r, curr_c] == 1: return False
+        if on_path[curr_r, curr_c]: return False
+        curr_r += dr
+        curr_c += dc
+    return True
+
+@njit(cache=True)
+def spiral_score_numba(cycle, last_dr, last_dc, dr, dc, tightness, rnd):
+    # Spiral preference for a step (dr, dc) after (last_dr, last_dc), lower = better
+    if last_dr == 0 and last_dc == 0:
+        # Initial direction: start going RIGHT
+        return -100.0 if dc > 0 else rnd
+
+    # Current direction index in cycle
+    dir_idx = 0
+    for k in range(4):
+        if cycle[k, 0] == last_dr and cycle[k, 1] == last_dc:
+            dir_idx = k
+            break
+    turn = (dir_idx + 1) % 4 # Next direction in cycle (turn)
+    opposite = (dir_idx + 2) % 4
+
+    base_score = rnd * (1 - tightness)
+    # BEST: Turn in cycle direction (spiral)
+    if dr == cycle[turn, 0] and dc == cycle[turn, 1]:
+        return -100 * tightness + base_score
+    # GOOD: Continue straight
+    if dr == last_dr and dc == last_dc:
+        return -50 * tightness + base_score
+    # BAD: Turn opposite direction
+    if dr == cycle[opposite, 0] and dc == cycle[opposite, 1]:
+        return 100 + base_score
+    # WORST: Go backwards
+    return 200 + base_score
+
+@njit(cache=True)
+def fill_sorted_neighbors_numba(rows, cols, grid, r, c, on_path, heuristic_mode, out_r, out_c, depth,
+                                last_dr, last_dc, tightness):
+    # Write the free, off-path neighbours of (r, c) into out_r/out_c[depth], sorted by heuristic.
+    # (last_dr, last_dc) is the step that reached (r, c), (0, 0) at the start.
+    # Returns the neighbour count (0..4)
+    n_count = 0
+    for k in range(4):
+        nr = r + DIRS[k, 0]
+        nc = c + DIRS[k, 1]
         if 0 <= nr < rows and 0 <= nc < cols:
-            if grid[nr, nc] == 0:
-                # Check path collision
-                in_path = False
-                for pr, pc in path:
-                    if pr == nr and pc == nc:
-                        in_path = True
-                        break
-                if not in_path:
-                    nbs.append((nr, nc))
-    
-    n_count = len(nbs)
+            if grid[nr, nc] == 0 and on_path[nr, nc] == 0:
+                out_r[depth, n_count] = nr
+                out_c[depth, n_count] = nc
+                n_count += 1
+
     if n_count > 1:
         # Sort
-        scores = np.zeros(n_count, dtype=np.float32)
+        scores = np.zeros(4, dtype=np.float32)
         for i in range(n_count):
-            nr, nc = nbs[i]
-            
+            nr = out_r[depth, i]; nc = out_c[depth, i]
+
             # Base Randomness
-            rnd = np.random.random() * 0.3
-            
+            rnd = np.random.random()
+
+            if heuristic_mode == 3 or heuristic_mode == 4: # SpiralFill (clockwise / counter-clockwise)
+                cycle = CLOCKWISE if heuristic_mode == 3 else COUNTER_CLOCKWISE
+                scores[i] = spiral_score_numba(cycle, last_dr, last_dc, nr - r, nc - c, tightness, rnd)
+                continue
+            rnd *= 0.3
+
             if heuristic_mode == 0: # SmartDynamic (Constrained)
                 free_n = count_free_neighbors_numba(rows, cols, grid, nr, nc)
                 scores[i] = free_n * 0.7 + rnd
-                
+
             elif heuristic_mode == 1: # EdgeHugger
                 # Dist to edge
                 dist = min(nr, rows - 1 - nr, nc, cols - 1 - nc)
                 scores[i] = dist * 1.0 + rnd
-                
+
             elif heuristic_mode == 2: # MaxClump (Open Areas)
                 free_n = count_free_neighbors_numba(rows, cols, grid, nr, nc)
                 # We want MAX free neighbors -> Ascending Sort -> Use Negative
                 scores[i] = -free_n * 1.0 + rnd
-            
+
         # Bubble sort ascending
         for i in range(n_count):
             for j in range(0, n_count - i - 1):
                 if scores[j] > scores[j + 1]:
                     # Swap
                     t_s = scores[j]; scores[j] = scores[j+1]; scores[j+1] = t_s
-                    t_n = nbs[j]; nbs[j] = nbs[j+1]; nbs[j+1] = t_n
-                    
-    return nbs
+                    t_r = out_r[depth, j]; out_r[depth, j] = out_r[depth, j+1]; out_r[depth, j+1] = t_r
+                    t_c = out_c[depth, j]; out_c[depth, j] = out_c[depth, j+1]; out_c[depth, j+1] = t_c
+
+    return n_count
+
+@njit(DFS_SIGS, cache=True)
+def dfs_numba(rows, cols, grid, start_r, start_c, min_len, max_len, min_bends, max_bends, max_nodes=500, heuristic_mode=0,
+              tightness=0.7):
+    # Iterative DFS over preallocated stacks (no allocation inside the loop).
+    # Returns (success, path) with path as an int32 (length, 2) array, head last.
+    cap = min(max_len, rows * cols)
+    if cap < 1: cap = 1
+
+    # Path + "on current path" mask
+    path_r = np.empty(cap, dtype=np.int32)
+    path_c = np.empty(cap, dtype=np.int32)
+    on_path = np.zeros((rows, cols), dtype=np.uint8)
+
+    # Per-depth state: sorted neighbours, count, next index, bends so far
+    nbs_r = np.empty((cap, 4), dtype=np.int32)
+    nbs_c = np.empty((cap, 4), dtype=np.int32)
+    nbs_n = np.empty(cap, dtype=np.int32)
+    idx_stack = np.empty(cap, dtype=np.int32)
+    bends_stack = np.empty(cap, dtype=np.int32)
 
-@njit
-def dfs_numba(rows, cols, grid, start_r, start_c, min_len, max_len, min_bends, max_bends, max_nodes=500, heuristic_mode=0):
-    # Iterative DFS
-    path = List()
-    path.append((np.int64(start_r), np.int64(start_c)))
-    
-    # Stacks
-    # We need to backtrack:
-    # 1. State at current depth: (last_dr, last_dc, current_bends)
-    # 2. Neighbors to explore
-    # 3. Current neighbor index
-    
-    nbs_stack = List()
-    idx_stack = List()
-    bends_stack = List()
-    
     # Init Start Node
-    start_nbs = get_sorted_neighbors_numba(rows, cols, grid, start_r, start_c, path, heuristic_mode)
-    nbs_stack.append(start_nbs)
-    idx_stack.append(0)
-    bends_stack.append(0)
-    
+    path_r[0] = start_r; path_c[0] = start_c
+    on_path[start_r, start_c] = 1
+    length = 1
+    nbs_n[0] = fill_sorted_neighbors_numba(rows, cols, grid, start_r, start_c, on_path, heuristic_mode, nbs_r, nbs_c, 0,
+                                           0, 0, tightness)
+    idx_stack[0] = 0
+    bends_stack[0] = 0
+    depth = 0
+
     visited_nodes = 0
-    
-    while len(nbs_stack) > 0:
-        depth = len(nbs_stack) - 1
-        current_nbs = nbs_stack[depth]
+
+    while depth >= 0:
         current_idx = idx_stack[depth]
-        
-        # Current Head of path is path[-1]
-        curr_r, curr_c = path[-1]
+
+        # Current Head of path is path[length - 1] (length == depth + 1)
+        curr_r = path_r[length - 1]; curr_c = path_c[length - 1]
         current_bends = bends_stack[depth]
-        
-        if current_idx >= len(current_nbs):
+
+        if current_idx >= nbs_n[depth]:
             # Backtrack
-            nbs_stack.pop()
-            idx_stack.pop()
-            bends_stack.pop()
-            path.pop()
+            depth -= 1
+            length -= 1
+            on_path[curr_r, curr_c] = 0
             continue
-            
+
         # Try next neighbor
-        nr, nc = current_nbs[current_idx]
+        nr = nbs_r[depth, current_idx]; nc = nbs_c[depth, current_idx]
         idx_stack[depth] = current_idx + 1 # Advance index for next time
-        
+
         visited_nodes += 1
         if visited_nodes > max_nodes:
-            return False, path # Fail
-            
+            return False, np.stack((path_r[:length], path_c[:length]), axis=1) # Fail
+
         # Calc constraints
         dr = nr - curr_r
         dc = nc - curr_c
-        
+
         # Get last direction
         last_dr = 0
         last_dc = 0
-        if len(path) > 1:
-            pr, pc = path[-2]
-            last_dr = curr_r - pr
-            last_dc = curr_c - pc
-            
+        if length > 1:
+            last_dr = curr_r - path_r[length - 2]
+            last_dc = curr_c - path_c[length - 2]
+
         new_bends = current_bends
         if last_dr != 0 or last_dc != 0:
             if dr != last_dr or dc != last_dc:
                 new_bends += 1
-                
+
         if new_bends > max_bends:
             continue # Prune this neighbor
-            
+
         # Push Node
-        path.append((np.int64(nr), np.int64(nc)))
-        
+        path_r[length] = nr; path_c[length] = nc
+        on_path[nr, nc] = 1
+        length += 1
+
         # Check if Success
-        path_len = len(path)
-        if path_len >= min_len:
+        if length >= min_len:
             # Check Exitable with PATH AWARENESS
-            if check_raycast_numba(rows, cols, grid, nr, nc, dr, dc, path):
+            if check_raycast_mask_numba(rows, cols, grid, nr, nc, dr, dc, on_path):
                  should_stop = False
-                 if path_len >= max_len: should_stop = True
+                 if length >= max_len: should_stop = True
                  elif np.random.random() < 0.3: should_stop = True
-                 
+
                  if should_stop:
-                     return True, path
-                     
-        if path_len >= max_len:
+                     return True, np.stack((path_r[:length], path_c[:length]), axis=1)
+
+        if length >= cap:
             # Reached limit, backtrack immediately
-            path.pop()
+            length -= 1
+            on_path[nr, nc] = 0
             continue
-            
-        # Generate Neighbors for new node
-        new_nbs = get_sorted_neighbors_numba(rows, cols, grid, nr, nc, path, heuristic_mode)
-        
-        # Push to Stack
-        nbs_stack.append(new_nbs)
-        idx_stack.append(0)
-        bends_stack.append(new_bends)
-        
-    return False, path
+
+        # Generate Neighbors for new node and push to stack
+        depth += 1
+        nbs_n[depth] = fill_sorted_neighbors_numba(rows, cols, grid, nr, nc, on_path, heuristic_mode, nbs_r, nbs_c, depth,
+                                                   dr, dc, tightness)
+        idx_stack[depth] = 0
+        bends_stack[depth] = new_bends
+
+    return False, np.stack((path_r[:0], path_c[:0]), axis=1)
+
+@njit(cache=True)
+def dfs_first_numba(rows, cols, grid, starts, min_len, max_len, min_bends, max_bends, max_nodes, heuristic_mode,
+                    tightness=0.7):
+    # dfs_numba over starts (n, 2) in order, stopping at the first success.
+    # Same RNG stream as calling dfs_numba once per start from Python.
+    # Returns (index of the winning start or -1, path)
+    for i in range(len(starts)):
+        success, path = dfs_numba(rows, cols, grid, starts[i, 0], starts[i, 1],
+                                  min_len, max_len, min_bends, max_bends, max_nodes, heuristic_mode, tightness)
+        if success:
+            return i, path
+    return -1, np.empty((0, 2), dtype=np.int32)
+
+@njit(cache=True)
+def shuffle_prefix_numba(arr_r, arr_c, n):
+    # In-place Fisher-Yates over the first n entries of two parallel arrays
+    for i in range(n - 1, 0, -1):
+        j = np.random.randint(0, i + 1)
+        t = arr_r[i]; arr_r[i] = arr_r[j]; arr_r[j] = t
+        t = arr_c[i]; arr_c[i] = arr_c[j]; arr_c[j] = t
+
+@njit(cache=True)
+def expand_symmetric_numba(rows, cols, scratch, depth, pa, pm, bends_a, bends_m, mirror_signs, max_bends,
+                           ch_a, ch_m, ch_ba, ch_bm, nbs_r, nbs_c, step_r, step_c, cand_r, cand_c):
+    # Joint next steps for A and every mirror from the node at `depth`, written to ch_*[depth].
+    # scratch holds the grid with every partial path marked, so "free" is scratch == 0.
+    # Each mirror takes its ideal (mirrored) move if free, otherwise a random free neighbour.
+    # nbs_*, step_*, cand_* are work buffers (4, m + 1, 4 entries).
+    # Returns the number of children.
+    m = len(mirror_signs)
+    car = pa[depth, 0]; cac = pa[depth, 1]
+
+    n_a = 0
+    for k in range(4):
+        nr = car + DIRS[k, 0]; nc = cac + DIRS[k, 1]
+        if 0 <= nr < rows and 0 <= nc < cols and scratch[nr, nc] == 0:
+            nbs_r[n_a] = nr; nbs_c[n_a] = nc; n_a += 1
+    shuffle_prefix_numba(nbs_r, nbs_c, n_a) # Randomize A's choices
+
+    n_children = 0
+
+    for a in range(n_a):
+        nar = nbs_r[a]; nac = nbs_c[a]
+        dr = nar - car; dc = nac - cac
+
+        # Bends A
+        new_bends_a = bends_a[depth]
+        if depth > 0:
+            if car - pa[depth - 1, 0] != dr or cac - pa[depth - 1, 1] != dc:
+                new_bends_a += 1
+        if new_bends_a > max_bends:
+            continue
+
+        # Cells taken during this joint step (A-next and earlier mirrors' moves)
+        step_r[0] = nar; step_c[0] = nac
+        n_step = 1
+        possible_branch = True
+
+        for i in range(m):
+            cmr = pm[i, depth, 0]; cmc = pm[i, depth, 1]
+            ideal_r = cmr + mirror_signs[i, 0] * dr
+            ideal_c = cmc + mirror_signs[i, 1] * dc
+
+            # Valid neighbours for this mirror head; ideal move goes first
+            n_m = 0
+            has_ideal = False
+            for k in range(4):
+                nr = cmr + DIRS[k, 0]; nc = cmc + DIRS[k, 1]
+                if not (0 <= nr < rows and 0 <= nc < cols) or scratch[nr, nc] != 0:
+                    continue
+                taken = False
+                for s in range(n_step):
+                    if step_r[s] == nr and step_c[s] == nc:
+                        taken = True
+                        break
+                if taken:
+                    continue
+                if nr == ideal_r and nc == ideal_c:
+                    has_ideal = True
+                else:
+                    cand_r[n_m] = nr; cand_c[n_m] = nc; n_m += 1
+            shuffle_prefix_numba(cand_r, cand_c, n_m) # Adaptive fallback order
+
+            chosen = -1 # -1 = none, 4 = ideal, else index into cand
+            chosen_bends = 0
+            for k in range(-1, n_m):
+                if k == -1:
+                    if not has_ideal:
+                        continue
+                    mr = ideal_r; mc = ideal_c
+                else:
+                    mr = cand_r[k]; mc = cand_c[k]
+                nb_m = bends_m[depth, i]
+                if depth > 0:
+                    if cmr - pm[i, depth - 1, 0] != mr - cmr or cmc - pm[i, depth - 1, 1] != mc - cmc:
+                        nb_m += 1
+                if nb_m <= max_bends:
+                    chosen = 4 if k == -1 else k
+                    chosen_bends = nb_m
+                    break
+
+            if chosen == -1:
+                possible_branch = False
+                break # One mirror stuck -> Entire branch fails
+
+            if chosen == 4:
+                mr = ideal_r; mc = ideal_c
+            else:
+                mr = cand_r[chosen]; mc = cand_c[chosen]
+            ch_m[depth, n_children, i, 0] = mr
+            ch_m[depth, n_children, i, 1] = mc
+            ch_bm[depth, n_children, i] = chosen_bends
+            step_r[n_step] = mr; step_c[n_step] = mc; n_step += 1
+
+        if possible_branch:
+            ch_a[depth, n_children, 0] = nar
+            ch_a[depth, n_children, 1] = nac
+            ch_ba[depth, n_children] = new_bends_a
+            n_children += 1
+
+    return n_children
+
+@njit(cache=True)
+def symmetric_dfs_numba(rows, cols, grid, start_a, mirror_starts, mirror_signs, min_len, max_len, max_bends, max_nodes):
+    # Joint DFS for a snake (A) and its mirrors, moving one step together.
+    # - mirror_starts: (m, 2) start cell per mirror
+    # - mirror_signs: (m, 2) +-1 per axis, maps A's step to the mirror's ideal step
+    # One scratch copy of the grid: path cells are marked on push and cleared on pop.
+    # Returns (success, path_a (L, 2), paths_m (m, L, 2))
+    m = len(mirror_starts)
+    cap = max(1, min(max_len, rows * cols))
+    scratch = grid.copy()
+
+    pa = np.empty((cap, 2), dtype=np.int32)
+    pm = np.empty((m, cap, 2), dtype=np.int32)
+    bends_a = np.zeros(cap, dtype=np.int32)
+    bends_m = np.zeros((cap, m), dtype=np.int32)
+
+    # Per-depth children (up to 4) and next child index
+    ch_a = np.empty((cap, 4, 2), dtype=np.int32)
+    ch_m = np.empty((cap, 4, m, 2), dtype=np.int32)
+    ch_ba = np.empty((cap, 4), dtype=np.int32)
+    ch_bm = np.empty((cap, 4, m), dtype=np.int32)
+    ch_n = np.zeros(cap, dtype=np.int32)
+    ch_i = np.zeros(cap, dtype=np.int32)
+
+    # Work buffers for expand_symmetric_numba
+    nbs_r = np.empty(4, dtype=np.int32); nbs_c = np.empty(4, dtype=np.int32)
+    step_r = np.empty(m + 1, dtype=np.int32); step_c = np.empty(m + 1, dtype=np.int32)
+    cand_r = np.empty(4, dtype=np.int32); cand_c = np.empty(4, dtype=np.int32)
+
+    pa[0, 0] = start_a[0]; pa[0, 1] = start_a[1]
+    scratch[start_a[0], start_a[1]] = 1
+    for i in range(m):
+        pm[i, 0, 0] = mirror_starts[i, 0]; pm[i, 0, 1] = mirror_starts[i, 1]
+        scratch[mirror_starts[i, 0], mirror_starts[i, 1]] = 1
+
+    depth = 0
+    entering = True
+    nodes_visited = 0
+
+    while True:
+        if entering:
+            entering = False
+            nodes_visited += 1
+            if nodes_visited > max_nodes:
+                break
+            length = depth + 1
+
+            # --- CHECK SUCCESS ---
+            # Rays are checked against the scratch grid, so they must clear every partial path
+            if length >= min_len and length >= 2:
+                ok = check_raycast_numba(rows, cols, scratch, pa[depth, 0], pa[depth, 1],
+                                         pa[depth, 0] - pa[depth - 1, 0], pa[depth, 1] - pa[depth - 1, 1], None)
+                i = 0
+                while ok and i < m:
+                    ok = check_raycast_numba(rows, cols, scratch, pm[i, depth, 0], pm[i, depth, 1],
+                                             pm[i, depth, 0] - pm[i, depth - 1, 0],
+                                             pm[i, depth, 1] - pm[i, depth - 1, 1], None)
+                    i += 1
+                if ok:
+                    if length >= max_len or np.random.random() < 0.2:
+                        return True, pa[:length].copy(), pm[:, :length].copy()
+
+            # --- GENERATE NEXT STEPS ---
+            if length >= max_len or length >= cap:
+                ch_n[depth] = 0
+            else:
+                ch_n[depth] = expand_symmetric_numba(rows, cols, scratch, depth, pa, pm, bends_a, bends_m,
+                                                     mirror_signs, max_bends, ch_a, ch_m, ch_ba, ch_bm,
+                                                     nbs_r, nbs_c, step_r, step_c, cand_r, cand_c)
+            ch_i[depth] = 0
+
+        if ch_i[depth] >= ch_n[depth]:
+            # Backtrack: clear this node's cells
+            if depth == 0:
+                break
+            scratch[pa[depth, 0], pa[depth, 1]] = 0
+            for i in range(m):
+                scratch[pm[i, depth, 0], pm[i, depth, 1]] = 0
+            depth -= 1
+            continue
+
+        # Push next child
+        k = ch_i[depth]
+        ch_i[depth] = k + 1
+        nd = depth + 1
+        pa[nd, 0] = ch_a[depth, k, 0]; pa[nd, 1] = ch_a[depth, k, 1]
+        scratch[pa[nd, 0], pa[nd, 1]] = 1
+        bends_a[nd] = ch_ba[depth, k]
+        for i in range(m):
+            pm[i, nd, 0] = ch_m[depth, k, i, 0]; pm[i, nd, 1] = ch_m[depth, k, i, 1]
+            scratch[pm[i, nd, 0], pm[i, nd, 1]] = 1
+            bends_m[nd, i] = ch_bm[depth, k, i]
+        depth = nd
+        entering = True
+
+    return False, np.empty((0, 2), dtype=np.int32), np.empty((m, 0, 2), dtype=np.int32)
+
+# --- Solvability Engine ---
+# Occupancy grid: -1 = Empty, -2 = Obstacle, >= 0 = Snake ID
+
+@njit(cache=True)
+def first_blocker_numba(rows, cols, occ, r, c, dr, dc):
+    # Flat index of the first non-empty cell from (r, c) along (dr, dc), or -1 if clear
+    while 0 <= r < rows and 0 <= c < cols:
+        if occ[r, c] != -1:
+            return r * cols + c
+        r += dr
+        c += dc
+    return -1
+
+@njit(cache=True)
+def solve_removal_numba(rows, cols, occ, cells, offsets):
+    # Event-driven removal simulation.
+    # Each snake waits on the first blocker cell of its head ray ("blocked-by" list per cell).
+    # Freeing a cell only re-examines the snakes waiting on it, resuming their ray from that cell.
+    # occ is cleared in place as snakes leave.
+    # Returns (removed_step per snake (-1 = stuck), step count)
+    n = len(offsets) - 1
+    removed_step = np.full(n, -1, dtype=np.int32)
+    wait_head = np.full(rows * cols, -1, dtype=np.int32)
+    wait_next = np.full(n, -1, dtype=np.int32)
+    wait_cell = np.full(n, -1, dtype=np.int64)
+    frontier = np.empty(n, dtype=np.int32)
+    woken = np.empty(n, dtype=np.int32)
+    nf = 0
+
+    # 1. Initial raycast: movable now, or park on first blocker
+    for s in range(n):
+        end = offsets[s + 1] - 1
+        hr = cells[end, 0]; hc = cells[end, 1]
+        dr = hr - cells[end - 1, 0]; dc = hc - cells[end - 1, 1]
+        if dr == 0 and dc == 0:
+            continue # Degenerate head, never movable
+        cell = first_blocker_numba(rows, cols, occ, hr + dr, hc + dc, dr, dc)
+        if cell == -1:
+            frontier[nf] = s; nf += 1
+        else:
+            wait_cell[s] = cell
+            wait_next[s] = wait_head[cell]
+            wait_head[cell] = s
+
+    steps = 0
+    while nf > 0:
+        steps += 1
+        nw = 0
+
+        # 2. Remove all movable snakes at once, collect waiters of freed cells
+        for i in range(nf):
+            s = frontier[i]
+            removed_step[s] = steps
+            for k in range(offsets[s], offsets[s + 1]):
+                r = cells[k, 0]; c = cells[k, 1]
+                if r < 0 or r >= rows or c < 0 or c >= cols:
+                    continue
+                if occ[r, c] < 0:
+                    continue # Already free, or obstacle
+                occ[r, c] = -1
+                cell = r * cols + c
+                w = wait_head[cell]
+                wait_head[cell] = -1
+                while w != -1:
+                    woken[nw] = w; nw += 1
+                    w = wait_next[w]
+
+        # 3. Resume rays of woken snakes from the freed cell
+        nf = 0
+        for i in range(nw):
+            s = woken[i]
+            end = offsets[s + 1] - 1
+            dr = cells[end, 0] - cells[end - 1, 0]; dc = cells[end, 1] - cells[end - 1, 1]
+            start = wait_cell[s]
+            cell = first_blocker_numba(rows, cols, occ, start // cols, start % cols, dr, dc)
+            if cell == -1:
+                wait_cell[s] = -1
+                frontier[nf] = s; nf += 1
+            else:
+                wait_cell[s] = cell
+                wait_next[s] = wait_head[cell]
+                wait_head[cell] = s
+
+    return removed_step, steps
+
+@njit(cache=True)
+def paint_occupancy_numba(rows, cols, cells, offsets, obstacle_cells):
+    # int32 occupancy grid for one level (see solver.build_occupancy)
+    occ = np.full((rows, cols), -1, dtype=np.int32)
+    for s in range(len(offsets) - 1):
+        for k in range(offsets[s], offsets[s + 1]):
+            r = cells[k, 0]; c = cells[k, 1]
+            if 0 <= r < rows and 0 <= c < cols:
+                occ[r, c] = s
+    for k in range(len(obstacle_cells)):
+        r = obstacle_cells[k, 0]; c = obstacle_cells[k, 1]
+        if 0 <= r < rows and 0 <= c < cols:
+            occ[r, c] = -2
+    return occ
+
+@njit(parallel=True, cache=True)
+def validate_many(cells, snake_offsets, level_offsets, dims, obstacle_cells, obstacle_offsets):
+    # Solve N packed levels in one call (prange over levels).
+    # - cells: (total_cells, 2); snake s is cells[snake_offsets[s]:snake_offsets[s+1]]
+    # - level_offsets: level i owns snakes level_offsets[i]..level_offsets[i+1]
+    # - dims: (N, 2) rows, cols per level
+    # - obstacle_cells / obstacle_offsets: same layout as snakes, one block per level
+    # Returns:
+    # - results: int32 (N, 3) -> [is_solvable, remained_count, steps]
+    # - removed_step: int32 per snake (-1 = stuck), aligned with snake_offsets
+    n_levels = len(level_offsets) - 1
+    results = np.zeros((n_levels, 3), dtype=np.int32)
+    removed_step = np.full(len(snake_offsets) - 1, -1, dtype=np.int32)
+
+    for i in prange(n_levels):
+        rows = dims[i, 0]; cols = dims[i, 1]
+        s0 = level_offsets[i]; s1 = level_offsets[i + 1]
+        base = snake_offsets[s0]
+        offsets = snake_offsets[s0:s1 + 1] - base
+        cells_i = cells[base:snake_offsets[s1]]
+        obstacles_i = obstacle_cells[obstacle_offsets[i]:obstacle_offsets[i + 1]]
+
+        occ = paint_occupancy_numba(rows, cols, cells_i, offsets, obstacles_i)
+        steps_i, steps = solve_removal_numba(rows, cols, occ, cells_i, offsets)
+
+        stuck = 0
+        for k in range(s1 - s0):
+            removed_step[s0 + k] = steps_i[k]
+            if steps_i[k] == -1:
+                stuck += 1
+        results[i, 0] = 1 if stuck == 0 else 0
+        results[i, 1] = stuck
+        results[i, 2] = steps
+
+    return results, removed_step
+
+@njit(cache=True)
+def seed_numba(seed):
+    # Numba keeps its own RNG state (separate from NumPy / Python random)
+    np.random.seed(seed)
+
+def warm_up():
+    """
+    Compile every kernel by running it once on a tiny grid.
+    Returns the elapsed time in seconds.
+    """
+    import time
+    start = time.perf_counter()
+
+    grid = np.zeros((4, 4), dtype=np.int8)
+    path = List()
+    path.append((np.int64(0), np.int64(0)))
+    bfs_dist_map_numba(4, 4, grid)
+    count_free_neighbors_numba(4, 4, grid, 1, 1)
+    free_neighbor_counts_numba(4, 4, grid)
+    dist = bfs_dist_map_numba(4, 4, grid)
+    blocked = grid.copy()
+    blocked[1, 1] = 1
+    block_cells_dist_numba(4, 4, blocked, dist, np.array([[1, 1]], dtype=np.int64), 1)
+    take_free_cells_numba(blocked, np.array([[1, 1], [0, 0]], dtype=np.int64), 0, 1)
+    exits = exit_map_numba(4, 4, grid)
+    scan_exit_rows_numba(4, 4, blocked, exits, np.array([1], dtype=np.int64))
+    scan_exit_cols_numba(4, 4, blocked, exits, np.array([1], dtype=np.int64))
+    check_raycast_numba(4, 4, grid, 0, 0, 0, 1, None)
+    check_raycast_numba(4, 4, grid, 0, 0, 0, 1, path)
+    dfs_numba(4, 4, grid, 0, 0, 2, 3, 0, 1, max_nodes=10, heuristic_mode=0)
+    starts = np.array([[0, 0], [3, 3]], dtype=np.int64)
+    dfs_first_numba(4, 4, grid, starts, 2, 3, 0, 1, 10, 0, 0.7)
+    symmetric_dfs_numba(4, 4, grid, starts[0], starts[1:], np.array([[-1, -1]], dtype=np.int64), 2, 3, 1, 10)
+
+    cells = np.array([[0, 0], [0, 1]], dtype=np.int64)
+    offsets = np.array([0, 2], dtype=np.int64)
+    occ = paint_occupancy_numba(4, 4, cells, offsets, np.empty((0, 2), dtype=np.int64))
+    solve_removal_numba(4, 4, occ, cells, offsets)
+    validate_many(cells, offsets, np.array([0, 1], dtype=np.int64), np.array([[4, 4]], dtype=np.int64),
+                  np.empty((0, 2), dtype=np.int64), np.array([0, 0], dtype=np.int64))
+
+    return time.perf_counter() - start
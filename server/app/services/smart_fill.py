@@ -8,11 +8,12 @@ import random
 from .strategies.layered import LayeredStrategy
 from .json_builder import create_level_json
 from .validator import validate_level
+from .solver import IncrementalSolver
 from .utils import get_neighbors
 
 
 def smart_fill_gaps(rows, cols, existing_snakes, obstacles_input, custom_grid, 
-                    color_list, min_len, max_len, min_bends, max_bends):
+                    color_list, min_len, max_len, min_bends, max_bends, seed=None):
     """
     Fill remaining gaps in an existing level using simulation-based validation.
     
@@ -24,9 +25,10 @@ def smart_fill_gaps(rows, cols, existing_snakes, obstacles_input, custom_grid,
         color_list: List of hex colors for new snakes
         min_len, max_len: Snake length constraints
         min_bends, max_bends: Snake bend constraints
+        seed: RNG seed (None = random), echoed back to reproduce the fill
         
     Returns:
-        Dict with level_json, logs, is_solvable, stuck_count, snakes_added
+        Dict with level_json, logs, is_solvable, stuck_count, snakes_added, seed
     """
     logs = []
     
@@ -59,7 +61,9 @@ def smart_fill_gaps(rows, cols, existing_snakes, obstacles_input, custom_grid,
                     obstacles_map[(r, c)] = obs
     
     # 3. Create Strategy Instance
-    strategy = LayeredStrategy(rows, cols, valid_cells, obstacles_map, color_list)
+    if seed is None:
+        seed = random.getrandbits(32)
+    strategy = LayeredStrategy(rows, cols, valid_cells, obstacles_map, color_list, seed=seed)
     
     # 4. Mark existing snakes as occupied
     for snake in existing_snakes:
@@ -75,37 +79,32 @@ def smart_fill_gaps(rows, cols, existing_snakes, obstacles_input, custom_grid,
                 parsed_path.append(p)
         
         if parsed_path:
-            strategy.occupied.update(parsed_path)
-            for r, c in parsed_path:
-                strategy.grid_array[r, c] = 1
-            strategy.snakes.append({
-                'path': parsed_path,
-                'color': color
-            })
+            strategy.place_snake(parsed_path, color)
     
     original_count = len(strategy.snakes)
-    remaining_cells = len(valid_cells - strategy.occupied)
+    remaining_cells = len(strategy.free_cells)
     logs.append(f"Existing snakes: {original_count}")
     logs.append(f"Remaining cells: {remaining_cells}")
     logs.append(f"Constraints: len={min_len}-{max_len}, bends={min_bends}-{max_bends}")
+    logs.append(f"Seed: {seed}")
     
     # 5. Smart Fill: Add snakes with simulation-based validation
+    solver = IncrementalSolver(strategy.snakes, obstacles_map, rows, cols)
     max_snakes_to_add = 200
     max_attempts_per_snake = 50
     snakes_added = 0
     
     while snakes_added < max_snakes_to_add:
-        remaining = list(valid_cells - strategy.occupied)
-        if len(remaining) < min_len:
-            logs.append(f"Not enough cells remaining ({len(remaining)} < {min_len})")
+        remaining = len(strategy.free_cells)
+        if remaining < min_len:
+            logs.append(f"Not enough cells remaining ({remaining} < {min_len})")
             break
         
         # Find a valid path (without exit check)
         found_valid = False
         
         for attempt in range(max_attempts_per_snake):
-            random.shuffle(remaining)
-            start = remaining[0]
+            start = strategy.free_cells.choice(strategy.rng)
             
             # Try to build a path using DFS
             path = _find_valid_path(
@@ -115,19 +114,11 @@ def smart_fill_gaps(rows, cols, existing_snakes, obstacles_input, custom_grid,
             if not path:
                 continue
             
-            # Temporarily add snake
-            temp_snake = {'path': path, 'color': random.choice(color_list) if color_list else '#00FF00'}
-            test_snakes = strategy.snakes + [temp_snake]
-            
-            # Validate entire level
-            test_result = validate_level(test_snakes, obstacles_map, rows, cols)
-            
-            if test_result['is_solvable']:
+            # Incremental check: only re-simulates snakes affected by the new one
+            if solver.can_add(path):
                 # Level remains solvable - keep this snake!
-                strategy.occupied.update(path)
-                for r, c in path:
-                    strategy.grid_array[r, c] = 1
-                strategy.snakes.append(temp_snake)
+                solver.add(path)
+                strategy.place_snake(path)
                 snakes_added += 1
                 found_valid = True
                 break
@@ -148,6 +139,7 @@ def smart_fill_gaps(rows, cols, existing_snakes, obstacles_input, custom_grid,
         'is_solvable': val_result['is_solvable'],
         'stuck_count': val_result['remained_count'],
         'snakes_added': new_count - original_count,
+        'seed': seed,
         'grid_rows': rows,  # Return grid dimensions used
         'grid_cols': cols
     }
@@ -174,7 +166,7 @@ def _find_valid_path(strategy, start, min_len, max_len, min_bends, max_bends):
         
         # Check if we have a valid length and bends
         if len(path) >= min_len and bends >= min_bends:
-            if len(path) >= max_len or random.random() < 0.3:
+            if len(path) >= max_len or strategy.rng.random() < 0.3:
                 return path
         
         if len(path) >= max_len:
@@ -189,7 +181,7 @@ def _find_valid_path(strategy, start, min_len, max_len, min_bends, max_bends):
             and n not in path
         ]
         
-        random.shuffle(valid_nbs)
+        strategy.rng.shuffle(valid_nbs)
         
         for next_pos in valid_nbs:
             # Calculate bends
@@ -0,0 +1,324 @@
+"""
+Solvability Engine
+
+Array-backed replacement for the dict-grid simulation in validator.py.
+Snakes are packed into flat NumPy arrays and painted onto an int32 occupancy
+grid (snake id per cell). The Numba kernel keeps a "blocked-by" list per cell,
+so removing a snake only re-examines the snakes whose head rays it was blocking.
+"""
+import numpy as np
+
+from . import optimized_ops
+
+EMPTY = -1
+OBSTACLE = -2
+
+
+def pack_snakes(snakes):
+    """
+    Flatten snake paths into arrays.
+
+    Args:
+        snakes: List of dicts {'path': [(r,c), ...]} (Head is last)
+
+    Returns:
+        (ids, cells, offsets)
+        - ids: original index of each packed snake (paths shorter than 2 are skipped)
+        - cells: int64 array (total_cells, 2)
+        - offsets: int64 array (n + 1,), snake i is cells[offsets[i]:offsets[i+1]]
+    """
+    ids = []
+    flat = []
+    offsets = [0]
+    for i, s in enumerate(snakes):
+        path = s['path']
+        if len(path) < 2: continue
+        ids.append(i)
+        flat.extend(path)
+        offsets.append(len(flat))
+
+    cells = np.array(flat, dtype=np.int64).reshape(-1, 2)
+    return ids, cells, np.array(offsets, dtype=np.int64)
+
+
+def build_occupancy(cells, offsets, obstacle_cells, rows, cols):
+    """
+    Paint snakes (by packed id) and obstacles onto an int32 grid.
+    Cells outside the grid are ignored (they can never be hit by a ray).
+    """
+    occ = np.full((rows, cols), EMPTY, dtype=np.int32)
+
+    if len(cells):
+        snake_ids = np.repeat(np.arange(len(offsets) - 1, dtype=np.int32), np.diff(offsets))
+        r, c = cells[:, 0], cells[:, 1]
+        inside = (r >= 0) & (r < rows) & (c >= 0) & (c < cols)
+        occ[r[inside], c[inside]] = snake_ids[inside]
+
+    # Obstacles override snakes and are never cleared
+    for r, c in obstacle_cells:
+        if 0 <= r < rows and 0 <= c < cols:
+            occ[r, c] = OBSTACLE
+
+    return occ
+
+
+def summarize_removal(ids, removed_step, steps):
+    """
+    Turn per-snake removal steps into the validate_level contract.
+    Mirrors the step-by-step bookkeeping of the reference simulation exactly.
+    """
+    total_snakes = len(ids)
+    ids = np.asarray(ids, dtype=np.int64)
+    removed_step = np.asarray(removed_step)
+
+    # Group removed snakes by step; IDs listed high -> low (reference pops in reverse)
+    order = np.lexsort((-ids, removed_step))
+    order = order[removed_step[order] > 0]
+    counts = np.bincount(removed_step[order], minlength=steps + 1)
+
+    logs = []
+    per_step_stuck = []
+    active = total_snakes
+    pos = 0
+    for step in range(1, steps + 1):
+        removed = int(counts[step])
+        per_step_stuck.append((active - removed) / active)
+        removed_ids = ids[order[pos:pos + removed]].tolist()
+        pos += removed
+        active -= removed
+        logs.append(f"Step {step}: Removed {removed} snakes (IDs: {removed_ids})")
+
+    is_solvable = active == 0
+    avg_stuck_ratio = sum(per_step_stuck) / len(per_step_stuck) if per_step_stuck else 0
+
+    if not is_solvable:
+        logs.append(f"FAILED: {active} snakes stuck.")
+    else:
+        logs.append(f"SUCCESS: All {total_snakes} snakes solved in {steps} steps.")
+
+    return {
+        "is_solvable": is_solvable,
+        "remained_count": active,
+        "total_snakes": total_snakes,
+        "steps": steps,
+        "avg_stuck_ratio": avg_stuck_ratio,
+        "logs": logs
+    }
+
+
+def avg_stuck_ratio(removed_step, steps):
+    """
+    avg_stuck_ratio of summarize_removal without building the logs
+    (same per-step arithmetic, so the value is identical).
+    """
+    removed_step = np.asarray(removed_step)
+    counts = np.bincount(removed_step[removed_step > 0], minlength=steps + 1)
+    per_step_stuck = []
+    active = len(removed_step)
+    for step in range(1, steps + 1):
+        removed = int(counts[step])
+        per_step_stuck.append((active - removed) / active)
+        active -= removed
+    return sum(per_step_stuck) / len(per_step_stuck) if per_step_stuck else 0
+
+
+def solve_level(snakes, obstacles_map, rows, cols):
+    """
+    Same contract as validator.validate_level, backed by the Numba engine.
+    """
+    ids, cells, offsets = pack_snakes(snakes)
+    occ = build_occupancy(cells, offsets, obstacles_map.keys(), rows, cols)
+
+    if ids:
+        removed_step, steps = optimized_ops.solve_removal_numba(rows, cols, occ, cells, offsets)
+    else:
+        removed_step, steps = np.empty(0, dtype=np.int32), 0
+
+    return summarize_removal(ids, removed_step, int(steps))
+
+
+def check_level(snakes, obstacles_map, rows, cols):
+    """
+    Verdict of solve_level without the logs.
+    Returns (is_solvable, remained_count, steps).
+    """
+    ids, cells, offsets = pack_snakes(snakes)
+    if not ids:
+        return True, 0, 0
+    occ = build_occupancy(cells, offsets, obstacles_map.keys(), rows, cols)
+    removed_step, steps = optimized_ops.solve_removal_numba(rows, cols, occ, cells, offsets)
+    remained = int(np.count_nonzero(removed_step <= 0)) # -1 = stuck
+    return remained == 0, remained, int(steps)
+
+
+class IncrementalSolver:
+    """
+    Persistent solver state for growing a level one snake at a time.
+
+    Keeps the occupancy grid, a per-cell index of the snakes whose head rays
+    pass through each cell, and a removal order (step per snake). Answering
+    "is the level still solvable with this extra snake?" only walks the
+    snakes whose rays cross the new snake's cells (and, transitively, their
+    dependents) that leave no later than the snakes blocking the new one.
+
+    Rules are the same as validate_level: a snake waits for every snake
+    occupying a cell on its head ray, so the level is solvable iff those
+    waits form no cycle and no ray hits an obstacle.
+    """
+
+    def __init__(self, snakes, obstacles_map, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.obstacles_map = obstacles_map
+        self.snakes = list(snakes)
+
+        self.occ = build_occupancy(np.empty((0, 2), dtype=np.int64), np.zeros(1, dtype=np.int64),
+                                   obstacles_map.keys(), rows, cols).ravel()
+        self.cells = [] # Flat cell indices per registered snake
+        self.ray_index = {} # Flat cell -> [snake ids whose head ray passes through it]
+        self.step = [] # Removal step per snake (any valid order once snakes are added)
+        # Overlapping / out-of-grid snakes break the "wait for every occupant" rule,
+        # those levels fall back to a full solve.
+        self.exact = True
+
+        for s in self.snakes:
+            if len(s['path']) >= 2:
+                self._register(s['path'])
+
+        result = solve_level(self.snakes, obstacles_map, rows, cols)
+        self.is_solvable = result['is_solvable']
+        if self.is_solvable and self.exact:
+            _, cells, offsets = pack_snakes(self.snakes)
+            occ = build_occupancy(cells, offsets, obstacles_map.keys(), rows, cols)
+            removed_step, _ = optimized_ops.solve_removal_numba(rows, cols, occ, cells, offsets)
+            self.step = removed_step.tolist()
+
+    def _flat_cells(self, path):
+        """Flat indices of a path, or None if any cell is off-grid or already occupied."""
+        flat = []
+        for r, c in path:
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                return None
+            cell = r * self.cols + c
+            if self.occ[cell] != EMPTY:
+                return None
+            flat.append(cell)
+        return flat
+
+    def _ray(self, path):
+        """Flat indices along the head ray, or None for a degenerate head."""
+        (nr, nc), (hr, hc) = path[-2], path[-1]
+        dr, dc = hr - nr, hc - nc
+        if dr == 0 and dc == 0:
+            return None
+        ray = []
+        r, c = hr + dr, hc + dc
+        while 0 <= r < self.rows and 0 <= c < self.cols:
+            ray.append(r * self.cols + c)
+            r += dr
+            c += dc
+        return ray
+
+    def _register(self, path):
+        sid = len(self.cells)
+        flat = self._flat_cells(path)
+        if flat is None:
+            self.exact = False
+            flat = [r * self.cols + c for r, c in path if 0 <= r < self.rows and 0 <= c < self.cols]
+        for cell in flat:
+            if self.occ[cell] != OBSTACLE:
+                self.occ[cell] = sid
+        ray = self._ray(path)
+        for cell in ray or ():
+            self.ray_index.setdefault(cell, []).append(sid)
+        self.cells.append(flat)
+        return sid, ray
+
+    def can_add(self, path):
+        """True if the level stays solvable with this extra snake."""
+        if not self.is_solvable:
+            return False # Adding a snake only adds blockers
+        if len(path) < 2:
+            return True # Ignored by the validator
+
+        flat = self._flat_cells(path)
+        if not self.exact or flat is None:
+            return solve_level(self.snakes + [{'path': path}], self.obstacles_map, self.rows, self.cols)['is_solvable']
+
+        ray = self._ray(path)
+        if ray is None:
+            return False
+
+        own = set(flat)
+        blockers = set()
+        for cell in ray:
+            v = self.occ[cell]
+            if v == OBSTACLE or cell in own:
+                return False
+            if v >= 0:
+                blockers.add(int(v))
+
+        if not blockers:
+            return True # Leaves on the first step
+
+        # A cycle needs a chain blocker -> ... -> snake waiting on the new one.
+        # Waits strictly decrease the removal step, so only snakes leaving
+        # no later than the last blocker can be on it.
+        limit = max(self.step[b] for b in blockers)
+        step = self.step
+        seen = set()
+        stack = []
+        for cell in flat:
+            for w in self.ray_index.get(cell, ()):
+                if w not in seen and step[w] <= limit:
+                    seen.add(w)
+                    stack.append(w)
+
+        while stack:
+            s = stack.pop()
+            if s in blockers:
+                return False
+            for cell in self.cells[s]:
+                for w in self.ray_index.get(cell, ()):
+                    if w not in seen and step[w] <= limit:
+                        seen.add(w)
+                        stack.append(w)
+        return True
+
+    def add(self, path):
+        """Register a snake accepted by can_add and update the removal order."""
+        self.snakes.append({'path': path})
+        if len(path) < 2:
+            return
+        if not self.exact or self._flat_cells(path) is None:
+            self._register(path)
+            self.is_solvable = solve_level(self.snakes, self.obstacles_map, self.rows, self.cols)['is_solvable']
+            return
+
+        sid, ray = self._register(path)
+        own = set(self.cells[sid])
+        if ray is None or any(cell in own or self.occ[cell] == OBSTACLE for cell in ray):
+            self.step.append(0)
+            self.is_solvable = False # Never leaves
+            return
+
+        first = 1
+        for cell in ray:
+            v = self.occ[cell]
+            if v >= 0:
+                first = max(first, self.step[v] + 1)
+        self.step.append(first)
+
+        # Snakes waiting on the new one must now leave after it
+        stack = [sid]
+        while stack:
+            s = stack.pop()
+            for cell in self.cells[s]:
+                for w in self.ray_index.get(cell, ()):
+                    if self.step[w] <= self.step[s]:
+                        self.step[w] = self.step[s] + 1
+                        if self.step[w] > len(self.step):
+                            # Only a wait cycle can push a step past the snake count
+                            self.is_solvable = False
+                            return
+                        stack.append(w)
@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
 import random
+import time
+from .. import optimized_ops
+from ..log_sink import LogSink
 
 class BaseStrategy(ABC):
-    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list):
+    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list, seed=None):
         self.rows = rows
         self.cols = cols
         self.valid_cells = valid_cells # set of (r, c)
@@ -10,7 +13,22 @@ class BaseStrategy(ABC):
         self.color_list = color_list
         self.occupied = set()
         self.snakes = []
-        self.logs = []
+        self.logs = LogSink() # Formatted lazily, see log()
+        # Wall-clock deadline (time.time()), checked between snakes and bonus passes
+        self.deadline = None
+        # Optional threading.Event set to cancel generation (checked like the deadline)
+        self.cancel_event = None
+        # Optional callback(snake_count) called after each placed snake
+        self.on_snake_placed = None
+        
+        # Per-strategy RNG: Python-side choices draw from self.rng, the Numba kernels
+        # are reseeded with the same seed, so a seed reproduces the whole run.
+        # Without a seed, one is drawn from the global random module (and kept in self.seed).
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        optimized_ops.seed_numba(seed & 0xFFFFFFFF) # Numba seeds are 32-bit
         
         # Initialize NumPy Grid for Optimization
         import numpy as np
@@ -24,6 +42,11 @@ class BaseStrategy(ABC):
         # Set obstacles to 1 (Blocked)
         for r in obstacles_map:
             self.grid_array[r[0], r[1]] = 1
+        
+        # Free cells (valid and not occupied) and clear exit directions, kept in sync by place_snake
+        from ..grid_index import FreeCellIndex, ExitMap
+        self.free_cells = FreeCellIndex(rows, cols, self.grid_array)
+        self.exit_map = ExitMap(rows, cols, self.grid_array)
 
     @abstractmethod
     def generate(self, arrow_count, min_len, max_len, min_bends, max_bends):
@@ -40,8 +63,15 @@ class BaseStrategy(ABC):
                 (r, c) in self.valid_cells and 
                 (r, c) not in self.occupied)
 
-    def log(self, message):
-        self.logs.append(message)
+    def should_stop(self):
+        """True once the time budget is spent or the run is cancelled; generation loops keep what they have."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            return True
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def log(self, message, *args):
+        """Record a log line. %-style args are only formatted if the logs are read or streamed."""
+        self.logs.log(message, *args)
         
     def get_result(self):
         return {
@@ -1,4 +1,3 @@
-import random
 from .layered import LayeredStrategy
 from .min_fragment import min_fragment_bonus_fill
 
@@ -11,6 +10,7 @@ class EdgeHuggerStrategy(LayeredStrategy):
     """
     # Enable bonus fill by default (controlled by client)
     ENABLE_BONUS_FILL = True
+    HEURISTIC_MODE = 1 # EdgeHugger
     
     # Configurable params with defaults
     DEFAULT_CONFIG = {
@@ -19,45 +19,12 @@ class EdgeHuggerStrategy(LayeredStrategy):
         'wall_follow_strength': 0.8,  # How strongly to follow walls (0-1)
     }
     
-    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list, config=None):
-        super().__init__(rows, cols, valid_cells, obstacles_map, color_list)
+    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list, config=None, seed=None):
+        super().__init__(rows, cols, valid_cells, obstacles_map, color_list, seed)
         self.config = {**self.DEFAULT_CONFIG, **(config or {})}
     
-    def generate(self, arrow_count, min_len, max_len, min_bends, max_bends):
-        # Phase 1: Main Strategy Generation
-        for i in range(arrow_count):
-            success = False
-            
-            candidates = self.get_candidates()
-            
-            if not candidates:
-                candidates = list(self.valid_cells - self.occupied)
-                random.shuffle(candidates)
-
-            pool = candidates[:20] 
-            
-            for start_pos in pool:
-                # Heuristic Mode 1: EdgeHugger
-                path = self.find_solvable_path(start_pos, min_len, max_len, min_bends, max_bends, heuristic_mode=1)
-                if path:
-                    self.occupied.update(path)
-                    for r, c in path: self.grid_array[r, c] = 1 # Sync Grid Array
-                    color = random.choice(self.color_list) if self.color_list else "#00FF00"
-                    self.snakes.append({
-                        "path": path,
-                        "color": color
-                    })
-                    success = True
-                    break
-            
-            if not success:
-               self.log(f"Warning: Could not place Snake {i+1} (Strict Solvability Mode).")
-        
-        # Phase 2: Bonus Fill with MIN_FRAGMENT (only if enabled)
-        if self.ENABLE_BONUS_FILL:
-            min_fragment_bonus_fill(self, min_len, max_len, min_bends, max_bends)
-        
-        return self.get_result()
+    def bonus_fill(self, min_len, max_len, min_bends, max_bends):
+        min_fragment_bonus_fill(self, min_len, max_len, min_bends, max_bends)
     
     def get_candidates(self):
         edge_distance_max = self.config['edge_distance_max']
@@ -88,7 +55,7 @@ class EdgeHuggerStrategy(LayeredStrategy):
         
         limit = max(5, int(len(candidates) * 0.3))
         pool = [x[0] for x in candidates[:limit]]
-        random.shuffle(pool)
+        self.rng.shuffle(pool)
         return pool
         
     def sort_neighbors(self, nbs, current_path):
@@ -101,6 +68,6 @@ class EdgeHuggerStrategy(LayeredStrategy):
         def score(n):
             dist = min(n[0], self.rows - 1 - n[0], n[1], self.cols - 1 - n[1])
             # Apply wall follow strength
-            return dist * wall_follow_strength + random.random() * (1 - wall_follow_strength)
+            return dist * wall_follow_strength + self.rng.random() * (1 - wall_follow_strength)
             
         return sorted(nbs, key=score)
@@ -1,4 +1,4 @@
-import random
+import numpy as np
 from .base import BaseStrategy
 
 from ..utils import get_neighbors
@@ -8,45 +8,60 @@ class LayeredStrategy(BaseStrategy):
     # Set to False in SmartDynamicStrategy to disable bonus fill
     ENABLE_BONUS_FILL = True
     
+    # Neighbour ordering used by the Numba DFS
+    # (0 = SmartDynamic, 1 = EdgeHugger, 2 = MaxClump, 3/4 = SpiralFill clockwise/counter-clockwise)
+    HEURISTIC_MODE = 0
+    # Spiral turn preference (0-1), only used by modes 3 and 4
+    TIGHTNESS = 0.7
+    # Start cells tried per snake
+    START_POOL_SIZE = 20
+    
     def generate(self, arrow_count, min_len, max_len, min_bends, max_bends):
         # Phase 1: Main Strategy Generation
         for i in range(arrow_count):
-            success = False
+            if self.should_stop():
+                self.log("Time budget reached: placed %d of %d snakes.", len(self.snakes), arrow_count)
+                break
             
             candidates = self.get_candidates()
             
             if not candidates:
-                candidates = list(self.valid_cells - self.occupied)
-                random.shuffle(candidates)
-            elif isinstance(candidates[0], tuple) and len(candidates[0]) == 2:
-                 pass
-            else:
-                 pass
+                candidates = self.free_cells.cells()
+                self.rng.shuffle(candidates)
 
-            pool = candidates[:20] 
+            pool = candidates[:self.START_POOL_SIZE]
             
-            for start_pos in pool:
-                path = self.find_solvable_path(start_pos, min_len, max_len, min_bends, max_bends)
-                if path:
-                    self.occupied.update(path)
-                    for r, c in path: self.grid_array[r, c] = 1 # Sync Grid Array
-                    color = random.choice(self.color_list) if self.color_list else "#00FF00"
-                    self.snakes.append({
-                        "path": path,
-                        "color": color
-                    })
-                    success = True
-                    break
-            
-            if not success:
-               self.log(f"Warning: Could not place Snake {i+1} (Strict Solvability Mode).")
+            path = self.find_first_path(pool, min_len, max_len, min_bends, max_bends, self.HEURISTIC_MODE, self.TIGHTNESS)
+            if path:
+                self.place_snake(path)
+            else:
+               self.log("Warning: Could not place Snake %d (Strict Solvability Mode).", i + 1)
         
-        # Phase 2: Bonus Fill - Use SmartDynamic logic to fill remaining gaps
-        if self.ENABLE_BONUS_FILL:
-            self._bonus_fill(min_len, max_len, min_bends, max_bends)
+        # Phase 2: Bonus Fill (only if enabled)
+        if self.ENABLE_BONUS_FILL and not self.should_stop():
+            self.bonus_fill(min_len, max_len, min_bends, max_bends)
         
         return self.get_result()
 
+    def bonus_fill(self, min_len, max_len, min_bends, max_bends):
+        """Fill the gaps left after the main loop. Default: SmartDynamic logic."""
+        self._bonus_fill(min_len, max_len, min_bends, max_bends)
+
+    def place_snake(self, path, color=None):
+        """Commit a path: mark its cells occupied, sync grid_array and record the snake."""
+        self.occupied.update(path)
+        for r, c in path: self.grid_array[r, c] = 1 # Sync Grid Array
+        self.free_cells.remove(path)
+        self.exit_map.block(path)
+        if color is None:
+            color = self.rng.choice(self.color_list) if self.color_list else "#00FF00"
+        self.snakes.append({
+            "path": path,
+            "color": color
+        })
+        if self.on_snake_placed is not None:
+            self.on_snake_placed(len(self.snakes))
+
     def _bonus_fill(self, min_len, max_len, min_bends, max_bends):
         """
         Fill remaining gaps with SmartDynamic-like logic.
@@ -54,13 +69,13 @@ class LayeredStrategy(BaseStrategy):
         """
         from ..utils import count_free_neighbors
         
-        initial_remaining = len(self.valid_cells - self.occupied)
+        initial_remaining = len(self.free_cells)
         initial_total = len(self.valid_cells)
         
         if initial_remaining == 0:
             return
             
-        self.log(f"Bonus Fill: {initial_remaining} cells remaining. Starting smart fill...")
+        self.log("Bonus Fill: %d cells remaining. Starting smart fill...", initial_remaining)
         
         bonus_snakes = 0
         max_bonus = 100
@@ -74,90 +89,54 @@ class LayeredStrategy(BaseStrategy):
         
         for pass_min, pass_max, pass_name in passes:
             if bonus_snakes >= max_bonus: break
+            if self.should_stop(): break
                 
             # Heuristic Loop: Keep trying as long as we find something
             # To avoid infinite loops, limit consecutive failures
             max_consecutive_misses = 20 
             misses = 0
             
-            while misses < max_consecutive_misses and bonus_snakes < max_bonus:
-                remaining = list(self.valid_cells - self.occupied)
-                if not remaining: break
+            while misses < max_consecutive_misses and bonus_snakes < max_bonus and not self.should_stop():
+                if not len(self.free_cells): break
                 
                 # OPTIMIZATION: Prioritize candidates that are LIKELY solvable.
                 # A candidate is solvable if it has a raycast to boundary/obstacle.
                 # We can pre-filter or sort by distance to boundary?
                 # Or just simple Shuffle to avoid getting stuck in "Deep Hole" traps.
                 # Let's try shuffling first, it's robust.
-                random.shuffle(remaining)
+                batch_size = 50
+                remaining = self.free_cells.sample(batch_size, self.rng)
                 
                 # Better: Sort by "Distance from Occupied/Edge" -> Closer to "Open Space" is better?
-                # Actually, simply checking `is_exitable` for 4 directions is cheap.
-                # Let's prioritize cells that have AT LEAST ONE clear exit direction immediately.
+                # Let's prioritize cells that have AT LEAST ONE clear exit direction immediately
+                # (read straight off the exit map).
                 
-                solvable_candidates = []
-                unsolvable_candidates = []
-                
-                # Check a batch of candidates to find solvable starts
-                batch_size = 50
-                for cand in remaining[:batch_size]:
-                    # Check 4 directions for immediate exit
-                    has_exit = False
-                    for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                        if self.is_exitable(cand, (dr, dc)):
-                            has_exit = True
-                            break
-                    if has_exit:
-                        solvable_candidates.append(cand)
-                    else:
-                        unsolvable_candidates.append(cand)
+                has_exit = self.exit_map.has_exit_many(remaining)
+                solvable_candidates = [cand for cand, ok in zip(remaining, has_exit) if ok]
+                unsolvable_candidates = [cand for cand, ok in zip(remaining, has_exit) if not ok]
                 
                 # Combine: Solvable first
                 pool = solvable_candidates + unsolvable_candidates
                 
-                found = False
-                for start in pool[:10]: # Try top 10 from filtered pool
-                    # For Bonus Fill, we want to fill VOIDS.
-                    # So prioritizing neighbors that have FEW free neighbors (filling holes) 
-                    # is still good for SHAPE, provided the START is good.
-                    
-                    old_sort = self.sort_neighbors
-                    # Sort neighbors by "Constrainedness" to tightly pack
-                    # Use Numba Optimized Count
-                    self.sort_neighbors = lambda nbs, path: sorted(
-                        nbs, 
-                        key=lambda n: optimized_ops.count_free_neighbors_numba(self.rows, self.cols, self.grid_array, n[0], n[1]) + random.random()
-                    )
-                    
-                    path = self.find_solvable_path(start, pass_min, pass_max, min_bends, max_bends)
-                    
-                    self.sort_neighbors = old_sort
-                    
-                    if path:
-                        self.occupied.update(path)
-                        for r, c in path: self.grid_array[r, c] = 1 # Sync Grid Array
-                        color = random.choice(self.color_list) if self.color_list else "#00FF00"
-                        self.snakes.append({
-                            "path": path,
-                            "color": color
-                        })
-                        bonus_snakes += 1
-                        found = True
-                        misses = 0 # Reset misses
-                        break
+                # Try top 10 from filtered pool
+                path = self.find_first_path(pool[:10], pass_min, pass_max, min_bends, max_bends)
+                found = bool(path)
+                if path:
+                    self.place_snake(path)
+                    bonus_snakes += 1
+                    misses = 0 # Reset misses
                 
                 if not found:
                     misses += 1
                     
         if bonus_snakes > 0:
             filled = len(self.occupied) - (len(self.valid_cells) - initial_remaining)
-            self.log(f"Bonus Fill Complete: Added {bonus_snakes} snakes.")
+            self.log("Bonus Fill Complete: Added %d snakes.", bonus_snakes)
 
     def get_candidates(self):
         """Override this to bias start positions (e.g. Center, Edge)"""
-        pool = list(self.valid_cells - self.occupied)
-        random.shuffle(pool)
-        return pool
+        # Random free cells; only the first START_POOL_SIZE are ever tried
+        return self.free_cells.sample(self.START_POOL_SIZE, self.rng)
 
     def compute_distance_map(self):
         """
@@ -178,20 +157,40 @@ class LayeredStrategy(BaseStrategy):
 
     # _check_and_add_exit is no longer needed with Numba logic
 
-    def find_solvable_path(self, start_pos, min_len, max_len, min_bends, max_bends, heuristic_mode=0):
+    def find_solvable_path(self, start_pos, min_len, max_len, min_bends, max_bends, heuristic_mode=0, tightness=0.7):
         # Delegate to Numba DFS (Ultra Fast)
         success, path = optimized_ops.dfs_numba(
             self.rows, self.cols, self.grid_array, 
             start_pos[0], start_pos[1], 
             min_len, max_len, min_bends, max_bends, 
             max_nodes=1000, # Increased limit since it's fast now
-            heuristic_mode=heuristic_mode
+            heuristic_mode=heuristic_mode,
+            tightness=tightness
         )
         
         if success:
-            return path
+            # int32 (length, 2) array -> list of (r, c) tuples
+            return [tuple(p) for p in path.tolist()]
         return None
 
+    def find_first_path(self, starts, min_len, max_len, min_bends, max_bends, heuristic_mode=0, tightness=0.7):
+        """
+        Try starts in order and return the first path found (or None).
+        One Numba call for the whole pool, same result as calling
+        find_solvable_path on each start in turn.
+        """
+        if not starts:
+            return None
+        start_arr = np.array(starts, dtype=np.int64).reshape(-1, 2)
+        index, path = optimized_ops.dfs_first_numba(
+            self.rows, self.cols, self.grid_array, start_arr,
+            min_len, max_len, min_bends, max_bends,
+            1000, heuristic_mode, tightness
+        )
+        if index < 0:
+            return None
+        return [tuple(p) for p in path.tolist()]
+
     def is_exitable(self, curr, direction, path=None):
         if not direction: return False 
         r, c = curr
@@ -206,5 +205,5 @@ class LayeredStrategy(BaseStrategy):
         return optimized_ops.check_raycast_numba(self.rows, self.cols, self.grid_array, r, c, dr, dc, numba_path) 
 
     def sort_neighbors(self, nbs, current_path):
-        random.shuffle(nbs)
+        self.rng.shuffle(nbs)
         return nbs
@@ -1,4 +1,3 @@
-import random
 from .layered import LayeredStrategy
 from .min_fragment import min_fragment_bonus_fill
 from ..utils import count_free_neighbors
@@ -12,6 +11,7 @@ class MaxClumpStrategy(LayeredStrategy):
     """
     # Enable bonus fill by default (controlled by client)
     ENABLE_BONUS_FILL = True
+    HEURISTIC_MODE = 2 # MaxClump
     
     # Configurable params with defaults
     DEFAULT_CONFIG = {
@@ -20,45 +20,12 @@ class MaxClumpStrategy(LayeredStrategy):
         'avoid_edges': False,     # Avoid edge cells
     }
     
-    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list, config=None):
-        super().__init__(rows, cols, valid_cells, obstacles_map, color_list)
+    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list, config=None, seed=None):
+        super().__init__(rows, cols, valid_cells, obstacles_map, color_list, seed)
         self.config = {**self.DEFAULT_CONFIG, **(config or {})}
     
-    def generate(self, arrow_count, min_len, max_len, min_bends, max_bends):
-        # Phase 1: Main Strategy Generation
-        for i in range(arrow_count):
-            success = False
-            
-            candidates = self.get_candidates()
-            
-            if not candidates:
-                candidates = list(self.valid_cells - self.occupied)
-                random.shuffle(candidates)
-
-            pool = candidates[:20] 
-            
-            for start_pos in pool:
-                # Heuristic Mode 2: MaxClump
-                path = self.find_solvable_path(start_pos, min_len, max_len, min_bends, max_bends, heuristic_mode=2)
-                if path:
-                    self.occupied.update(path)
-                    for r, c in path: self.grid_array[r, c] = 1 # Sync Grid Array
-                    color = random.choice(self.color_list) if self.color_list else "#00FF00"
-                    self.snakes.append({
-                        "path": path,
-                        "color": color
-                    })
-                    success = True
-                    break
-            
-            if not success:
-               self.log(f"Warning: Could not place Snake {i+1} (Strict Solvability Mode).")
-        
-        # Phase 2: Bonus Fill with MIN_FRAGMENT (only if enabled)
-        if self.ENABLE_BONUS_FILL:
-            min_fragment_bonus_fill(self, min_len, max_len, min_bends, max_bends)
-        
-        return self.get_result()
+    def bonus_fill(self, min_len, max_len, min_bends, max_bends):
+        min_fragment_bonus_fill(self, min_len, max_len, min_bends, max_bends)
     
     def get_candidates(self):
         min_area_size = self.config['min_area_size']
@@ -88,7 +55,7 @@ class MaxClumpStrategy(LayeredStrategy):
         
         limit = max(5, int(len(candidates) * 0.15))
         pool = [x[0] for x in candidates[:limit]]
-        random.shuffle(pool)
+        self.rng.shuffle(pool)
         return pool
 
     def sort_neighbors(self, nbs, current_path):
@@ -102,6 +69,6 @@ class MaxClumpStrategy(LayeredStrategy):
             free_n = count_free_neighbors(n[0], n[1], self.rows, self.cols, 
                                           self.occupied | set(current_path))
             # Higher expansion_rate = prefer more open areas
-            return -free_n * expansion_rate + random.random() * (1 - expansion_rate)
+            return -free_n * expansion_rate + self.rng.random() * (1 - expansion_rate)
             
         return sorted(nbs, key=score)
@@ -1,4 +1,4 @@
-import random
+import numpy as np
 from .layered import LayeredStrategy
 from ..utils import count_free_neighbors, get_neighbors
 
@@ -25,7 +25,7 @@ class MinFragmentStrategy(LayeredStrategy):
         
         limit = max(5, int(len(candidates) * 0.2))
         pool = [x[0] for x in candidates[:limit]]
-        random.shuffle(pool)
+        self.rng.shuffle(pool)
         return pool
 
     def sort_neighbors(self, nbs, current_path):
@@ -36,18 +36,22 @@ class MinFragmentStrategy(LayeredStrategy):
         def score(n):
             free_n = count_free_neighbors(n[0], n[1], self.rows, self.cols, 
                                           self.occupied | set(current_path))
-            return free_n + random.random() * 0.5
+            return free_n + self.rng.random() * 0.5
             
         return sorted(nbs, key=score)
 
 
-def _min_fragment_sort_neighbors(strategy, nbs, current_path):
-    """Helper to sort neighbors using MinFragment logic - fill holes first."""
-    def score(n):
-        free_n = count_free_neighbors(n[0], n[1], strategy.rows, strategy.cols, 
-                                      strategy.occupied | set(current_path))
-        return free_n + random.random() * 0.3
-    return sorted(nbs, key=score)
+def _free_neighbor_counts(strategy, obstacle_cells):
+    """
+    count_free_neighbors for every cell at once: in-grid neighbors that are
+    not occupied by a snake (voids and obstacles count as free, as in utils).
+    """
+    rows, cols = strategy.rows, strategy.cols
+    occupied = strategy.grid_array == 1
+    occupied[obstacle_cells[:, 0], obstacle_cells[:, 1]] = False
+    
+    padded = np.pad(~occupied, 1, constant_values=False).astype(np.int32)
+    return padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
 
 
 def min_fragment_bonus_fill(strategy, min_len, max_len, min_bends, max_bends):
@@ -56,21 +60,17 @@ def min_fragment_bonus_fill(strategy, min_len, max_len, min_bends, max_bends):
     KEEPS is_exitable check to ensure snakes are solvable.
     Uses smarter candidate selection to find cells that CAN exit.
     """
-    initial_remaining = len(strategy.valid_cells - strategy.occupied)
+    initial_remaining = len(strategy.free_cells)
     
     if initial_remaining == 0:
         return
         
-    strategy.log(f"MIN_FRAGMENT Bonus Fill: {initial_remaining} cells remaining...")
+    strategy.log("MIN_FRAGMENT Bonus Fill: %d cells remaining...", initial_remaining)
     
     bonus_snakes = 0
     max_bonus = 200
     
-    # Store original sort function
-    original_sort = strategy.sort_neighbors
-    
-    # Override with MinFragment sorting for tighter packing
-    strategy.sort_neighbors = lambda nbs, path: _min_fragment_sort_neighbors(strategy, nbs, path)
+    obstacle_cells = np.array(list(strategy.obstacles_map), dtype=np.int64).reshape(-1, 2)
     
     # Passes: All use user-defined min_len/max_len (no hardcoding)
     passes = [
@@ -82,74 +82,56 @@ def min_fragment_bonus_fill(strategy, min_len, max_len, min_bends, max_bends):
     for pass_min, pass_max, pass_name in passes:
         if bonus_snakes >= max_bonus:
             break
+        if strategy.should_stop():
+            break
             
         max_consecutive_misses = 40  # Higher tolerance
         misses = 0
         
-        while misses < max_consecutive_misses and bonus_snakes < max_bonus:
-            remaining = list(strategy.valid_cells - strategy.occupied)
+        while misses < max_consecutive_misses and bonus_snakes < max_bonus and not strategy.should_stop():
+            remaining = strategy.free_cells.cells()
             if not remaining:
                 break
             
             # SMART CANDIDATE SELECTION:
             # 1. Score each cell by: fewest free neighbors (small holes) + has exit potential
-            candidates = []
-            for pos in remaining:
-                free_n = count_free_neighbors(pos[0], pos[1], strategy.rows, strategy.cols, strategy.occupied)
-                
-                # Check if this cell has ANY clear exit direction
-                has_exit = False
-                for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                    if strategy.is_exitable(pos, (dr, dc)):
-                        has_exit = True
-                        break
-                
-                # Score: prioritize cells WITH exits and few free neighbors
-                # Has exit = 0, No exit = 100 (penalty)
-                exit_penalty = 0 if has_exit else 100
-                score = free_n + exit_penalty
-                
-                candidates.append((pos, score, has_exit))
+            cells = np.array(remaining, dtype=np.int64)
+            free_n = _free_neighbor_counts(strategy, obstacle_cells)[cells[:, 0], cells[:, 1]]
+            
+            # Check if each cell has ANY clear exit direction (exit map, no raycasts)
+            has_exit = strategy.exit_map.has_exit_many(cells)
             
-            # Sort by score (lower = better)
-            candidates.sort(key=lambda x: x[1])
+            # Score: prioritize cells WITH exits and few free neighbors
+            # Has exit = 0, No exit = 100 (penalty)
+            scores = free_n + np.where(has_exit, 0, 100)
+            
+            # Sort by score (lower = better), ties keep index order
+            order = np.argsort(scores, kind='stable')
+            ranked_exit = has_exit[order]
             
             # Take top candidates that have exits FIRST
-            exit_pool = [x[0] for x in candidates if x[2]][:20]
-            no_exit_pool = [x[0] for x in candidates if not x[2]][:10]
+            exit_pool = [remaining[i] for i in order[ranked_exit][:20].tolist()]
+            no_exit_pool = [remaining[i] for i in order[~ranked_exit][:10].tolist()]
             
             pool = exit_pool + no_exit_pool
-            random.shuffle(pool[:len(exit_pool)])  # Shuffle within exit pool
+            strategy.rng.shuffle(pool[:len(exit_pool)])  # Shuffle within exit pool
             
             if not pool:
                 break
             
-            found = False
-            for start in pool:
-                # Use strategy's find_solvable_path (which checks is_exitable)
-                path = strategy.find_solvable_path(start, pass_min, pass_max, min_bends, max_bends)
-                
-                if path:
-                    strategy.occupied.update(path)
-                    for r, c in path: strategy.grid_array[r, c] = 1 # Sync Grid Array for Numba
-                    color = random.choice(strategy.color_list) if strategy.color_list else "#00FF00"
-                    strategy.snakes.append({
-                        "path": path,
-                        "color": color
-                    })
-                    bonus_snakes += 1
-                    found = True
-                    misses = 0
-                    break
+            # Use strategy's find_first_path (which checks is_exitable)
+            path = strategy.find_first_path(pool, pass_min, pass_max, min_bends, max_bends)
+            found = bool(path)
+            if path:
+                strategy.place_snake(path)
+                bonus_snakes += 1
+                misses = 0
             
             if not found:
                 misses += 1
-    
-    # Restore original sort function
-    strategy.sort_neighbors = original_sort
                 
     if bonus_snakes > 0:
-        final_remaining = len(strategy.valid_cells - strategy.occupied)
-        strategy.log(f"MIN_FRAGMENT Bonus Fill Complete: Added {bonus_snakes} snakes. {final_remaining} cells remaining.")
+        final_remaining = len(strategy.free_cells)
+        strategy.log("MIN_FRAGMENT Bonus Fill Complete: Added %d snakes. %d cells remaining.", bonus_snakes, final_remaining)
     else:
         strategy.log("MIN_FRAGMENT Bonus Fill: No additional snakes could be placed.")
@@ -1,4 +1,3 @@
-import random
 from .layered import LayeredStrategy
 
 
@@ -16,15 +15,15 @@ class RandomAdaptiveStrategy(LayeredStrategy):
         'avoid_corners': False,   # Avoid corner cells
     }
     
-    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list, config=None):
-        super().__init__(rows, cols, valid_cells, obstacles_map, color_list)
+    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list, config=None, seed=None):
+        super().__init__(rows, cols, valid_cells, obstacles_map, color_list, seed)
         self.config = {**self.DEFAULT_CONFIG, **(config or {})}
 
     def get_candidates(self):
         prefer_edges = self.config['prefer_edges']
         avoid_corners = self.config['avoid_corners']
         
-        pool = list(self.valid_cells - self.occupied)
+        pool = self.free_cells.cells()
         
         if avoid_corners:
             # Remove corner cells
@@ -46,9 +45,9 @@ class RandomAdaptiveStrategy(LayeredStrategy):
             # Add some randomness to avoid being too predictable
             if len(pool) > 10:
                 top = pool[:10]
-                random.shuffle(top)
+                self.rng.shuffle(top)
                 pool = top + pool[10:]
         else:
-            random.shuffle(pool)
+            self.rng.shuffle(pool)
         
         return pool
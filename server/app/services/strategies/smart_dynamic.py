@@ -1,6 +1,7 @@
-import random
 import sys
+import numpy as np
 from .layered import LayeredStrategy
+from ..grid_index import DistanceField, CandidateQueue
 from ..utils import get_neighbors, count_free_neighbors
 
 sys.setrecursionlimit(5000)
@@ -23,24 +24,25 @@ class SmartDynamicStrategy(LayeredStrategy):
         'pool_size_percent': 0.25,   # % of candidates to random from (0.1-0.5)
     }
     
-    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list, config=None):
-        super().__init__(rows, cols, valid_cells, obstacles_map, color_list)
+    def __init__(self, rows, cols, valid_cells, obstacles_map, color_list, config=None, seed=None):
+        super().__init__(rows, cols, valid_cells, obstacles_map, color_list, seed)
         self.config = {**self.DEFAULT_CONFIG, **(config or {})}
-        self.candidate_cache = [] # Cache for sorted candidates
-        self.cache_batch_id = 0
+        self.candidate_queue = CandidateQueue(self.grid_array) # Cache for sorted candidates
+        self.dist_field = None # Incremental distance map, created on first refill
+
+    def place_snake(self, path, color=None):
+        super().place_snake(path, color)
+        if self.dist_field is not None:
+            self.dist_field.block(path)
 
     def get_candidates(self):
         # 0. Try to use Cache
-        # Filter out occupied/invalid from cache lazily
-        valid_cache = []
+        # Occupied/invalid cells are skipped lazily by the queue
         batch_size = 50 # Return 50 candidates at a time
         
-        while self.candidate_cache:
-            cand = self.candidate_cache.pop(0)
-            if cand in self.valid_cells and cand not in self.occupied and cand not in self.obstacles_map:
-                valid_cache.append(cand)
-                if len(valid_cache) >= batch_size:
-                    return valid_cache
+        valid_cache = self.candidate_queue.take(batch_size)
+        if len(valid_cache) >= batch_size:
+            return valid_cache
         
         # If we reach here, we didn't find enough valid candidates in cache.
         # Need to RECOMPUTE (Refill Cache)
@@ -48,48 +50,24 @@ class SmartDynamicStrategy(LayeredStrategy):
         depth_priority = self.config['depth_priority']
         pool_size_percent = self.config['pool_size_percent']
         
-        # 1. Compute Distance Map from Exits
-        dist_map = self.compute_distance_map()
+        # 1. Distance Map from Exits (built once, then updated as snakes are placed)
+        if self.dist_field is None:
+            self.dist_field = DistanceField(self.rows, self.cols, self.grid_array)
         
-        # 2. Filter valid candidates (Iterate only reachable cells in dist_map)
-        candidates = []
-        for pos, dist in dist_map.items():
-            if pos in self.valid_cells and pos not in self.occupied and pos not in self.obstacles_map:
-                candidates.append((pos, dist))
+        # 2. Free cells sorted deepest first, fewest free neighbors first within a depth
+        cells, depths = self.dist_field.free_cells_by_depth()
         
-        # 3. Bucket Sort by Distance
-        buckets = {}
-        max_dist = 0
-        for pos, dist in candidates:
-            if dist not in buckets: buckets[dist] = []
-            buckets[dist].append(pos)
-            if dist > max_dist: max_dist = dist
-            
-        # 4. Collect Top Candidates from Deepest Buckets
-        # We want to fill the cache with MANY candidates now
+        # 3. Collect Top Candidates from Deepest Buckets
+        # We want to fill the cache with MANY candidates now (whole buckets, up to ~1000)
         cache_limit = 1000 # Cache up to 1000 candidates
-        refilled_cache = []
-        
-        from .. import optimized_ops 
-        
-        for d in range(max_dist, -1, -1):
-            if d not in buckets: continue
-            
-            group = buckets[d]
-            
-            # Use Numba Optimized Count
-            group.sort(key=lambda p: optimized_ops.count_free_neighbors_numba(self.rows, self.cols, self.grid_array, p[0], p[1]))
-            
-            refilled_cache.extend(group)
-            
-            if len(refilled_cache) >= cache_limit:
-                break
-                
-        # Update self.candidate_cache
-        self.candidate_cache = refilled_cache
+        end = len(cells)
+        if end > cache_limit:
+            last_depth = depths[cache_limit - 1]
+            end = int(np.searchsorted(-depths, -last_depth, side='right'))
+        self.candidate_queue.reset(cells[:end])
         
         # Return the first batch from the new cache
-        return self.candidate_cache[:batch_size]
+        return self.candidate_queue.peek(batch_size)
 
     def sort_neighbors(self, nbs, current_path):
         """
@@ -110,7 +88,7 @@ class SmartDynamicStrategy(LayeredStrategy):
             free_n = optimized_ops.count_free_neighbors_numba(self.rows, self.cols, self.grid_array, n[0], n[1])
             
             # 2. Random noise based on depth_priority
-            score = free_n * depth_priority + random.random() * (1 - depth_priority)
+            score = free_n * depth_priority + self.rng.random() * (1 - depth_priority)
             pool.append((n, score))
             
         pool.sort(key=lambda x: x[1])
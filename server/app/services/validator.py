@@ -1,6 +1,19 @@
+from .solver import solve_level
+
+
 def validate_level(snakes, obstacles_map, rows, cols):
     """
     Validates if the level is solvable (no stuck snakes).
+    Backed by the array-based engine in solver.py; see validate_level_reference
+    for the rules it implements.
+    """
+    return solve_level(snakes, obstacles_map, rows, cols)
+
+
+def validate_level_reference(snakes, obstacles_map, rows, cols):
+    """
+    Original dict-grid simulation (re-raycasts every snake on every step).
+    Kept as the reference implementation for the solver engine.
     Rule:
     - Snakes move in the direction of their head (straight line).
     - If the path from head to grid boundary is clear (no other snakes/obstacles), 
@@ -18,6 +31,7 @@ def validate_level(snakes, obstacles_map, rows, cols):
             "remained_count": int,
             "total_snakes": int,
             "steps": int,
+            "avg_stuck_ratio": float,
             "logs": list[str]
         }
     """
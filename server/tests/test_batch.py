@@ -0,0 +1,74 @@
+import csv
+import json
+import pytest
+from app.services.batch import expand_batch, run_batch, PackWriter
+from app.services.algorithm import generate_level
+from app.services.json_builder import create_level_json, level_json_to_snakes
+
+
+def _params(**overrides):
+    params = dict(
+        arrow_count=8,
+        custom_grid=[[True]*8 for _ in range(6)],
+        min_arrow_length=2,
+        max_arrow_length=5,
+        obstacles_input=[{'type': 'wall', 'row': 2, 'col': 3}]
+    )
+    params.update(overrides)
+    return params
+
+
+def test_expand_batch():
+    assert [p['seed'] for p in expand_batch(params=_params(), seeds=[4, 9])] == [4, 9]
+    assert [p['seed'] for p in expand_batch(params=_params(seed=7), count=3)] == [7, 8, 9]
+    assert [p['seed'] for p in expand_batch(params=_params(), count=2)] == [None, None]
+    assert len(expand_batch(param_sets=[_params(), _params(arrow_count=3)])) == 2
+
+    with pytest.raises(ValueError):
+        expand_batch(params=_params(workers=4), count=2)
+    with pytest.raises(ValueError):
+        expand_batch(param_sets=[{'custom_grid': None}])
+    with pytest.raises(ValueError):
+        expand_batch(params=_params(), count=0)
+
+
+def test_level_json_to_snakes_round_trip():
+    snakes = [{'path': [(0, 0), (0, 1), (1, 1)]}, {'path': [(4, 6), (3, 6)]}]
+    level_json = create_level_json(snakes, {}, 5, 7, ['#FF0000'])
+    assert [s['path'] for s in level_json_to_snakes(level_json, 5, 7)] == [s['path'] for s in snakes]
+
+
+def test_run_batch_matches_generate_level(tmp_path):
+    batch = expand_batch(params=_params(seed=3), count=3)
+    records = sorted(run_batch(batch, workers=0), key=lambda r: r['index'])
+
+    assert [r['seed'] for r in records] == [3, 4, 5]
+    single = generate_level(workers=0, **_params(seed=4))
+    assert records[1]['level_json'] == single['level_json']
+    assert records[1]['coverage_percent'] == single['coverage_percent']
+    assert all(r['difficulty_score'] > 0 for r in records)
+
+    with PackWriter(out_dir=str(tmp_path / "pack"), ndjson_path=str(tmp_path / "pack.ndjson"),
+                    summary_path=str(tmp_path / "summary.csv")) as writer:
+        for record in records:
+            writer.write(record)
+
+    with open(tmp_path / "pack" / "level_2.json") as f:
+        assert json.load(f) == single['level_json']
+    with open(tmp_path / "pack.ndjson") as f:
+        assert [json.loads(line)['seed'] for line in f] == [3, 4, 5]
+    with open(tmp_path / "summary.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert [row['file'] for row in rows] == ['level_1.json', 'level_2.json', 'level_3.json']
+    assert rows[0]['is_solvable'] == str(records[0]['is_solvable'])
+
+
+def test_failed_level_is_recorded(tmp_path):
+    records = list(run_batch([_params(seed=1), _params(arrow_count='many')], workers=0))
+    assert 'error' not in records[0] and 'error' in records[1]
+
+    with PackWriter(out_dir=str(tmp_path)) as writer:
+        for record in records:
+            writer.write(record)
+    assert (writer.count, writer.failed) == (2, 1)
+    assert not (tmp_path / "level_2.json").exists()
@@ -0,0 +1,101 @@
+import random
+import pytest
+from app.services.difficulty_calculator import calculate, calculate_reference, check_movable, score_levels
+from app.services.strategies.smart_dynamic import SmartDynamicStrategy
+
+OBSTACLE_TYPES = ['wall', 'hole', 'tunnel', 'wall_break', 'iced_snake', 'key_snake']
+
+
+def _random_level(rng, rows, cols, snake_count):
+    """Random walks in tuple or dict points (may leave the grid, some too short) + obstacles."""
+    snakes = []
+    for _ in range(snake_count):
+        r, c = rng.randrange(-1, rows + 1), rng.randrange(-1, cols + 1)
+        path = [(r, c)]
+        for _ in range(rng.randint(0, 6)):
+            dr, dc = rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+            r, c = r + dr, c + dc
+            path.append((r, c))
+        if rng.random() < 0.5:
+            path = [{'row': r, 'col': c} for r, c in path]
+        snakes.append({'path': path})
+
+    obstacles = []
+    for _ in range(rng.randint(0, 4)):
+        o_type = rng.choice(OBSTACLE_TYPES)
+        if rng.random() < 0.5:
+            obstacles.append({'type': o_type, 'row': rng.randrange(rows), 'col': rng.randrange(cols)})
+        else:
+            cells = [{'row': rng.randrange(rows), 'col': rng.randrange(cols)} for _ in range(rng.randint(1, 3))]
+            obstacles.append({'type': o_type, 'cells': cells})
+    return snakes, obstacles
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_calculate_matches_reference_random(seed):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(3, 12), rng.randint(3, 12)
+    snakes, obstacles = _random_level(rng, rows, cols, rng.randint(0, 25))
+
+    assert calculate(snakes, obstacles, rows, cols) == calculate_reference(snakes, obstacles, rows, cols)
+    # Bounding box as grid size
+    assert calculate(snakes, obstacles) == calculate_reference(snakes, obstacles)
+
+
+def test_calculate_matches_reference_generated():
+    rows, cols = 30, 30
+    valid_cells = set((r, c) for r in range(rows) for c in range(cols))
+    strategy = SmartDynamicStrategy(rows, cols, valid_cells, {}, ["#FF0000"], seed=4)
+    snakes = strategy.generate(120, 2, 8, 0, 4)['snakes']
+    obstacles = [{'type': 'hole', 'row': 0, 'col': 0}, {'type': 'tunnel', 'cells': [{'row': 1, 'col': 1}]}]
+
+    result = calculate(snakes, obstacles, rows, cols)
+    assert result == calculate_reference(snakes, obstacles, rows, cols)
+    assert result['details']['total_snakes'] == len(snakes)
+
+
+def test_calculate_empty_level():
+    assert calculate([], []) == calculate_reference([], []) == \
+        {"difficulty_score": 0, "breakdown": {"S": 0, "F": 0, "O": 0}}
+
+
+def test_score_levels_matches_calculate():
+    rng = random.Random(11)
+    levels = []
+    for i in range(60):
+        rows, cols = rng.randint(3, 12), rng.randint(3, 12)
+        snakes, obstacles = _random_level(rng, rows, cols, rng.choice([0, 1, 5, 25]))
+        # Half the levels use their bounding box as grid size
+        levels.append((snakes, obstacles, rows, cols) if i % 2 else (snakes, obstacles, None, None))
+
+    columns = score_levels(levels)
+    for i, level in enumerate(levels):
+        expected = calculate(*level)
+        assert columns['difficulty_score'][i] == expected['difficulty_score']
+        assert [columns[k][i] for k in ('S', 'F', 'O')] == [expected['breakdown'][k] for k in ('S', 'F', 'O')]
+        if 'details' in expected:
+            details = expected['details']
+            assert columns['total_snakes'][i] == details['total_snakes']
+            assert columns['solve_depth'][i] == details['solve_depth']
+            assert columns['occupied_cells'][i] == details['occupied_cells']
+            assert f"{columns['bounds_w'][i]}x{columns['bounds_h'][i]}" == details['grid_bounds']
+
+
+def test_score_levels_empty():
+    columns = score_levels([])
+    assert len(columns['difficulty_score']) == 0
+    columns = score_levels([([], [], 5, 5)])
+    assert columns['difficulty_score'][0] == 0 and columns['total_snakes'][0] == 0
+
+
+def test_check_movable():
+    snakes = [{'path': [(1, 0), (1, 1)]}, {'path': [(0, 1), (0, 2)]}, {'path': [(2, 1), (2, 2)]}]
+    obstacles_map = {(1, 2): {'type': 'wall'}}
+
+    # (1, 1): neighbours are snakes, the wall and (1, 0) which is its own body
+    assert not check_movable(snakes[0], snakes, obstacles_map, 3, 3)
+    # Holes can be entered
+    assert check_movable(snakes[0], snakes, {(1, 2): {'type': 'hole'}}, 3, 3)
+    # (0, 2) is boxed in by the grid edge, (0, 3) is free on a wider grid
+    assert not check_movable(snakes[1], snakes, obstacles_map, 3, 3)
+    assert check_movable(snakes[1], snakes, obstacles_map, 3, 4)
@@ -1,4 +1,5 @@
 import pytest
+from app.services import attempt_pool
 from app.services.algorithm import generate_level
 
 def test_generate_level_basic():
@@ -51,3 +52,143 @@ def test_generate_level_constraints():
         length = len(snake['position'])
         assert length >= 2 # Absolute min
         # assert length <= 4 # Max constraints might be soft or hard depending on implementation
+
+def test_generate_level_parallel_attempts():
+    # Attempts run in the shared process pool
+    grid = [[True]*8 for _ in range(8)]
+    
+    result = generate_level(
+        arrow_count=5,
+        custom_grid=grid,
+        min_arrow_length=2,
+        max_arrow_length=4,
+        workers=2
+    )
+    
+    assert result['logs'][0].startswith("Parallel mode: 20 attempt(s)")
+    assert any(log.startswith("Attempt ") for log in result['logs'])
+    snakes = [item for item in result['level_json'] if item['itemType'] == 'snake']
+    assert len(snakes) > 0
+
+def test_default_workers(monkeypatch):
+    monkeypatch.delenv('GENERATOR_WORKERS', raising=False)
+    monkeypatch.setattr(attempt_pool.os, 'cpu_count', lambda: 8)
+    assert attempt_pool.default_workers() == 0
+    assert attempt_pool.default_workers(large_load=True) == attempt_pool.LARGE_LOAD_WORKERS
+    monkeypatch.setattr(attempt_pool.os, 'cpu_count', lambda: 2)
+    assert attempt_pool.default_workers(large_load=True) == 2
+    
+    # An explicit setting applies to every request
+    monkeypatch.setenv('GENERATOR_WORKERS', '0')
+    assert attempt_pool.default_workers(large_load=True) == 0
+    monkeypatch.setenv('GENERATOR_WORKERS', '3')
+    assert attempt_pool.default_workers() == 3
+
+def test_generate_level_large_load_uses_default_pool(monkeypatch):
+    requested = []
+    monkeypatch.setattr(attempt_pool, 'default_workers', lambda large_load=False: requested.append(large_load) or 0)
+    params = dict(custom_grid=[[True]*8 for _ in range(8)], min_arrow_length=2, max_arrow_length=4, seed=1)
+    
+    generate_level(arrow_count=5, **params)
+    generate_level(arrow_count=201, **params)
+    generate_level(arrow_count=5, workers=0, **{**params, 'custom_grid': [[True]*50 for _ in range(50)]})
+    assert requested == [False, True]
+
+def test_generate_level_time_budget():
+    from app.services.optimized_ops import warm_up
+    warm_up() # Keep JIT compilation out of the budget
+    
+    grid = [[True]*40 for _ in range(40)]
+    result = generate_level(
+        arrow_count=400,
+        custom_grid=grid,
+        min_arrow_length=3,
+        max_arrow_length=8,
+        time_budget_ms=300,
+        workers=0
+    )
+    
+    # Anytime result: best level so far, plus how much of the budget was used
+    assert result['time_budget_ms'] == 300
+    assert result['attempts'] >= 1
+    assert result['elapsed_ms'] < 300 + 2000
+    assert result['budget_used_percent'] is not None
+    assert any("Time budget" in log for log in result['logs'])
+    snakes = [item for item in result['level_json'] if item['itemType'] == 'snake']
+    assert len(snakes) > 0
+
+def test_generate_level_seed_is_reproducible():
+    grid = [[True]*12 for _ in range(12)]
+    params = dict(arrow_count=15, custom_grid=grid, min_arrow_length=2, max_arrow_length=6, workers=0)
+    
+    first = generate_level(seed=1234, **params)
+    second = generate_level(seed=1234, **params)
+    assert first['seed'] == second['seed'] == 1234
+    assert first['level_json'] == second['level_json']
+    
+    # Without a seed one is picked and echoed, replaying it gives the same level
+    unseeded = generate_level(**params)
+    assert unseeded['level_json'] == generate_level(seed=unseeded['seed'], **params)['level_json']
+
+def test_generate_level_seed_is_reproducible_pooled():
+    # Tiny playable area: most attempts are perfect and finish out of order in the pool
+    grid = [[r < 2 and c < 2 for c in range(5)] for r in range(5)]
+    params = dict(arrow_count=2, custom_grid=grid, min_arrow_length=2, max_arrow_length=2,
+                  strategy_name='RANDOM_ADAPTIVE')
+    
+    for seed in (0, 1, 2):
+        sequential = generate_level(seed=seed, workers=0, **params)
+        for _ in range(2):
+            pooled = generate_level(seed=seed, workers=2, **params)
+            assert pooled['level_json'] == sequential['level_json']
+
+def test_difficulty_search_rounds_do_not_depend_on_arrival_order(monkeypatch):
+    from app.services import algorithm
+    
+    # Unsolvable in-band levels with equal coverage tie on target_rank, their scores differ
+    def fake_attempt(*args, **kwargs):
+        seed = args[12]
+        return {'snakes': [], 'log_records': [], 'coverage_percent': 50, 'is_solvable': False,
+                'stuck_count': 1, 'difficulty_score': float(seed % 50 + 1)}
+    
+    def reversed_pool(fn, arg_list, workers):
+        yield from reversed([(i, fn(*args)) for i, args in enumerate(arg_list)])
+    
+    monkeypatch.setattr(algorithm, 'run_attempt', fake_attempt)
+    monkeypatch.setattr(attempt_pool, 'run_unordered', reversed_pool)
+    params = dict(arrow_count=4, custom_grid=[[True]*6 for _ in range(6)], min_arrow_length=2,
+                  max_arrow_length=4, seed=3, target_difficulty=(0, 60))
+    
+    sequential = generate_level(workers=0, **params)
+    pooled = generate_level(workers=2, **params)
+    rounds = [log for log in sequential['logs'] if log.startswith("Round ")]
+    assert len(rounds) == algorithm.MAX_RETRIES // algorithm.DIFFICULTY_ROUND_SIZE - 1 # The band is never met
+    assert [log for log in pooled['logs'] if log.startswith("Round ")] == rounds
+    assert pooled['difficulty_score'] == sequential['difficulty_score']
+
+def test_generate_level_difficulty_target():
+    from app.services.difficulty_calculator import calculate
+    from app.services.json_builder import level_json_to_snakes
+    
+    grid = [[True]*16 for _ in range(16)]
+    params = dict(arrow_count=40, custom_grid=grid, min_arrow_length=2, max_arrow_length=8,
+                  min_bends=0, max_bends=3, seed=5, workers=0)
+    
+    # Easier and harder than what these parameters give on their own
+    for target in ((40, 50), (120, 140)):
+        result = generate_level(target_difficulty=target, **params)
+        assert result['target_met']
+        assert target[0] <= result['difficulty_score'] <= target[1]
+        assert 1 < result['candidates_evaluated'] <= 20
+        assert result['is_solvable']
+        
+        # The reported score is the calculator's score for the returned level
+        snakes = level_json_to_snakes(result['level_json'], result['grid_rows'], result['grid_cols'])
+        assert calculate(snakes, [], 16, 16)['difficulty_score'] == result['difficulty_score']
+    
+    # Unreachable band: closest level after every candidate
+    result = generate_level(target_difficulty=(1, 2), **params)
+    assert not result['target_met'] and result['candidates_evaluated'] == 20
+    
+    with pytest.raises(ValueError):
+        generate_level(target_difficulty=(50, 40), **params)
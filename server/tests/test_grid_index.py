@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from app.services import optimized_ops
+import random
+from app.services.grid_index import DistanceField, CandidateQueue, FreeCellIndex, ExitMap
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_distance_field_matches_full_bfs(seed):
+    rng = np.random.default_rng(seed)
+    rows, cols = rng.integers(5, 30, 2)
+    grid = np.where(rng.random((rows, cols)) < 0.1, 2, 0).astype(np.int8)
+    field = DistanceField(rows, cols, grid)
+    
+    for _ in range(40):
+        free = np.argwhere(grid == 0)
+        if not len(free):
+            break
+        cells = free[rng.choice(len(free), size=min(len(free), rng.integers(1, 6)), replace=False)]
+        grid[cells[:, 0], cells[:, 1]] = 1
+        field.block(cells)
+        assert (field.dist == optimized_ops.bfs_dist_map_numba(rows, cols, grid)).all()
+
+
+def test_free_cells_by_depth_order():
+    grid = np.zeros((7, 7), dtype=np.int8)
+    grid[3, 0] = 1
+    field = DistanceField(7, 7, grid)
+    cells, depths = field.free_cells_by_depth()
+    
+    assert len(cells) == 48
+    assert tuple(cells[0]) == (2, 2) and depths[0] == 3 # Row-major among equals
+    assert (np.diff(depths) <= 0).all()
+    
+    # Within a depth: fewest free neighbours first
+    free_n = optimized_ops.free_neighbor_counts_numba(7, 7, grid)[cells[:, 0], cells[:, 1]]
+    for d in np.unique(depths):
+        assert (np.diff(free_n[depths == d]) >= 0).all()
+
+
+def test_candidate_queue_skips_blocked_cells():
+    grid = np.zeros((4, 4), dtype=np.int8)
+    queue = CandidateQueue(grid)
+    queue.reset(np.array([(0, 0), (0, 1), (1, 1), (2, 2), (3, 3)]))
+    
+    assert queue.peek(2) == [(0, 0), (0, 1)]
+    assert queue.take(2) == [(0, 0), (0, 1)]
+    
+    grid[1, 1] = 1
+    assert queue.take(5) == [(2, 2), (3, 3)]
+    assert len(queue) == 0 and queue.take(5) == []
+
+
+def test_free_cell_index_tracks_removals():
+    rng = random.Random(0)
+    grid = np.zeros((9, 11), dtype=np.int8)
+    grid[0, :3] = 2
+    index = FreeCellIndex(9, 11, grid)
+    expected = {(r, c) for r in range(9) for c in range(11) if grid[r, c] == 0}
+    assert len(index) == len(expected)
+    
+    for _ in range(30):
+        cells = [(rng.randrange(-1, 10), rng.randrange(-1, 12)) for _ in range(4)]
+        index.remove(cells) # Off-grid and already taken cells are ignored
+        expected -= set(cells)
+        assert len(index) == len(expected)
+        assert set(index.cells()) == expected
+    
+    sample = index.sample(10, rng)
+    assert len(sample) == len(set(sample)) == min(10, len(expected))
+    assert set(sample) <= expected and index.choice(rng) in expected
+    assert (0, 0) not in index
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_exit_map_matches_raycasts(seed):
+    rng = np.random.default_rng(seed)
+    rows, cols = rng.integers(4, 20, 2)
+    grid = rng.choice(np.array([0, 0, 0, 1, 2], dtype=np.int8), size=(rows, cols))
+    exit_map = ExitMap(rows, cols, grid)
+    
+    for _ in range(10):
+        free = np.argwhere(grid == 0)
+        if not len(free):
+            break
+        cells = free[rng.choice(len(free), size=min(len(free), 3), replace=False)]
+        grid[cells[:, 0], cells[:, 1]] = 1
+        exit_map.block(cells)
+        
+        for r in range(rows):
+            for c in range(cols):
+                for d, (dr, dc) in enumerate(optimized_ops.DIRS.tolist()):
+                    expected = optimized_ops.check_raycast_numba(rows, cols, grid, r, c, dr, dc, None)
+                    assert exit_map.exits[r, c, d] == expected
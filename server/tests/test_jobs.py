@@ -0,0 +1,91 @@
+import threading
+import time
+from app.services.jobs import JobManager, RUNNING, DONE, CANCELLED
+from app.services.algorithm import generate_level
+
+
+def _params(size, arrow_count, **overrides):
+    params = dict(
+        arrow_count=arrow_count,
+        custom_grid=[[True]*size for _ in range(size)],
+        min_arrow_length=2,
+        max_arrow_length=6,
+        workers=0
+    )
+    params.update(overrides)
+    return params
+
+
+def test_job_runs_and_reports_progress():
+    manager = JobManager(workers=1)
+    job = manager.submit(_params(10, 8, seed=3))
+    job.future.result(timeout=60)
+
+    assert manager.get(job.id) is job
+    assert job.status == DONE
+    data = job.to_dict()
+    assert data['result']['seed'] == 3
+    assert data['progress']['attempts_done'] >= 1
+    assert data['progress']['attempts_total'] == 20
+    assert data['progress']['best_coverage'] is not None
+    assert manager.get('missing') is None
+
+
+def test_cancel_stops_running_job():
+    manager = JobManager(workers=1)
+    job = manager.submit(_params(60, 3000, seed=1))
+
+    # Cancel once the first snakes are placed
+    deadline = time.time() + 60
+    while job.progress.get('snakes_placed', 0) < 5 and time.time() < deadline:
+        time.sleep(0.005)
+    assert job.status == RUNNING
+
+    manager.cancel(job.id)
+    job.future.result(timeout=60)
+    assert job.status == CANCELLED
+    assert job.result['cancelled'] and job.result['attempts'] == 1
+    assert any("Cancelled" in log for log in job.result['logs'])
+
+
+def test_cancel_queued_job_twice():
+    manager = JobManager(workers=1)
+    release = threading.Event()
+    blocker = manager.executor.submit(release.wait, 60) # Keeps the job queued
+    job = manager.submit(_params(10, 8, seed=3))
+
+    assert manager.cancel(job.id) is job
+    assert job.status == CANCELLED
+    finished = job.finished
+    manager.cancel(job.id)
+    assert job.finished == finished
+    assert [event for event, _ in job.events] == ['end']
+
+    release.set()
+    blocker.result(timeout=60)
+
+
+def test_cancel_event_in_sequential_generation():
+    cancel_event = threading.Event()
+    cancel_event.set()
+    result = generate_level(cancel_event=cancel_event, **_params(20, 50))
+
+    # The first attempt stops before placing any snake, nothing else runs
+    assert result['cancelled'] and result['attempts'] == 1
+    assert not [item for item in result['level_json'] if item['itemType'] == 'snake']
+
+
+def test_stream_follows_job_until_end():
+    manager = JobManager(workers=1)
+    job = manager.submit(_params(12, 10, seed=8))
+
+    events = [item for item in job.stream(heartbeat=0.5) if item is not None]
+    names = [event for event, _ in events]
+    assert names[0] == 'start' and names[-1] == 'end'
+    assert events[-1][1]['status'] == DONE
+    assert 'attempt_started' in names and 'attempt_finished' in names
+    finished = [data for event, data in events if event == 'attempt_finished']
+    assert all(0 <= data['coverage_percent'] <= 100 and data['elapsed_ms'] >= 0 for data in finished)
+
+    # A late subscriber replays the recorded events (progress events are coalesced live)
+    assert [item[0] for item in job.stream() if item is not None] == [n for n in names if n != 'progress']
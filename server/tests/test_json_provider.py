@@ -0,0 +1,54 @@
+import json
+import numpy as np
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import OrjsonProvider, json_provider_class
+from app.services.json_builder import create_level_json
+
+pytest.importorskip("orjson")
+
+
+def _payload():
+    snakes = [{'path': [(0, 0), (0, 1), (1, 1)], 'color': '#00FF00'}, {'path': [(4, 6), (3, 6)], 'color': '#FFFFFF'}]
+    obstacles = {(2, 2): {'type': 'wall'}, (3, 3): {'type': 'hole', 'color': '#FF0000'}}
+    level_json = create_level_json(snakes, obstacles, 5, 7, ['#FF0000', '#00FF00'])
+    return {'level_json': level_json, 'is_solvable': True, 'logs': ['a', 'b'], 'budget_used_percent': None, 'seed': 7}
+
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_response_matches_default_provider(debug):
+    app = Flask(__name__)
+    app.debug = debug
+    with app.app_context():
+        expected = DefaultJSONProvider(app).response(_payload())
+        actual = OrjsonProvider(app).response(_payload())
+    assert actual.get_data() == expected.get_data()
+    assert actual.mimetype == expected.mimetype
+
+
+def test_dumps():
+    provider = OrjsonProvider(Flask(__name__))
+    assert json.loads(provider.dumps({'b': np.int64(3), 'a': np.arange(3), 1: 'x'})) == {'1': 'x', 'a': [0, 1, 2], 'b': 3}
+    assert provider.dumps({'b': 1, 'a': 2}, sort_keys=False) == '{"b":1,"a":2}'
+    # json.dumps-only arguments fall back to the stdlib encoder
+    assert provider.dumps({'a': 1}, separators=(', ', ': ')) == '{"a": 1}'
+
+
+def test_big_int_falls_back_to_default_provider():
+    # orjson rejects integers beyond 64 bits, e.g. an echoed seed
+    payload = {**_payload(), 'seed': 2 ** 64}
+    app = Flask(__name__)
+    with app.app_context():
+        expected = DefaultJSONProvider(app).response(payload)
+        actual = OrjsonProvider(app).response(payload)
+    assert actual.status_code == 200
+    assert actual.get_data() == expected.get_data()
+    provider = OrjsonProvider(app)
+    assert provider.dumps(payload) == DefaultJSONProvider(app).dumps(payload)
+    assert provider.dumps({'b': -2 ** 70, 'a': 1}, sort_keys=False) == '{"b": -1180591620717411303424, "a": 1}'
+
+
+def test_json_provider_class():
+    assert json_provider_class('orjson') is OrjsonProvider
+    assert json_provider_class('stdlib') is DefaultJSONProvider
@@ -0,0 +1,97 @@
+from app.services.level_cache import LevelCache, request_key, generate_level_cached
+
+
+def _params(**overrides):
+    params = dict(
+        arrow_count=6,
+        custom_grid=[[True]*8 for _ in range(8)],
+        min_arrow_length=2,
+        max_arrow_length=4,
+        color_list=['#FF0000', '#00FF00'],
+        workers=0
+    )
+    params.update(overrides)
+    return params
+
+
+def test_request_key_canonicalisation():
+    base = request_key(_params(), 1)
+
+    # Same level: recoloured palette, equivalent grid encoding, worker count (same attempt count)
+    assert request_key(_params(color_list=['#0000FF', '#FFFF00']), 1) == base
+    assert request_key(_params(custom_grid=[['1']*8 for _ in range(8)]), 1) == base
+    assert request_key(_params(workers=4), 1) == base
+
+    # Large loads run fewer attempts sequentially than pooled: the worker setting matters
+    large = _params(arrow_count=201)
+    assert request_key({**large, 'workers': 0}, 1) != request_key({**large, 'workers': 4}, 1)
+    assert request_key({**large, 'workers': 0}, 1) == request_key({**large, 'workers': 1}, 1)
+    assert request_key({**large, 'workers': 2}, 1) == request_key({**large, 'workers': 4}, 1)
+
+    # Different level
+    assert request_key(_params(), 2) != base
+    assert request_key(_params(), None) != base
+    assert request_key(_params(color_list=['#FF0000', '#FF0000']), 1) != base
+    grid = [[True]*8 for _ in range(8)]
+    grid[0][0] = False
+    assert request_key(_params(custom_grid=grid), 1) != base
+    assert request_key(_params(obstacles_input=[{'type': 'wall', 'row': 1, 'col': 1}]), 1) != base
+
+
+def test_lru_eviction_and_counters():
+    cache = LevelCache(max_entries=2)
+    cache.put('a', {'n': 1})
+    cache.put('b', {'n': 2})
+    assert cache.get('a') == {'n': 1} # 'a' is now most recent
+    cache.put('c', {'n': 3})
+
+    assert cache.get('b') is None
+    assert cache.get('c') == {'n': 3}
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert (stats['hits'], stats['misses']) == (2, 1)
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "levels.db")
+    LevelCache(max_entries=4, path=path).put('k', {'level_json': [1, 2]})
+
+    cache = LevelCache(max_entries=4, path=path)
+    assert cache.get('k') == {'level_json': [1, 2]}
+    assert cache.get('k') == {'level_json': [1, 2]}
+    assert cache.stats()['disk_hits'] == 1 # Second lookup is served from memory
+
+
+def test_generate_level_cached_hits():
+    cache = LevelCache(max_entries=8)
+
+    first = generate_level_cached(cache=cache, seed=5, **_params())
+    assert not first['cached']
+
+    again = generate_level_cached(cache=cache, seed=5, **_params(color_list=['#123456', '#654321']))
+    assert again['cached']
+    assert again['level_json'] == first['level_json'] and again['seed'] == 5
+
+    # Unseeded: fresh level unless the request opts in to reuse
+    assert not generate_level_cached(cache=cache, **_params())['cached']
+    reused = generate_level_cached(cache=cache, reuse_cached=True, **_params())
+    assert reused['cached']
+    assert cache.stats()['hits'] == 2
+
+
+def test_timed_out_result_is_not_cached():
+    cache = LevelCache(max_entries=8)
+    params = _params(custom_grid=[[True]*60 for _ in range(60)], arrow_count=300, time_budget_ms=1)
+
+    first = generate_level_cached(cache=cache, seed=5, **params)
+    assert first['timed_out'] and not first['cached']
+    assert len(cache.entries) == 0
+
+    # Budget-limited levels depend on machine load: the seed is generated again
+    assert not generate_level_cached(cache=cache, seed=5, **params)['cached']
+    assert not generate_level_cached(cache=cache, reuse_cached=True, **params)['cached']
+
+    # The same request without a budget completes and is cached
+    del params['time_budget_ms']
+    assert not generate_level_cached(cache=cache, seed=5, **params)['timed_out']
+    assert generate_level_cached(cache=cache, seed=5, **params)['cached']
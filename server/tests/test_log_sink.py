@@ -0,0 +1,14 @@
+from app.services.log_sink import LogSink, format_records
+
+
+def test_log_sink_formats_lazily():
+    seen = []
+    sink = LogSink(listener=lambda message, args: seen.append((message, args)))
+    sink.log("Placed %d of %d snakes.", 3, 5)
+    sink.log("Plain line with a literal 100%")
+
+    assert sink.records[0] == ("Placed %d of %d snakes.", (3, 5))
+    assert seen == sink.records
+    assert len(sink) == 2
+    assert list(sink) == sink.messages() == ["Placed 3 of 5 snakes.", "Plain line with a literal 100%"]
+    assert format_records([]) == []
@@ -0,0 +1,141 @@
+import numpy as np
+from numba.typed import List
+from app.services import optimized_ops
+
+
+def test_warm_up_compiles_hot_kernels():
+    elapsed = optimized_ops.warm_up()
+    assert elapsed >= 0
+    
+    # Hot entry points are compiled eagerly from explicit signatures
+    assert len(optimized_ops.dfs_numba.signatures) == 2
+    assert len(optimized_ops.bfs_dist_map_numba.signatures) == 2
+    assert len(optimized_ops.check_raycast_numba.signatures) == 2
+
+
+def test_check_raycast_path_variants():
+    grid = np.zeros((5, 5), dtype=np.int8)
+    path = List()
+    path.append((np.int64(2), np.int64(4)))
+    
+    assert optimized_ops.check_raycast_numba(5, 5, grid, 2, 0, 0, 1, None)
+    # Ray crosses a cell of the path being built
+    assert not optimized_ops.check_raycast_numba(5, 5, grid, 2, 0, 0, 1, path)
+
+
+def test_bfs_dist_map_default_boundary():
+    grid = np.zeros((5, 5), dtype=np.int8)
+    assert optimized_ops.bfs_dist_map_numba(5, 5, grid)[2, 2] == 3
+    assert optimized_ops.bfs_dist_map_numba(5, 5, grid, 3)[2, 2] == 5
+
+
+def test_dfs_returns_valid_array_path():
+    rows, cols = 8, 8
+    grid = np.zeros((rows, cols), dtype=np.int8)
+    grid[3, 2:6] = 1
+    optimized_ops.seed_numba(3)
+    
+    for start in [(0, 0), (5, 5), (7, 3)]:
+        success, path = optimized_ops.dfs_numba(rows, cols, grid, start[0], start[1], 3, 6, 0, 2, max_nodes=1000, heuristic_mode=0)
+        assert success
+        assert isinstance(path, np.ndarray) and path.dtype == np.int32 and path.shape[1] == 2
+        assert 3 <= len(path) <= 6
+        assert tuple(path[0]) == start
+        
+        cells = [tuple(p) for p in path.tolist()]
+        assert len(set(cells)) == len(cells)
+        assert all(grid[r, c] == 0 for r, c in cells)
+        assert all(abs(r1 - r2) + abs(c1 - c2) == 1 for (r1, c1), (r2, c2) in zip(cells, cells[1:]))
+        
+        # Head ray is clear of walls and of the snake itself
+        (nr, nc), (hr, hc) = cells[-2], cells[-1]
+        dr, dc = hr - nr, hc - nc
+        r, c = hr + dr, hc + dc
+        while 0 <= r < rows and 0 <= c < cols:
+            assert grid[r, c] == 0 and (r, c) not in cells
+            r, c = r + dr, c + dc
+
+
+def test_dfs_fails_when_boxed_in():
+    grid = np.ones((3, 3), dtype=np.int8)
+    grid[1, 1] = 0
+    success, path = optimized_ops.dfs_numba(3, 3, grid, 1, 1, 2, 4, 0, 2, 100, 0)
+    assert not success
+
+
+def test_dfs_spiral_modes():
+    rows, cols = 10, 10
+    grid = np.zeros((rows, cols), dtype=np.int8)
+    optimized_ops.seed_numba(5)
+    
+    for mode in (3, 4):
+        success, path = optimized_ops.dfs_numba(rows, cols, grid, 5, 5, 4, 8, 0, 4, 1000, mode, 1.0)
+        assert success
+        cells = [tuple(p) for p in path.tolist()]
+        assert len(set(cells)) == len(cells)
+        assert all(abs(r1 - r2) + abs(c1 - c2) == 1 for (r1, c1), (r2, c2) in zip(cells, cells[1:]))
+        # Spiral starts going right, then turns down (clockwise) or up (counter-clockwise)
+        assert cells[1] == (5, 6)
+        assert cells[2] == ((6, 6) if mode == 3 else (4, 6))
+
+
+def _blocked_grid(rows, cols, seed):
+    rng = np.random.default_rng(seed)
+    return (rng.random((rows, cols)) < 0.35).astype(np.int8)
+
+
+def test_dfs_first_matches_sequential_calls():
+    rows, cols = 12, 12
+    for seed in range(5):
+        grid = _blocked_grid(rows, cols, seed)
+        starts = np.argwhere(grid == 0)[:20].astype(np.int64)
+        
+        optimized_ops.seed_numba(seed)
+        expected = (-1, None)
+        for i, (r, c) in enumerate(starts):
+            success, path = optimized_ops.dfs_numba(rows, cols, grid, r, c, 4, 8, 0, 3, 1000, 0)
+            if success:
+                expected = (i, path.tolist())
+                break
+        
+        optimized_ops.seed_numba(seed)
+        index, path = optimized_ops.dfs_first_numba(rows, cols, grid, starts, 4, 8, 0, 3, 1000, 0)
+        assert index == expected[0]
+        if index >= 0:
+            assert path.tolist() == expected[1]
+
+
+def test_symmetric_dfs_paths_are_disjoint_and_exitable():
+    rows, cols = 10, 10
+    grid = np.zeros((rows, cols), dtype=np.int8)
+    grid[4, 4] = 1
+    start_a = np.array([1, 2], dtype=np.int64)
+    # 'both' symmetry: horizontal, vertical and diagonal mirrors
+    mirror_starts = np.array([[8, 2], [1, 7], [8, 7]], dtype=np.int64)
+    mirror_signs = np.array([[-1, 1], [1, -1], [-1, -1]], dtype=np.int64)
+    
+    found = 0
+    for seed in range(10):
+        optimized_ops.seed_numba(seed)
+        success, path_a, paths_m = optimized_ops.symmetric_dfs_numba(
+            rows, cols, grid, start_a, mirror_starts, mirror_signs, 3, 6, 4, 3000)
+        if not success:
+            continue
+        found += 1
+        assert paths_m.shape == (3, len(path_a), 2)
+        assert 3 <= len(path_a) <= 6
+        
+        paths = [path_a.tolist()] + paths_m.tolist()
+        cells = [tuple(p) for path in paths for p in path]
+        assert len(set(cells)) == len(cells)
+        assert all(grid[r, c] == 0 for r, c in cells)
+        
+        # Every head leaves the grid past all four snakes
+        blocked = grid.copy()
+        for r, c in cells:
+            blocked[r, c] = 1
+        for path in paths:
+            (nr, nc), (hr, hc) = path[-2], path[-1]
+            assert optimized_ops.check_raycast_numba(rows, cols, blocked, hr, hc, hr - nr, hc - nc, None)
+    
+    assert found > 0
@@ -0,0 +1,218 @@
+import json
+import os
+import pytest
+from app.services.difficulty_calculator import calculate
+from app.services.json_builder import create_level_json
+from app.services.strategies.smart_dynamic import SmartDynamicStrategy
+from tools.read_levels import (
+    load_level, read_level_file, score_files, score_stream, iter_level_files, scan, LevelIndex
+)
+
+
+def _snakes(seed, size=8):
+    valid_cells = set((r, c) for r in range(size) for c in range(size))
+    strategy = SmartDynamicStrategy(size, size, valid_cells, {}, ["#FF0000"], seed=seed)
+    return strategy.generate(10, 2, 5, 0, 2)['snakes']
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        if isinstance(data, str):
+            f.write(data)
+        else:
+            json.dump(data, f)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Levels in all three formats (one in a subdirectory) plus invalid files."""
+    wall = [{'type': 'wall', 'row': 0, 'col': 0}]
+    _write(str(tmp_path / "level_1.json"), {'snakes': [{'path': s['path']} for s in _snakes(1)], 'obstacles': wall})
+    _write(str(tmp_path / "level_2.json"), {'level_json': {'snakes': [{'path': s['path']} for s in _snakes(2)]}})
+    _write(str(tmp_path / "level_10.json"), create_level_json(_snakes(3), {(0, 0): {'type': 'wall'}}, 8, 8, ["#FF0000"]))
+    _write(str(tmp_path / "sub" / "LEVEL_4.JSON"), {'snakes': [{'path': s['path']} for s in _snakes(4)]})
+    _write(str(tmp_path / "broken.json"), "{not json")
+    _write(str(tmp_path / "empty.json"), [])
+    _write(str(tmp_path / "bad_path.json"), {'snakes': [{'path': [['a', 'b']]}]}) # Parses, fails to score
+    _write(str(tmp_path / "notes.txt"), "not a level")
+    return tmp_path
+
+
+def _rows(text):
+    lines = text.strip().splitlines()
+    assert lines[0] == "filename,snake,score"
+    return [line.split(',') for line in lines[1:]]
+
+
+def test_iter_level_files(corpus):
+    names = {os.path.relpath(path, corpus) for path, _ in iter_level_files(str(corpus))}
+    assert names == {'level_1.json', 'level_2.json', 'level_10.json', os.path.join('sub', 'LEVEL_4.JSON'),
+                     'broken.json', 'empty.json', 'bad_path.json'}
+    flat = {os.path.relpath(path, corpus) for path, _ in iter_level_files(str(corpus), recursive=False)}
+    assert flat == names - {os.path.join('sub', 'LEVEL_4.JSON')}
+    assert all(stat.st_size == os.path.getsize(path) for path, stat in iter_level_files(str(corpus)))
+
+
+def test_score_files_matches_read_level_file(corpus):
+    paths = sorted(path for path, _ in iter_level_files(str(corpus)))
+    results = score_files(paths)
+
+    assert [path for path, _, _ in results] == paths
+    for path, digest, record in results:
+        assert digest is None
+        expected = read_level_file(path)
+        if expected is None:
+            assert record is None
+            continue
+        assert (record['snakes'], record['score']) == expected
+        breakdown = calculate(*load_level(path))
+        assert [record[k] for k in ('S', 'F', 'O')] == [breakdown['breakdown'][k] for k in ('S', 'F', 'O')]
+        assert record['solve_depth'] == breakdown['details']['solve_depth']
+    # bad_path.json breaks the batch: the others are rescored one at a time
+    assert sum(record is not None for _, _, record in results) == 4
+
+
+def test_score_stream_bounds_in_flight_chunks(corpus):
+    paths = [path for path, _ in iter_level_files(str(corpus))] * 2
+    consumed = []
+
+    def lazy_paths():
+        for path in paths:
+            consumed.append(path)
+            yield path
+
+    for workers, chunk_size in ((1, 3), (2, 2)):
+        consumed.clear()
+        results = []
+        for result in score_stream(lazy_paths(), workers, chunk_size):
+            results.append(result)
+            assert len(consumed) - len(results) <= max(2 * workers, 1) * chunk_size
+        assert sorted(path for path, _, _ in results) == sorted(paths)
+
+
+def test_scan_csv(corpus, capsys):
+    scan([str(corpus)], sort_rows=True, workers=1)
+    rows = _rows(capsys.readouterr().out)
+
+    assert [row[0] for row in rows] == ['level_1.json', 'level_2.json', 'level_10.json', os.path.join('sub', 'LEVEL_4.JSON')]
+    for name, snakes, score in rows:
+        assert (int(snakes), float(score)) == read_level_file(str(corpus / name))
+
+    scan([str(corpus)], sort_rows=True, recursive=False, workers=1)
+    assert [row[0] for row in _rows(capsys.readouterr().out)] == ['level_1.json', 'level_2.json', 'level_10.json']
+
+
+def test_scan_ndjson(corpus, capsys):
+    scan([str(corpus)], output_format='ndjson', workers=1, chunk_size=2)
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert sorted(r['file'] for r in records) == sorted(['level_1.json', 'level_2.json', 'level_10.json',
+                                                         os.path.join('sub', 'LEVEL_4.JSON')])
+    for record in records:
+        expected = calculate(*load_level(str(corpus / record['file'])))
+        assert record['score'] == expected['difficulty_score']
+        assert {k: record[k] for k in ('S', 'F', 'O')} == expected['breakdown']
+        assert record['solve_depth'] == expected['details']['solve_depth']
+
+
+def test_scan_overlapping_roots(corpus, capsys):
+    roots = [str(corpus), str(corpus), str(corpus / "sub")]
+    scan(roots, workers=1)
+    plain = _rows(capsys.readouterr().out)
+    assert len(plain) == len({row[0] for row in plain}) == 4
+
+    with LevelIndex(str(corpus / "index.sqlite")) as index:
+        scan(roots, workers=1, index=index)
+    assert sorted(_rows(capsys.readouterr().out)) == sorted(plain)
+
+
+def _scan_indexed(corpus, capsys, **kwargs):
+    """Indexed scan of corpus -> (sorted rows, {'rescored', 'from index', 'removed from index'} counts, {} for queries)."""
+    with LevelIndex(str(corpus / "index.sqlite")) as index:
+        scan([str(corpus)], sort_rows=True, workers=1, index=index, **kwargs)
+    captured = capsys.readouterr()
+    summary = captured.err.strip().splitlines()[-1]
+    if kwargs.get('query'):
+        return _rows(captured.out), {}
+    counts = dict(part.split(' ', 1)[::-1] for part in summary[summary.rindex('(') + 1:-1].split(', '))
+    return _rows(captured.out), {name: int(count) for name, count in counts.items()}
+
+
+def test_index_warm_run(corpus, capsys):
+    cold, counts = _scan_indexed(corpus, capsys)
+    assert counts == {'rescored': 7, 'from index': 0, 'removed from index': 0}
+
+    warm, counts = _scan_indexed(corpus, capsys)
+    assert warm == cold
+    assert counts == {'rescored': 0, 'from index': 7, 'removed from index': 0}
+
+    with LevelIndex(str(corpus / "index.sqlite")) as index:
+        entries = index.entries()
+    assert len(entries) == 7
+    assert entries['broken.json'][3] is None # Invalid files are indexed too
+    record = entries['level_1.json'][3]
+    expected = calculate(*load_level(str(corpus / "level_1.json")))
+    assert (record['snakes'], record['score'], record['solve_depth']) == \
+        (len(load_level(str(corpus / "level_1.json"))[0]), expected['difficulty_score'], expected['details']['solve_depth'])
+
+
+def test_index_touched_edited_deleted(corpus, capsys):
+    before, _ = _scan_indexed(corpus, capsys)
+
+    # Touched: new mtime, same content -> reused through the content hash
+    stat = os.stat(corpus / "level_1.json")
+    os.utime(corpus / "level_1.json", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    # Edited -> rescored
+    _write(str(corpus / "level_2.json"), {'snakes': [{'path': s['path']} for s in _snakes(9)]})
+    # Deleted -> pruned
+    os.remove(corpus / "level_10.json")
+
+    after, counts = _scan_indexed(corpus, capsys)
+    assert counts == {'rescored': 1, 'from index': 5, 'removed from index': 1}
+    assert [row[0] for row in after] == ['level_1.json', 'level_2.json', os.path.join('sub', 'LEVEL_4.JSON')]
+    assert after[0] == before[0]
+    assert (int(after[1][1]), float(after[1][2])) == read_level_file(str(corpus / "level_2.json"))
+
+    with LevelIndex(str(corpus / "index.sqlite")) as index:
+        entries = index.entries()
+    assert 'level_10.json' not in entries
+    assert entries['level_1.json'][0] == stat.st_mtime_ns + 10 ** 9
+
+
+def test_index_query(corpus, capsys):
+    rows, _ = _scan_indexed(corpus, capsys)
+    scores = sorted(float(row[2]) for row in rows)
+    low, high = scores[1], scores[2]
+
+    os.remove(corpus / "level_1.json") # Queries never read level files
+    queried, _ = _scan_indexed(corpus, capsys, query=True)
+    assert queried == rows
+
+    # Bounds are inclusive
+    bounded, _ = _scan_indexed(corpus, capsys, query=True, min_score=low, max_score=high)
+    assert sorted(float(row[2]) for row in bounded) == [low, high]
+    below, _ = _scan_indexed(corpus, capsys, query=True, max_score=scores[0])
+    assert [float(row[2]) for row in below] == [scores[0]]
+    assert _scan_indexed(corpus, capsys, query=True, min_score=scores[-1] + 0.1)[0] == []
+    with LevelIndex(str(corpus / "index.sqlite")) as index:
+        assert sorted(record['score'] for _, record in index.query(low, high)) == [low, high]
+
+    # The same filters apply to scans (which prune the deleted level)
+    assert _scan_indexed(corpus, capsys, min_score=low, max_score=high)[0] == \
+        [row for row in rows if low <= float(row[2]) <= high and row[0] != 'level_1.json']
+
+
+def test_index_scorer_version_change(corpus, capsys):
+    rows, _ = _scan_indexed(corpus, capsys)
+
+    # Rows written by another scorer are never served
+    with LevelIndex(str(corpus / "index.sqlite"), version='other') as index:
+        assert index.entries() == {}
+        assert list(index.query()) == []
+    assert "dropped 7 rows" in capsys.readouterr().err
+
+    rescored, counts = _scan_indexed(corpus, capsys)
+    assert rescored == rows
+    assert counts == {'rescored': 7, 'from index': 0, 'removed from index': 0}
+    assert _scan_indexed(corpus, capsys)[1] == {'rescored': 0, 'from index': 7, 'removed from index': 0}
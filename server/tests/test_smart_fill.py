@@ -0,0 +1,31 @@
+import pytest
+from app.services.smart_fill import smart_fill_gaps
+
+
+def test_smart_fill_keeps_level_solvable():
+    rows, cols = 12, 12
+    existing = [
+        {'path': [{'row': 0, 'col': 0}, {'row': 0, 'col': 1}, {'row': 0, 'col': 2}], 'color': '#FF0000'},
+        {'path': [(5, 5), (5, 6), (4, 6)], 'color': '#00FF00'},
+    ]
+    result = smart_fill_gaps(
+        rows, cols, existing, [{'type': 'wall', 'row': 8, 'col': 8}],
+        [[True] * cols for _ in range(rows)], ['#FF0000', '#00FF00'],
+        min_len=2, max_len=5, min_bends=0, max_bends=2
+    )
+
+    assert result['is_solvable']
+    assert result['snakes_added'] > 0
+    snakes = [item for item in result['level_json'] if item['itemType'] == 'snake']
+    assert len(snakes) == 2 + result['snakes_added']
+
+
+def test_smart_fill_seed_is_reproducible():
+    rows, cols = 10, 10
+    existing = [{'path': [(2, 2), (2, 3), (2, 4)], 'color': '#FF0000'}]
+    args = (rows, cols, existing, [], None, ['#FF0000'])
+    
+    first = smart_fill_gaps(*args, min_len=2, max_len=5, min_bends=0, max_bends=2, seed=99)
+    second = smart_fill_gaps(*args, min_len=2, max_len=5, min_bends=0, max_bends=2, seed=99)
+    assert first['seed'] == 99
+    assert first['level_json'] == second['level_json']
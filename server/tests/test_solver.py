@@ -0,0 +1,134 @@
+import random
+import numpy as np
+import pytest
+from app.services.validator import validate_level, validate_level_reference
+from app.services.solver import check_level, IncrementalSolver
+from app.services import optimized_ops
+from app.services.strategies.smart_dynamic import SmartDynamicStrategy
+
+
+def _random_level(rng, rows, cols, snake_count):
+    """Random walks (may overlap, self-block or leave the grid) + a few obstacles."""
+    snakes = []
+    for _ in range(snake_count):
+        r, c = rng.randrange(-1, rows + 1), rng.randrange(-1, cols + 1)
+        path = [(r, c)]
+        for _ in range(rng.randint(1, 6)):
+            dr, dc = rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+            r, c = r + dr, c + dc
+            path.append((r, c))
+        snakes.append({'path': path})
+    snakes.append({'path': [(0, 0)]}) # Too short, skipped by both
+
+    obstacles_map = {}
+    for _ in range(rng.randint(0, 4)):
+        obstacles_map[(rng.randrange(rows), rng.randrange(cols))] = {'type': 'wall'}
+    return snakes, obstacles_map
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_solver_matches_reference_random(seed):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(3, 12), rng.randint(3, 12)
+    snakes, obstacles_map = _random_level(rng, rows, cols, rng.randint(0, 25))
+
+    assert validate_level(snakes, obstacles_map, rows, cols) == \
+        validate_level_reference(snakes, obstacles_map, rows, cols)
+
+
+def test_solver_matches_reference_generated():
+    rows, cols = 20, 20
+    valid_cells = set((r, c) for r in range(rows) for c in range(cols))
+    strategy = SmartDynamicStrategy(rows, cols, valid_cells, {}, ["#FF0000"])
+    snakes = strategy.generate(60, 2, 8, 0, 4)['snakes']
+
+    # Reverse some heads so the level has real dependencies (and likely stuck snakes)
+    mixed = [{'path': s['path'][::-1]} if i % 3 == 0 else s for i, s in enumerate(snakes)]
+
+    for level in (snakes, mixed):
+        assert validate_level(level, {}, rows, cols) == validate_level_reference(level, {}, rows, cols)
+
+
+def test_solver_empty_level():
+    result = validate_level([], {}, 5, 5)
+    assert result == validate_level_reference([], {}, 5, 5)
+    assert result['is_solvable'] and result['steps'] == 0
+
+
+def test_validate_many_matches_single():
+    rng = random.Random(7)
+    levels = []
+    for _ in range(30):
+        rows, cols = rng.randint(3, 12), rng.randint(3, 12)
+        snakes, obstacles_map = _random_level(rng, rows, cols, rng.randint(0, 25))
+        levels.append((snakes, obstacles_map, rows, cols))
+
+    # Packed like difficulty_calculator.score_levels (paths shorter than 2 are skipped)
+    cells, snake_offsets, level_offsets, obstacle_cells, obstacle_offsets = [], [0], [0], [], [0]
+    for snakes, obstacles_map, _, _ in levels:
+        for s in snakes:
+            if len(s['path']) >= 2:
+                cells.extend(s['path'])
+                snake_offsets.append(len(cells))
+        level_offsets.append(len(snake_offsets) - 1)
+        obstacle_cells.extend(obstacles_map)
+        obstacle_offsets.append(len(obstacle_cells))
+    results, _ = optimized_ops.validate_many(
+        np.array(cells, dtype=np.int64).reshape(-1, 2), np.array(snake_offsets, dtype=np.int64),
+        np.array(level_offsets, dtype=np.int64), np.array([level[2:] for level in levels], dtype=np.int64),
+        np.array(obstacle_cells, dtype=np.int64).reshape(-1, 2), np.array(obstacle_offsets, dtype=np.int64)
+    )
+
+    for level, flag in zip(levels, results):
+        expected = validate_level_reference(*level)
+        assert list(flag) == [int(expected['is_solvable']), expected['remained_count'], expected['steps']]
+        assert check_level(*level) == (expected['is_solvable'], expected['remained_count'], expected['steps'])
+
+
+def _random_free_walk(rng, rows, cols, occupied):
+    r, c = rng.randrange(rows), rng.randrange(cols)
+    path = [(r, c)]
+    for _ in range(rng.randint(1, 5)):
+        dr, dc = rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+        nr, nc = path[-1][0] + dr, path[-1][1] + dc
+        if not (0 <= nr < rows and 0 <= nc < cols) or (nr, nc) in occupied or (nr, nc) in path:
+            break
+        path.append((nr, nc))
+    return path if (r, c) not in occupied else None
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_solver_matches_full_solve(seed):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(4, 14), rng.randint(4, 14)
+    obstacles_map = {(rng.randrange(rows), rng.randrange(cols)): {'type': 'wall'} for _ in range(3)}
+    occupied = set(obstacles_map)
+
+    solver = IncrementalSolver([], obstacles_map, rows, cols)
+    snakes = []
+    for _ in range(150):
+        path = _random_free_walk(rng, rows, cols, occupied)
+        if not path:
+            continue
+        expected = validate_level(snakes + [{'path': path}], obstacles_map, rows, cols)['is_solvable']
+        assert solver.can_add(path) == expected
+        if expected:
+            solver.add(path)
+            snakes.append({'path': path})
+            occupied.update(path)
+
+    assert len(snakes) > 5
+
+
+def test_incremental_solver_unsolvable_and_overlapping_base():
+    rows, cols = 6, 6
+    # Two snakes facing each other: stuck forever
+    stuck = [{'path': [(2, 0), (2, 1)]}, {'path': [(2, 4), (2, 3)]}]
+    assert not IncrementalSolver(stuck, {}, rows, cols).can_add([(5, 5), (5, 4)])
+
+    # Overlapping base falls back to full solves
+    overlap = [{'path': [(0, 0), (0, 1)]}, {'path': [(1, 1), (0, 1)]}]
+    solver = IncrementalSolver(overlap, {}, rows, cols)
+    for path in ([(3, 3), (3, 4)], [(0, 3), (0, 2)]):
+        expected = validate_level(overlap + [{'path': path}], {}, rows, cols)['is_solvable']
+        assert solver.can_add(path) == expected
@@ -0,0 +1,100 @@
+"""
+Candidate Selection Benchmark
+Times SmartDynamicStrategy.get_candidates during a full generation run,
+against the previous list-based cache (pop(0) + set membership checks).
+Usage: python bench_candidates.py [--size 100] [--arrows 500] [--seed 0]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import optimized_ops
+from app.services.strategies.smart_dynamic import SmartDynamicStrategy
+
+
+class ListCacheStrategy(SmartDynamicStrategy):
+    """SmartDynamic with the old Python list cache, for comparison."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.candidate_cache = []
+
+    def get_candidates(self):
+        valid_cache = []
+        batch_size = 50
+
+        while self.candidate_cache:
+            cand = self.candidate_cache.pop(0)
+            if cand in self.valid_cells and cand not in self.occupied and cand not in self.obstacles_map:
+                valid_cache.append(cand)
+                if len(valid_cache) >= batch_size:
+                    return valid_cache
+
+        dist_map = self.compute_distance_map()
+        buckets = {}
+        max_dist = 0
+        for pos, dist in dist_map.items():
+            if pos in self.valid_cells and pos not in self.occupied and pos not in self.obstacles_map:
+                buckets.setdefault(dist, []).append(pos)
+                max_dist = max(max_dist, dist)
+
+        refilled_cache = []
+        for d in range(max_dist, -1, -1):
+            if d not in buckets: continue
+            group = buckets[d]
+            group.sort(key=lambda p: optimized_ops.count_free_neighbors_numba(self.rows, self.cols, self.grid_array, p[0], p[1]))
+            refilled_cache.extend(group)
+            if len(refilled_cache) >= 1000:
+                break
+
+        self.candidate_cache = refilled_cache
+        return self.candidate_cache[:batch_size]
+
+
+def run(StrategyClass, size, arrows, seed):
+    """Generate one level, returning (snakes placed, get_candidates seconds, calls, total seconds)."""
+    valid_cells = set((r, c) for r in range(size) for c in range(size))
+    strategy = StrategyClass(size, size, valid_cells, {}, ["#FF0000"], seed=seed)
+
+    spent = [0.0, 0]
+    original = strategy.get_candidates
+
+    def timed():
+        start = time.perf_counter()
+        result = original()
+        spent[0] += time.perf_counter() - start
+        spent[1] += 1
+        return result
+
+    strategy.get_candidates = timed
+    start = time.perf_counter()
+    result = strategy.generate(arrows, 3, 10, 0, 4)
+    total = time.perf_counter() - start
+    return len(result['snakes']), spent[0], spent[1], total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SmartDynamic candidate selection")
+    parser.add_argument("--size", type=int, default=100, help="Grid size (size x size)")
+    parser.add_argument("--arrows", type=int, default=500, help="Arrow count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    optimized_ops.warm_up()
+    # Compile / warm caches once before timing
+    run(SmartDynamicStrategy, 10, 5, args.seed)
+
+    print("variant,snakes,calls,get_candidates_ms,per_call_us,total_ms")
+    for name, cls in (("list_cache", ListCacheStrategy), ("candidate_queue", SmartDynamicStrategy)):
+        snakes, spent, calls, total = run(cls, args.size, args.arrows, args.seed)
+        per_call = spent / calls * 1e6 if calls else 0
+        print(f"{name},{snakes},{calls},{spent * 1000:.1f},{per_call:.1f},{total * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Difficulty Calculator Benchmark
+Times difficulty_calculator.calculate on a generated level against the
+original per-point implementation (calculate_reference).
+Usage: python bench_difficulty.py [--size 100] [--arrows 800] [--seed 0] [--repeat 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import optimized_ops
+from app.services.difficulty_calculator import calculate, calculate_reference
+from app.services.strategies.smart_dynamic import SmartDynamicStrategy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the difficulty calculator")
+    parser.add_argument("--size", type=int, default=100, help="Grid size (size x size)")
+    parser.add_argument("--arrows", type=int, default=800, help="Arrow count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    optimized_ops.warm_up()
+    valid_cells = set((r, c) for r in range(args.size) for c in range(args.size))
+    strategy = SmartDynamicStrategy(args.size, args.size, valid_cells, {}, ["#FF0000"], seed=args.seed)
+    snakes = strategy.generate(args.arrows, 2, 10, 0, 4)['snakes']
+
+    print("variant,snakes,ms_per_call,difficulty_score")
+    for name, fn in (("reference", calculate_reference), ("calculate", calculate)):
+        result = fn(snakes, [], args.size, args.size)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            fn(snakes, [], args.size, args.size)
+        per_call = (time.perf_counter() - start) / args.repeat
+        print(f"{name},{len(snakes)},{per_call * 1000:.2f},{result['difficulty_score']}")
+
+
+if __name__ == "__main__":
+    main()
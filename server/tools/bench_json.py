@@ -0,0 +1,68 @@
+"""
+JSON Response Benchmark
+Times building the level JSON of a generated level (create_level_json) and
+encoding it as an API response with Flask's default provider (stdlib json)
+and with OrjsonProvider.
+Usage: python bench_json.py [--size 100] [--arrows 1500] [--seed 0] [--repeat 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import OrjsonProvider, orjson
+from app.services.json_builder import create_level_json
+from app.services.strategies.smart_dynamic import SmartDynamicStrategy
+
+
+def timed(fn, repeat):
+    """(last result, seconds per call)"""
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark level JSON build + response encoding")
+    parser.add_argument("--size", type=int, default=100, help="Grid size (size x size)")
+    parser.add_argument("--arrows", type=int, default=1500, help="Arrow count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    colors = ["#FF0000", "#00FF00", "#0000FF"]
+    valid_cells = set((r, c) for r in range(args.size) for c in range(args.size))
+    strategy = SmartDynamicStrategy(args.size, args.size, valid_cells, {}, colors, seed=args.seed)
+    snakes = strategy.generate(args.arrows, 2, 10, 0, 4)['snakes']
+    cells = sum(len(s['path']) for s in snakes)
+
+    level_json, build = timed(lambda: create_level_json(snakes, {}, args.size, args.size, colors), args.repeat)
+    payload = {'level_json': level_json, 'grid_rows': args.size, 'grid_cols': args.size, 'is_solvable': True}
+
+    app = Flask(__name__)
+    providers = [("stdlib", DefaultJSONProvider)]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider))
+    else:
+        print("orjson not installed, only timing the stdlib encoder", file=sys.stderr)
+
+    print("encoder,snakes,cells,bytes,build_ms,encode_ms,total_ms")
+    with app.app_context():
+        for name, provider_class in providers:
+            provider = provider_class(app)
+            body, encode = timed(lambda: provider.response(payload).get_data(), args.repeat)
+            print(f"{name},{len(snakes)},{cells},{len(body)},{build * 1000:.2f},{encode * 1000:.2f},"
+                  f"{(build + encode) * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Level Pack Generator
+Generates a pack of levels across a process pool and writes them as they
+complete, plus a summary CSV (coverage, solvability, difficulty, time).
+The params file holds generate_level arguments: one object (repeated over
+--seeds / --count) or a list of objects (one level each).
+Usage: python generate_pack.py params.json --count 100 [--seed 1] [--out DIR] [--ndjson FILE]
+       [--summary FILE] [--workers N]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.batch import expand_batch, run_batch, PackWriter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a level pack")
+    parser.add_argument("params", help="JSON file: a parameter object or a list of them")
+    parser.add_argument("--count", type=int, help="Levels to generate from a single parameter object")
+    parser.add_argument("--seeds", help="Comma separated seeds, one level each (single parameter object)")
+    parser.add_argument("--seed", type=int, help="First seed for --count (seeds run seed, seed + 1, ...)")
+    parser.add_argument("--out", help="Directory for level_<n>.json files")
+    parser.add_argument("--ndjson", help="Single NDJSON output file")
+    parser.add_argument("--summary", help="Summary CSV (default: summary.csv in --out, or next to --ndjson)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Pool size (0 = sequential)")
+    args = parser.parse_args()
+
+    if not args.out and not args.ndjson:
+        parser.error("give --out and/or --ndjson")
+
+    with open(args.params, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    try:
+        if isinstance(data, list):
+            batch = expand_batch(param_sets=data)
+        else:
+            if args.seed is not None:
+                data['seed'] = args.seed
+            seeds = [int(s) for s in args.seeds.split(',')] if args.seeds else None
+            batch = expand_batch(params=data, seeds=seeds, count=args.count)
+    except ValueError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(2)
+
+    summary = args.summary
+    if not summary:
+        summary = os.path.join(args.out, "summary.csv") if args.out else os.path.splitext(args.ndjson)[0] + "_summary.csv"
+
+    start = time.perf_counter()
+    with PackWriter(out_dir=args.out, ndjson_path=args.ndjson, summary_path=summary) as writer:
+        for record in run_batch(batch, args.workers):
+            writer.write(record)
+            if 'error' in record:
+                status = f"FAILED: {record['error']}"
+            else:
+                status = (f"coverage {record['coverage_percent']}%, "
+                          f"{'solvable' if record['is_solvable'] else 'STUCK'}, "
+                          f"difficulty {record['difficulty_score']}, {record['generation_ms']} ms")
+            print(f"[{writer.count}/{len(batch)}] level {record['index'] + 1} (seed {record['seed']}): {status}",
+                  file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    print(f"Generated {writer.count - writer.failed}/{len(batch)} levels in {elapsed:.1f} s. Summary: {summary}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
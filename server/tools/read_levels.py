@@ -1,18 +1,58 @@
 """
 Level Reader Tool
 Reads JSON level files and displays summary info.
-Usage: python read_levels.py
+Files are parsed and scored in chunks across a process pool
+(difficulty_calculator.score_levels, one batched solve per chunk).
+Usage: python read_levels.py            (asks for a directory)
+       python read_levels.py DIR [DIR ...] [--format csv|ndjson] [--sorted]
+                             [--no-recursive] [--workers N] [--chunk-size N]
+                             [--index PATH | --no-index] [--query]
+                             [--min-score X] [--max-score Y]
+In CLI mode directories are walked recursively and rows are streamed as chunks
+finish (--sorted restores natural file order at the end). Throughput is
+reported on stderr.
+Scores are kept in a SQLite index (DIR/.level_index.sqlite by default) keyed by
+path, mtime, size and content hash, so repeat runs only rescore new or changed
+files; --query answers score-range queries from the index alone. The index
+records a hash of the scoring code and is emptied when that changes.
 """
 
 import os
 import sys
+import csv
 import json
 import re
+import sqlite3
+import hashlib
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    # orjson not installed, use the standard library parser
+    _loads = json.loads
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.services.difficulty_calculator import calculate
+from app.services import difficulty_calculator, optimized_ops, solver, validator
+from app.services.difficulty_calculator import calculate, score_levels
+
+# Files per pool task
+CHUNK_SIZE = 256
+
+# Default index file name, created in the (first) scanned directory
+INDEX_NAME = '.level_index.sqlite'
+
+RECORD_FIELDS = ('snakes', 'score', 'S', 'F', 'O', 'solve_depth')
+
+# Modules whose code determines a score record
+SCORER_MODULES = (difficulty_calculator, solver, optimized_ops, validator)
 
 
 def natural_sort_key(s):
@@ -21,14 +61,16 @@ def natural_sort_key(s):
             for text in re.split(r'(\d+)', s)]
 
 
-def read_level_file(file_path):
+def load_level(file_path, raw=None):
     """
-    Read and parse a single level JSON file.
-    Returns (snakes_count, score) or None if invalid.
+    Read and parse a single level JSON file (raw: its contents, if already read).
+    Returns (snakes, obstacles) in calculator format, or None if invalid / no snakes.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if raw is None:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        data = _loads(raw)
         
         snakes = None
         obstacles = []
@@ -54,8 +96,8 @@ def read_level_file(file_path):
             for s in raw_snakes:
                 position = s.get('position', [])
                 if position:
-                    # Convert x,y to row,col (y -> row, x -> col)
-                    path = [{'row': p.get('y', 0), 'col': p.get('x', 0)} for p in position]
+                    # Convert x,y to (row, col) tuples (y -> row, x -> col)
+                    path = [(p.get('y', 0), p.get('x', 0)) for p in position]
                     snakes.append({'path': path, 'color': s.get('colorID', 0)})
             
             obstacles = []
@@ -68,20 +110,393 @@ def read_level_file(file_path):
         if snakes is None or len(snakes) == 0:
             return None
         
-        # Calculate difficulty
-        result = calculate(snakes, obstacles)
-        score = result.get('difficulty_score', 0)
-        
-        return len(snakes), score
+        return snakes, obstacles
         
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, UnicodeDecodeError):
         return None
     except Exception as e:
-        print(f"  [DEBUG] Error: {e}")
+        print(f"  [DEBUG] {file_path}: {e}", file=sys.stderr)
         return None
 
 
-def main():
+def read_level_file(file_path):
+    """
+    Read and score a single level JSON file.
+    Returns (snakes_count, score) or None if invalid.
+    """
+    level = load_level(file_path)
+    if level is None:
+        return None
+    
+    snakes, obstacles = level
+    try:
+        result = calculate(snakes, obstacles)
+    except Exception as e:
+        print(f"  [DEBUG] {file_path}: {e}", file=sys.stderr)
+        return None
+    return len(snakes), result.get('difficulty_score', 0)
+
+
+def content_hash(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+def score_files(file_paths, known_hashes=None):
+    """
+    Parse and score a chunk of files (runs in a pool worker).
+    Returns [(file_path, digest, record or None), ...] in input order, where record is
+    {'snakes', 'score', 'S', 'F', 'O', 'solve_depth'}.
+    known_hashes: {file_path: digest} of indexed files. When given, each file's
+    content digest is returned and files whose content is unchanged are not
+    parsed (record None); otherwise digest is None.
+    """
+    parsed = []
+    for path in file_paths:
+        if known_hashes is None:
+            parsed.append((path, None, load_level(path)))
+            continue
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            print(f"  [DEBUG] {path}: {e}", file=sys.stderr)
+            parsed.append((path, None, None))
+            continue
+        digest = content_hash(raw)
+        level = None if known_hashes.get(path) == digest else load_level(path, raw)
+        parsed.append((path, digest, level))
+    levels = [level for _, _, level in parsed if level is not None]
+    
+    try:
+        columns = score_levels([(snakes, obstacles, None, None) for snakes, obstacles in levels])
+    except Exception as e:
+        # A malformed level breaks the whole batch: score one file at a time
+        if len(levels) == 1:
+            print(f"  [DEBUG] {next(path for path, _, level in parsed if level)}: {e}", file=sys.stderr)
+            return [(path, digest, None) for path, digest, _ in parsed]
+        return [result for path in file_paths for result in score_files([path], known_hashes)]
+    
+    records = iter(zip(columns['difficulty_score'].tolist(), columns['S'].tolist(), columns['F'].tolist(),
+                       columns['O'].tolist(), columns['solve_depth'].tolist()))
+    results = []
+    for path, digest, level in parsed:
+        record = None
+        if level is not None:
+            score, S, F, O, depth = next(records)
+            record = {'snakes': len(level[0]), 'score': score, 'S': S, 'F': F, 'O': O, 'solve_depth': depth}
+        results.append((path, digest, record))
+    return results
+
+
+def iter_level_files(root, recursive=True):
+    """Yield (path, os.stat_result) of every .json file under root (os.scandir walk, symlinked dirs skipped)."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.name.lower().endswith('.json') and entry.is_file():
+                        yield entry.path, entry.stat()
+        except OSError as e:
+            print(f"[WARNING] Cannot read {directory}: {e}", file=sys.stderr)
+
+
+def score_stream(file_paths, workers=None, chunk_size=CHUNK_SIZE, known_hashes=None):
+    """
+    Score files across a process pool and yield (file_path, digest, record or None)
+    as chunks finish (see score_files). file_paths may be a lazy iterator: at
+    most two chunks per worker are in flight.
+    """
+    workers = workers or os.cpu_count() or 1
+    
+    def chunks():
+        chunk = []
+        for path in file_paths:
+            chunk.append(path)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def task_args(chunk):
+        if known_hashes is None:
+            return chunk, None
+        return chunk, {path: known_hashes[path] for path in chunk if path in known_hashes}
+    
+    if workers <= 1:
+        for chunk in chunks():
+            yield from score_files(*task_args(chunk))
+        return
+    
+    # spawn: Numba's threading layer is not fork-safe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        pending = set()
+        for chunk in chunks():
+            pending.add(pool.submit(score_files, *task_args(chunk)))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in pending:
+            yield from future.result()
+
+
+def score_all(file_paths, workers=None):
+    """
+    Score many files across a process pool, in chunks of CHUNK_SIZE.
+    Returns {file_path: (snakes_count, score) or None}.
+    """
+    workers = min(workers or os.cpu_count() or 1, max(1, -(-len(file_paths) // CHUNK_SIZE)))
+    return {
+        path: None if record is None else (record['snakes'], record['score'])
+        for path, _, record in score_stream(file_paths, workers)
+    }
+
+
+def scorer_version():
+    """sha256 of the scoring modules' source, stored with an index to detect stale scores."""
+    digest = hashlib.sha256()
+    for module in SCORER_MODULES:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class LevelIndex:
+    """
+    SQLite index of scored level files.
+
+    Rows are keyed by path (relative to the index file's directory, so a
+    sidecar index moves with its archive) and store mtime, size and content
+    hash with the score record. Invalid files are indexed with a NULL record
+    so they are not re-read either.
+
+    The scorer version (scorer_version() unless given) is kept in a meta
+    table. Rows written by another version are dropped on open, so every
+    file is rescored instead of reusing stale scores.
+    """
+
+    def __init__(self, path, version=None):
+        self.path = path
+        self.base = os.path.dirname(os.path.abspath(path))
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS levels (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, "
+            "size INTEGER NOT NULL, hash TEXT NOT NULL, snakes INTEGER, score REAL, S REAL, F REAL, "
+            "O REAL, solve_depth INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS levels_score ON levels (score)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.version = version or scorer_version()
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'scorer_version'").fetchone()
+        if row is None or row[0] != self.version:
+            dropped = self._db.execute("DELETE FROM levels").rowcount
+            if dropped:
+                print(f"[WARNING] {path} was scored by another scorer version, dropped {dropped} rows",
+                      file=sys.stderr)
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('scorer_version', ?)", (self.version,))
+        self._db.commit()
+        self._pending = []
+
+    def key(self, file_path):
+        return os.path.relpath(os.path.abspath(file_path), self.base)
+
+    def file_path(self, key):
+        return os.path.normpath(os.path.join(self.base, key))
+
+    @staticmethod
+    def _record(row):
+        return None if row[0] is None else dict(zip(RECORD_FIELDS, row))
+
+    def entries(self):
+        """{key: (mtime_ns, size, hash, record or None)} for every indexed file."""
+        rows = self._db.execute(f"SELECT path, mtime_ns, size, hash, {', '.join(RECORD_FIELDS)} FROM levels")
+        return {row[0]: (row[1], row[2], row[3], self._record(row[4:])) for row in rows}
+
+    def put(self, file_path, stat, digest, record):
+        values = [None] * len(RECORD_FIELDS) if record is None else [record[k] for k in RECORD_FIELDS]
+        self._pending.append((self.key(file_path), stat.st_mtime_ns, stat.st_size, digest, *values))
+        if len(self._pending) >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO levels VALUES ({', '.join('?' * (4 + len(RECORD_FIELDS)))})", self._pending
+            )
+            self._db.commit()
+            self._pending = []
+
+    def prune(self, keys, roots, recursive=True):
+        """Drop rows under roots (direct children only if not recursive) whose key is not in keys."""
+        stale = []
+        for key in self.entries().keys() - set(keys):
+            for root in roots:
+                rel = os.path.relpath(self.file_path(key), os.path.abspath(root))
+                if not rel.startswith(os.pardir) and (recursive or os.sep not in rel):
+                    stale.append((key,))
+                    break
+        self._db.executemany("DELETE FROM levels WHERE path = ?", stale)
+        self._db.commit()
+        return len(stale)
+
+    def query(self, min_score=None, max_score=None):
+        """Yield (file_path, record) of valid levels with min_score <= score <= max_score."""
+        sql = f"SELECT path, {', '.join(RECORD_FIELDS)} FROM levels WHERE snakes IS NOT NULL"
+        args = []
+        if min_score is not None:
+            sql += " AND score >= ?"
+            args.append(min_score)
+        if max_score is not None:
+            sql += " AND score <= ?"
+            args.append(max_score)
+        for row in self._db.execute(sql + " ORDER BY path", args):
+            yield self.file_path(row[0]), self._record(row[1:])
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def scan(roots, output_format='csv', sort_rows=False, recursive=True, workers=None, chunk_size=CHUNK_SIZE,
+         index=None, min_score=None, max_score=None, query=False):
+    """
+    CLI mode: score every level file under roots and write rows to stdout.
+    Files are named relative to their root when there is a single root.
+
+    index: LevelIndex. Files whose mtime and size (or, failing that, content
+           hash) match their row are not rescored; new rows are written back
+           and rows of deleted files are dropped.
+    min_score / max_score: Only write levels in this score range.
+    query: Answer from the index alone, without reading any level file.
+    """
+    stats = {'files': 0, 'bytes': 0, 'valid': 0, 'rescored': 0, 'reused': 0}
+    abs_roots = [os.path.abspath(root) for root in roots]
+    
+    def under_roots(path):
+        for root in abs_roots:
+            rel = os.path.relpath(path, root)
+            if not rel.startswith(os.pardir) and (recursive or os.sep not in rel):
+                return True
+        return False
+    
+    def label(path):
+        return os.path.relpath(path, roots[0]) if len(roots) == 1 else path
+    
+    fields = ['filename', 'snake', 'score']
+    writer = csv.writer(sys.stdout, lineterminator='\n') if output_format == 'csv' else None
+    
+    def write(name, record):
+        if writer:
+            writer.writerow([name, record['snakes'], record['score']])
+        else:
+            sys.stdout.write(json.dumps({'file': name, **record}) + '\n')
+    
+    rows = []
+    
+    def emit(path, record):
+        if record is None:
+            return
+        stats['valid'] += 1
+        if (min_score is not None and record['score'] < min_score) or \
+                (max_score is not None and record['score'] > max_score):
+            return
+        if sort_rows:
+            rows.append((label(path), record))
+        else:
+            write(label(path), record)
+            sys.stdout.flush()
+    
+    if writer:
+        writer.writerow(fields)
+    
+    start = time.perf_counter()
+    if query:
+        for path, record in index.query(min_score, max_score):
+            if under_roots(path):
+                emit(path, record)
+    else:
+        entries = index.entries() if index else {}
+        known_hashes = None if index is None else {}
+        seen = set()
+        in_flight = {} # path -> stat of files sent to the pool
+        hits = deque() # (path, record) of index hits not yet written
+        
+        def paths():
+            for root in roots:
+                for path, stat in iter_level_files(root, recursive):
+                    # Repeated or nested roots reach the same file more than once
+                    key = os.path.abspath(path) if index is None else index.key(path)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    stats['files'] += 1
+                    stats['bytes'] += stat.st_size
+                    if index is None:
+                        yield path
+                        continue
+                    
+                    entry = entries.get(key)
+                    if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                        hits.append((path, entry[3]))
+                        continue
+                    if entry:
+                        known_hashes[path] = entry[2]
+                    in_flight[path] = stat
+                    yield path
+        
+        for path, digest, record in score_stream(paths(), workers, chunk_size, known_hashes):
+            if index is not None:
+                entry = entries.get(index.key(path))
+                if entry and digest == entry[2]:
+                    # Touched but unchanged
+                    record = entry[3]
+                    hits.append((path, record))
+                else:
+                    stats['rescored'] += 1
+                    emit(path, record)
+                if digest is not None:
+                    index.put(path, in_flight.pop(path), digest, record)
+            else:
+                emit(path, record)
+            while hits:
+                stats['reused'] += 1
+                emit(*hits.popleft())
+        
+        while hits:
+            stats['reused'] += 1
+            emit(*hits.popleft())
+        if index is not None:
+            index.flush()
+            stats['removed'] = index.prune(seen, roots, recursive)
+    
+    for name, record in sorted(rows, key=lambda row: natural_sort_key(row[0])):
+        write(name, record)
+    
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    if query:
+        print(f"Read {stats['valid']} levels from {index.path} in {elapsed:.2f} s", file=sys.stderr)
+        return
+    message = (f"Scanned {stats['files']} files ({stats['bytes'] / 1e6:.1f} MB), {stats['valid']} valid levels "
+               f"in {elapsed:.1f} s: {stats['files'] / elapsed:.0f} files/s, {stats['bytes'] / 1e6 / elapsed:.1f} MB/s")
+    if index is not None:
+        message += (f" ({stats['rescored']} rescored, {stats['reused']} from index, "
+                    f"{stats['removed']} removed from index)")
+    print(message, file=sys.stderr)
+
+
+def interactive():
     # Ask for directory path
     path = input("Enter directory path: ").strip()
     
@@ -107,16 +522,62 @@ def main():
         print(f"[WARNING] No JSON files found in {path}", file=sys.stderr)
         return
     
+    json_files.sort(key=natural_sort_key)
+    start = time.perf_counter()
+    results = score_all([os.path.join(path, filename) for filename in json_files])
+    elapsed = time.perf_counter() - start
+    
     # CSV header
     print("filename,snake,score")
     
-    for filename in sorted(json_files, key=natural_sort_key):
-        file_path = os.path.join(path, filename)
-        result = read_level_file(file_path)
+    for filename in json_files:
+        result = results[os.path.join(path, filename)]
         
         if result:
             snake_count, score = result
             print(f"{filename},{snake_count},{score}")
+    
+    print(f"Scored {len(json_files)} files in {elapsed:.1f} s ({len(json_files) / max(elapsed, 1e-9):.0f} files/s)",
+          file=sys.stderr)
+
+
+
+def main():
+    if len(sys.argv) == 1:
+        interactive()
+        return
+    
+    parser = argparse.ArgumentParser(description="Score level JSON files (CSV or NDJSON on stdout)")
+    parser.add_argument("dirs", nargs='+', help="Directories to scan")
+    parser.add_argument("--format", choices=('csv', 'ndjson'), default='csv')
+    parser.add_argument("--sorted", action='store_true', help="Write rows in natural file order at the end")
+    parser.add_argument("--no-recursive", dest='recursive', action='store_false', help="Do not descend into subdirectories")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = in process)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Files per worker task")
+    parser.add_argument("--index", help=f"SQLite score index (default: DIR/{INDEX_NAME})")
+    parser.add_argument("--no-index", action='store_true', help="Score every file, do not read or write an index")
+    parser.add_argument("--query", action='store_true', help="Answer from the index without reading level files")
+    parser.add_argument("--min-score", type=float, help="Only list levels with at least this score")
+    parser.add_argument("--max-score", type=float, help="Only list levels with at most this score")
+    args = parser.parse_args()
+    
+    for path in args.dirs:
+        if not os.path.isdir(path):
+            print(f"[ERROR] Path is not a directory - {path}", file=sys.stderr)
+            sys.exit(2)
+    
+    index_path = None if args.no_index else args.index or os.path.join(args.dirs[0], INDEX_NAME)
+    if args.query and (index_path is None or not os.path.exists(index_path)):
+        print(f"[ERROR] --query needs an existing index - {index_path}", file=sys.stderr)
+        sys.exit(2)
+    
+    index = LevelIndex(index_path) if index_path else None
+    try:
+        scan(args.dirs, args.format, args.sorted, args.recursive, args.workers, max(1, args.chunk_size),
+             index=index, min_score=args.min_score, max_score=args.max_score, query=args.query)
+    finally:
+        if index is not None:
+            index.close()
 
 
 if __name__ == "__main__":